@@ -1,18 +1,69 @@
+from typing import Optional
+
 from google.adk.agents import SequentialAgent
-from src.agents.trend_research_agent import trend_research_agent
-from src.agents.output_composer_agent import output_composer_agent
+from src.agents.trend_research_agent import create_trend_research_agent
+from src.agents.output_composer_agent import create_output_composer_agent
+from src.agents.create_parallel_category_agent import create_parallel_category_agent
 from src.utils.setup_log import setup_logger
 
 # Setup logger for the coordinator agent
 logger = setup_logger()
 
-# Log the creation of the root agent
-logger.info("COORDINATOR: Creating Sephora Trend Agent with sequential execution")
-logger.info("   Agent 1: sephora_trend_research_agent (trend discovery)")
-logger.info("   Agent 2: output_composer_agent (data structuring)")
 
-root_agent = SequentialAgent(
-    name="sephora_trend_agent",
-    description="A sequential agent that uses the trend research agent to find trends and the output composer agent to compose the output into a pydantic model.",
-    sub_agents=[trend_research_agent, output_composer_agent],
-)
\ No newline at end of file
+def create_root_agent(latency_tier: Optional[str] = None) -> SequentialAgent:
+    """
+    Create the "sequential" pipeline for a latency tier.
+
+    Args:
+        latency_tier: "fast" or "deep"; selects the models from ``model_tiers`` in config.yaml
+
+    Returns:
+        SequentialAgent equivalent to ``root_agent`` with that tier's models
+    """
+    logger.info(f"COORDINATOR: Creating Sephora Trend Agent with sequential execution (tier: {latency_tier})")
+    logger.info("   Agent 1: sephora_trend_research_agent (trend discovery)")
+    logger.info("   Agent 2: output_composer_agent (data structuring)")
+
+    return SequentialAgent(
+        name="sephora_trend_agent",
+        description="A sequential agent that uses the trend research agent to find trends and the output composer agent to compose the output into a pydantic model.",
+        sub_agents=[
+            create_trend_research_agent(latency_tier),
+            create_output_composer_agent(latency_tier),
+        ],
+    )
+
+
+def create_parallel_root_agent(
+    max_concurrency: Optional[int] = None, latency_tier: Optional[str] = None
+) -> SequentialAgent:
+    """
+    Create the "parallel" pipeline: category fan-out, consolidation, then output composition.
+
+    Args:
+        max_concurrency: Maximum category agents running at once (defaults to all)
+        latency_tier: "fast" or "deep"; selects the models from ``model_tiers`` in config.yaml
+
+    Returns:
+        SequentialAgent producing the same ``sephora_trends_report`` as ``root_agent``
+    """
+    logger.info("COORDINATOR: Creating Sephora Trend Agent with parallel category execution")
+    logger.info("   Agent 1: parallel_category_agent (category fan-out + consolidation)")
+    logger.info("   Agent 2: output_composer_agent (data structuring)")
+
+    return SequentialAgent(
+        name="sephora_parallel_trend_agent",
+        description="A sequential agent that fans out to category research agents, consolidates their findings and composes the output into a pydantic model.",
+        sub_agents=[
+            create_parallel_category_agent(max_concurrency, latency_tier),
+            create_output_composer_agent(latency_tier),
+        ],
+    )
+
+
+def __getattr__(name: str):
+    # ``root_agent`` (the default-tier sequential pipeline) is built on first access, not at import
+    if name == "root_agent":
+        agent = globals()["root_agent"] = create_root_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
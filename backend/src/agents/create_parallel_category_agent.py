@@ -1,96 +1,226 @@
-from google.adk.agents import LlmAgent, ParallelAgent
+import asyncio
+from typing import AsyncGenerator, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
 from google.adk.planners import BuiltInPlanner
-from google.adk.tools import google_search
 from google.genai import types as genai_types
 from google.genai import types
-from dotenv import load_dotenv
 
-from src.config.research_config import config
 from src.utils.callbacks import collect_research_sources_callback
+from src.utils.search_tool import get_search_tool
 from src.utils.setup_log import setup_logger
-from src.utils.prompt_loader import get_category_agent_prompt
+from src.utils.prompt_loader import get_category_agent_prompt, get_consolidation_agent_prompt
+from src.utils.model_tiers import agent_model
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-import os, sys
 
-# Load environment variables
-load_dotenv()
 logger = setup_logger()
 
 categories = ["Tools & Brushes", "Skincare", "Mini Size", "Men", "Makeup", "Hair", "Gifts", "Fragrance", "Bath & Body"]
-def create_parallel_category_agent():
-    # Add the backend directory to the path so we can import from src
-    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    sys.path.insert(0, backend_dir)
-    # Setup logger for the parallel category agent
 
-    # Log agent creation
-    logger.info("PARALLEL CATEGORY AGENT: Creating parallel category agent for trend discovery across categories")
-    logger.info(f"PARALLEL CATEGORY AGENT: Total categories to process: {len(categories)}")
-    logger.info(f"PARALLEL CATEGORY AGENT: Categories: {', '.join(categories)}")
 
-    category_agents = []
-    for i, category in enumerate(categories, 1):
-        agent_name = f"{category.lower().replace(' & ', '_').replace(' ', '_')}_category_agent"
-        output_key = f"{category.lower().replace(' & ', '_').replace(' ', '_')}_category_findings"
-        
-        logger.info(f"PARALLEL CATEGORY AGENT: Creating agent {i}/{len(categories)} - {agent_name} for category '{category}'")
-        
-        agent = LlmAgent(
-            model=config.critic_model,
-            name=agent_name,
-            description=f"Identifies up-and-coming beauty and style trends in the {category} category using Google Search with source attribution and timestamps.",
-            planner=BuiltInPlanner(
-                thinking_config=genai_types.ThinkingConfig(include_thoughts=False)
-            ),
-            instruction=get_category_agent_prompt(category),
-            tools=[google_search],
-            output_key=output_key,
-            generate_content_config=types.GenerateContentConfig(temperature=0.01),
-            after_agent_callback=collect_research_sources_callback,
-        )
-        category_agents.append(agent)
-        logger.info(f"PARALLEL CATEGORY AGENT: Successfully created {agent_name} with output_key: {output_key}")
-
-    # Create a consolidation agent that will synthesize all category findings
-    consolidation_agent = LlmAgent(
-        model=config.critic_model,
-        name="trend_consolidation_agent",
-        description="Consolidates and synthesizes trend findings from all beauty category agents into a comprehensive final report.",
+def category_slug(category: str) -> str:
+    """Get the identifier-safe slug for a category, e.g. 'Bath & Body' -> 'bath_body'."""
+    return category.lower().replace(' & ', '_').replace(' ', '_')
+
+
+def category_agent_name(category: str) -> str:
+    """Get the name of a category's research agent."""
+    return f"{category_slug(category)}_category_agent"
+
+
+def category_output_key(category: str) -> str:
+    """Get the session state key a category agent writes its findings to."""
+    return f"{category_slug(category)}_category_findings"
+
+
+class CategoryFanOutAgent(BaseAgent):
+    """
+    Runs category research agents concurrently, at most ``max_concurrency`` at a time.
+
+    Unlike ``ParallelAgent``, which starts every sub-agent at once, the fan-out is
+    bounded so a full nine-category run does not exceed the model quota. Each
+    sub-agent runs on its own branch, and a failing category is logged and skipped
+    so the remaining findings can still be consolidated. Live (audio/video) runs are
+    not supported; ``run_live`` raises ``BaseAgent``'s ``NotImplementedError``.
+    """
+
+    max_concurrency: int = len(categories)
+
+    def _agents_to_run(self, ctx: InvocationContext) -> List[BaseAgent]:
+        """
+        Select the sub-agents to execute for this invocation.
+
+        Categories the query router did not select (``routed_categories`` in session
+        state) are skipped, as are categories whose findings were seeded into session
+        state from the findings store; consolidation reads the cached findings from state.
+        """
+        state = ctx.session.state
+        routed_categories = state.get("routed_categories")
+        routed_keys = {category_output_key(category) for category in routed_categories} if routed_categories else None
+
+        agents_to_run = []
+        for sub_agent in self.sub_agents:
+            output_key = getattr(sub_agent, "output_key", None)
+            if routed_keys is not None and output_key not in routed_keys:
+                logger.info(f"CATEGORY FAN-OUT: Skipping {sub_agent.name} (not routed for this query)")
+                continue
+            if output_key and state.get(output_key):
+                logger.info(f"CATEGORY FAN-OUT: Reusing cached findings for {sub_agent.name}")
+                continue
+            agents_to_run.append(sub_agent)
+        return agents_to_run
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        sub_agents = self._agents_to_run(ctx)
+        if not sub_agents:
+            logger.info("CATEGORY FAN-OUT: No category agents to run")
+            return
+
+        logger.info(f"CATEGORY FAN-OUT: Running {len(sub_agents)} category agents with max concurrency {self.max_concurrency}")
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def run_category_agent(sub_agent: BaseAgent) -> None:
+            error = None
+            branch_ctx = ctx.model_copy()
+            branch_suffix = f"{self.name}.{sub_agent.name}"
+            branch_ctx.branch = f"{ctx.branch}.{branch_suffix}" if ctx.branch else branch_suffix
+            try:
+                async with semaphore:
+                    logger.info(f"CATEGORY FAN-OUT: Starting {sub_agent.name}")
+                    async for event in sub_agent.run_async(branch_ctx):
+                        # Wait until the runner has processed the event before generating the next one
+                        resume = asyncio.Event()
+                        await queue.put((event, resume))
+                        await resume.wait()
+            except Exception as e:
+                error = e
+            finally:
+                await queue.put((finished, (sub_agent.name, error)))
+
+        tasks = [asyncio.create_task(run_category_agent(sub_agent)) for sub_agent in sub_agents]
+        failures = []
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event, payload = await queue.get()
+                if event is finished:
+                    remaining -= 1
+                    agent_name, error = payload
+                    if error is not None:
+                        logger.error(f"CATEGORY FAN-OUT: {agent_name} failed: {error}")
+                        failures.append(error)
+                    else:
+                        logger.info(f"CATEGORY FAN-OUT: {agent_name} completed")
+                    continue
+                yield event
+                payload.set()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if failures and len(failures) == len(sub_agents):
+            raise failures[-1]
+
+
+def create_category_agent(category: str, latency_tier: Optional[str] = None) -> LlmAgent:
+    """Create the research agent for a single category."""
+    agent_name = category_agent_name(category)
+    output_key = category_output_key(category)
+
+    agent = LlmAgent(
+        model=agent_model("category_agent", latency_tier),
+        name=agent_name,
+        description=f"Identifies up-and-coming beauty and style trends in the {category} category using Google Search with source attribution and timestamps.",
         planner=BuiltInPlanner(
             thinking_config=genai_types.ThinkingConfig(include_thoughts=False)
         ),
-        instruction="""You are a senior beauty industry analyst tasked with creating a comprehensive trend report.
-
-You will receive trend findings from 9 different beauty category agents. Your job is to:
+        instruction=get_category_agent_prompt(category),
+        tools=[get_search_tool()],
+        output_key=output_key,
+        generate_content_config=types.GenerateContentConfig(temperature=0.01),
+        after_agent_callback=collect_research_sources_callback,
+    )
+    logger.info(f"PARALLEL CATEGORY AGENT: Successfully created {agent_name} with output_key: {output_key}")
+    return agent
 
-1. **Synthesize Key Themes**: Identify overarching themes that span multiple categories
-2. **Highlight Cross-Category Trends**: Note trends that appear across different beauty verticals
-3. **Create Executive Summary**: Provide a concise overview of the most significant trends
-4. **Organize by Impact**: Prioritize trends by their potential market impact and consumer adoption
-5. **Provide Actionable Insights**: Include specific recommendations for beauty retailers and brands
 
-**Output Format**: Create a well-structured report with:
-- Executive Summary (2-3 paragraphs)
-- Top 5 Cross-Category Trends
-- Category-Specific Highlights
-- Market Implications
-- Recommendations
+def create_consolidation_agent(latency_tier: Optional[str] = None) -> LlmAgent:
+    """
+    Create the agent that synthesizes all category findings into one research report.
 
-Use the individual category findings to create a cohesive, comprehensive beauty trend report for November 2025.""",
+    It writes to ``sephora_trend_research_findings`` so the output composer, citation
+    callback and file output treat it exactly like the single research agent's report.
+    """
+    return LlmAgent(
+        model=agent_model("consolidation_agent", latency_tier),
+        name="trend_consolidation_agent",
+        description="Consolidates and synthesizes trend findings from all beauty category agents into a comprehensive final report.",
+        planner=BuiltInPlanner(
+            thinking_config=genai_types.ThinkingConfig(include_thoughts=False)
+        ),
+        instruction=get_consolidation_agent_prompt(
+            {category: category_output_key(category) for category in categories}
+        ),
         tools=[],
+        output_key="sephora_trend_research_findings",
         generate_content_config=types.GenerateContentConfig(temperature=0.1),
         after_agent_callback=collect_research_sources_callback,
     )
 
-    parallel_category_agent = ParallelAgent(
+
+def create_category_fan_out_agent(
+    max_concurrency: Optional[int] = None, latency_tier: Optional[str] = None
+) -> CategoryFanOutAgent:
+    """Create the bounded fan-out over all category research agents."""
+    # Log agent creation
+    logger.info("PARALLEL CATEGORY AGENT: Creating parallel category agent for trend discovery across categories")
+    logger.info(f"PARALLEL CATEGORY AGENT: Total categories to process: {len(categories)}")
+    logger.info(f"PARALLEL CATEGORY AGENT: Categories: {', '.join(categories)}")
+
+    category_agents = []
+    for i, category in enumerate(categories, 1):
+        logger.info(f"PARALLEL CATEGORY AGENT: Creating agent {i}/{len(categories)} for category '{category}'")
+        category_agents.append(create_category_agent(category, latency_tier))
+
+    return CategoryFanOutAgent(
+        name="category_fan_out_agent",
+        description="Runs the category-specific research agents concurrently under a concurrency limit.",
+        sub_agents=category_agents,
+        max_concurrency=max_concurrency or len(categories),
+    )
+
+
+def create_parallel_category_agent(max_concurrency: Optional[int] = None, latency_tier: Optional[str] = None):
+    """
+    Create the category research pipeline: fan out to the category agents, then consolidate.
+
+    Consolidation runs after every category agent has finished so it sees all findings.
+
+    Args:
+        max_concurrency: Maximum category agents running at once (defaults to all)
+        latency_tier: "fast" or "deep"; selects the models from ``model_tiers`` in config.yaml
+
+    Returns:
+        SequentialAgent running the fan-out followed by the consolidation agent
+    """
+    fan_out_agent = create_category_fan_out_agent(max_concurrency, latency_tier)
+    consolidation_agent = create_consolidation_agent(latency_tier)
+
+    parallel_category_agent = SequentialAgent(
         name="parallel_category_agent",
-        description="A parallel agent that runs multiple category-specific agents to discover trends across different beauty categories, then consolidates the findings.",
-        sub_agents=category_agents + [consolidation_agent],
+        description="Runs category-specific agents in parallel to discover trends across beauty categories, then consolidates the findings.",
+        sub_agents=[fan_out_agent, consolidation_agent],
     )
     
-    logger.info(f"PARALLEL CATEGORY AGENT: Successfully created parallel agent with {len(category_agents)} research agents + 1 consolidation agent")
-    logger.info(f"PARALLEL CATEGORY AGENT: Research agent names: {[agent.name for agent in category_agents]}")
+    logger.info(f"PARALLEL CATEGORY AGENT: Successfully created parallel agent with {len(fan_out_agent.sub_agents)} research agents + 1 consolidation agent")
+    logger.info(f"PARALLEL CATEGORY AGENT: Research agent names: {[agent.name for agent in fan_out_agent.sub_agents]}")
     logger.info(f"PARALLEL CATEGORY AGENT: Consolidation agent: {consolidation_agent.name}")
 
     return parallel_category_agent
@@ -1,33 +1,51 @@
 from google.adk.agents import LlmAgent
-from dotenv import load_dotenv
 import sys
 import os
+from typing import Optional
 from src.models.session_models import SephoraTrendsReport
 
-# Load environment variables
-load_dotenv()
-
 # Add the backend directory to the path so we can import from src
 backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, backend_dir)
 
-from src.config.research_config import config
-from src.utils.callbacks import collect_research_sources_callback, output_composer_callback
+from src.utils.callbacks import collect_research_sources_callback, output_composer_callback, local_structuring_callback
 from src.utils.setup_log import setup_logger
 from src.utils.prompt_loader import get_output_composer_agent_prompt
+from src.utils.model_tiers import agent_model
 
 # Setup logger for the output composer agent
 logger = setup_logger()
 
-# Log agent creation
-logger.info("OUTPUT COMPOSER AGENT: Creating output composer agent for data structuring")
-
-output_composer_agent = LlmAgent(
-    model=config.critic_model,
-    name="output_composer_agent", 
-    description="Composes the output of the trend research agent into a structured pydantic model with multiple trends.",
-    instruction=get_output_composer_agent_prompt(),
-    output_key="sephora_trends_report",
-    output_schema=SephoraTrendsReport,
-    after_agent_callback=output_composer_callback,
-)
\ No newline at end of file
+
+def create_output_composer_agent(latency_tier: Optional[str] = None) -> LlmAgent:
+    """
+    Create an output composer agent.
+
+    An ADK agent can only belong to one parent, so each pipeline builds its own
+    instance. The name stays ``output_composer_agent`` because the service detects
+    the final response by that author.
+
+    Args:
+        latency_tier: "fast" or "deep"; selects the model from ``model_tiers`` in config.yaml
+    """
+    # Log agent creation
+    logger.info("OUTPUT COMPOSER AGENT: Creating output composer agent for data structuring")
+
+    return LlmAgent(
+        model=agent_model("output_composer_agent", latency_tier),
+        name="output_composer_agent", 
+        description="Composes the output of the trend research agent into a structured pydantic model with multiple trends.",
+        instruction=get_output_composer_agent_prompt(),
+        output_key="sephora_trends_report",
+        output_schema=SephoraTrendsReport,
+        before_agent_callback=local_structuring_callback,
+        after_agent_callback=output_composer_callback,
+    )
+
+
+def __getattr__(name: str):
+    # Module-level ``output_composer_agent`` is built on first access, not at import
+    if name == "output_composer_agent":
+        agent = globals()["output_composer_agent"] = create_output_composer_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from pydantic import PrivateAttr
+
+from src.utils.run_recorder import load_recording, recording_path_for
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class ReplayAgent(BaseAgent):
+    """
+    Re-emits a recorded run's events instead of calling the models.
+
+    Used as the root agent of a ``Runner``, so the service, callbacks on the
+    progress stream and file output run exactly as for a live run. Events keep
+    their original authors and state deltas; the last one also carries any state
+    from the recording's final session state not reproduced by the deltas.
+
+    ``time_scale`` scales the recorded timing: 1.0 replays at the original
+    pace, 0.1 ten times faster and 0 without waiting.
+    """
+
+    recording_path: Optional[str] = None
+    recordings_dir: Optional[str] = None
+    time_scale: float = 1.0
+
+    _recordings: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+
+    def _recording_for(self, query: str) -> Dict[str, Any]:
+        """Load (once) the recording for a query: ``recording_path`` if set, else the query's file."""
+        path = self.recording_path or recording_path_for(query, self.recordings_dir)
+        if path not in self._recordings:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No recording for query '{query}' at {path}")
+            self._recordings[path] = load_recording(path)
+            logger.info(f"REPLAY: Loaded {len(self._recordings[path]['events'])} events from {path}")
+        return self._recordings[path]
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        parts = ctx.user_content.parts if ctx.user_content and ctx.user_content.parts else []
+        query = "".join(part.text for part in parts if part.text)
+        recording = self._recording_for(query)
+        events = recording["events"]
+        final_state = recording.get("final_state") or {}
+
+        last_complete = max(
+            (index for index, item in enumerate(events) if not item["event"].get("partial")),
+            default=None,
+        )
+        logger.info(f"REPLAY: Replaying {len(events)} events at time scale {self.time_scale}")
+
+        started = time.monotonic()
+        for index, item in enumerate(events):
+            if self.time_scale > 0:
+                delay = started + item["offset"] * self.time_scale - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            event = Event.model_validate(item["event"])
+            event.id = Event.new_id()
+            event.invocation_id = ctx.invocation_id
+            event.timestamp = time.time()
+
+            if index == last_complete and final_state:
+                state_delta = event.actions.state_delta
+                current_state = {**ctx.session.state, **state_delta}
+                state_delta.update({
+                    key: value for key, value in final_state.items()
+                    if current_state.get(key) != value
+                })
+            yield event
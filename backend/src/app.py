@@ -7,11 +7,20 @@ import logging
 from typing import Any, AsyncGenerator
 
 from fastapi import FastAPI, Path
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.config.load_config import load_config
 
-from src.routers import discover_trends
+from src.routers import discover_trends, trends_db
+from src.utils.database import get_db
+from src.utils.genai_client import genai_client
+from src.utils.job_queue import job_manager
+from src.utils.result_cache import result_cache
+from src.utils.category_findings_store import category_findings_store
+from src.utils.service import session_service
+from src.utils.sqlite_session_store import SQLiteSessionService
+from src.utils.warmup import warmup
 from src.utils.setup_log import setup_logger
 
 # Initialize logger
@@ -53,12 +62,39 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
         logger.critical(f"CRITICAL FAILURE: Could not initialize Redis pool: {e}")
         raise RuntimeError("Failed Redis connection") from e
 
+    # Opening the trends database may migrate it (search index, summary tables); keep that off the loop
+    trends_db = await asyncio.to_thread(get_db)
+    logger.info(f"Trends database ready: {trends_db.db_path}")
+
+    await job_manager.start()
+    logger.info(f"Job workers started: {job_manager.workers}")
+
+    # Warm up in the background; GET /ready reports ready once it has finished
+    warmup_task = asyncio.create_task(warmup.run())
+    if (config_data.get("warmup", {}) or {}).get("block_startup", False):
+        await warmup_task
+
     logger.info("Application startup complete.")
     logger.info("=== APPLICATION READY ===")
     yield
 
     logger.info("=== APPLICATION SHUTDOWN ===")
     logger.info("Application shutdown...")
+    if not warmup_task.done():
+        warmup_task.cancel()
+    await job_manager.stop()
+    logger.info("Job workers stopped.")
+    if isinstance(session_service, SQLiteSessionService):
+        # Write the events still buffered by the stopped runs before the process exits
+        await session_service.close()
+        logger.info("Session store flushed and closed.")
+    await genai_client.aclose()
+    logger.info("GenAI client closed.")
+    await asyncio.to_thread(get_db().close)
+    logger.info("Trends database closed.")
+    await asyncio.to_thread(result_cache.flush)
+    await asyncio.to_thread(category_findings_store.flush)
+    logger.info("Result cache and category findings written.")
     logger.info("Application shutdown complete.")
     logger.info("=== APPLICATION STOPPED ===")
 
@@ -87,6 +123,10 @@ def create_app() -> FastAPI:
     logger.info("Including discover_trends router...")
     app_instance.include_router(discover_trends.router)
     logger.info("Discover trends router included successfully.")
+
+    logger.info("Including trends_db router...")
+    app_instance.include_router(trends_db.router)
+    logger.info("Trends database router included successfully.")
     
     logger.info("=== APPLICATION CREATED ===")
     return app_instance
@@ -101,3 +141,11 @@ async def read_root():
     return {"status": "ok"}
 
 
+@app.get("/ready", tags=["Health"])
+async def read_ready():
+    """Readiness endpoint: 200 once startup warmup has finished, 503 before."""
+    status = warmup.status()
+    return JSONResponse(
+        status_code=200 if status["ready"] else 503,
+        content={"status": "ready" if status["ready"] else "warming_up", "warmup": status},
+    )
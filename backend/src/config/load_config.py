@@ -3,7 +3,18 @@ import os
 import yaml
 from dotenv import load_dotenv
 
-load_dotenv()
+_env_loaded = False
+
+
+def load_env():
+    """Load the .env file into the environment, once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+load_env()
 
 
 _config = None
@@ -1,13 +1,13 @@
 import os
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
-import google.auth
-from dotenv import load_dotenv
+from src.config.load_config import load_env
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (no-op if already loaded)
+load_env()
 
 # =============================================================================
 # AUTHENTICATION CONFIGURATION
@@ -23,20 +23,33 @@ if not USE_VERTEX_AI and not GOOGLE_API_KEY:
         "When GOOGLE_GENAI_USE_VERTEXAI=False, GOOGLE_API_KEY must be provided in environment variables"
     )
 
-if USE_VERTEX_AI:
-    try:
-        _, project_id = google.auth.default()
-        os.environ.setdefault(
-            "GOOGLE_CLOUD_PROJECT", str(project_id) if project_id else "unknown"
-        )
-        print(f"✅ Using Vertex AI authentication with project: {project_id}")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not get default credentials: {e}")
-        print("   Please run: gcloud auth application-default login")
-        project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "unknown")
-else:
-    print("✅ Using Google API Key authentication")
-    project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "api-key-mode")
+
+@lru_cache(maxsize=1)
+def resolve_project_id() -> str:
+    """
+    Resolve the Google Cloud project, running ``google.auth.default()`` on first call.
+
+    Credential discovery can take seconds (e.g. metadata server lookups), so it
+    runs when the project is first needed rather than at import.
+    """
+    if USE_VERTEX_AI:
+        try:
+            import google.auth
+
+            _, project_id = google.auth.default()
+            os.environ.setdefault(
+                "GOOGLE_CLOUD_PROJECT", str(project_id) if project_id else "unknown"
+            )
+            print(f"✅ Using Vertex AI authentication with project: {project_id}")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not get default credentials: {e}")
+            print("   Please run: gcloud auth application-default login")
+            project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "unknown")
+    else:
+        print("✅ Using Google API Key authentication")
+        project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "api-key-mode")
+    return str(project_id) if project_id else "unknown"
+
 
 # Set default environment variables for Vertex AI
 if USE_VERTEX_AI:
@@ -62,7 +75,7 @@ class ResearchConfiguration:
         current_date (str): Current date in ISO format.
         use_vertex_ai (bool): Whether to use Vertex AI authentication.
         google_api_key (Optional[str]): Google API key for non-Vertex AI mode.
-        project_id (str): Google Cloud project ID.
+        project_id (str): Google Cloud project ID, resolved on first access.
     """
 
     # Use appropriate model names based on authentication method
@@ -72,7 +85,10 @@ class ResearchConfiguration:
     current_date: str = datetime.now().strftime("%Y-%m-%d")
     use_vertex_ai: bool = USE_VERTEX_AI
     google_api_key: Optional[str] = GOOGLE_API_KEY
-    project_id: str = str(project_id) if project_id else "unknown"
+
+    @property
+    def project_id(self) -> str:
+        return resolve_project_id()
 
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -106,6 +122,6 @@ def print_config_summary():
     print("=" * 60 + "\n")
 
 
-# Print configuration summary on import
-if __name__ != "__main__":
+# The summary is printed at app startup (see src/utils/warmup.py), not on import
+if __name__ == "__main__":
     print_config_summary()
\ No newline at end of file
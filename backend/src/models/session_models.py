@@ -16,6 +16,10 @@ class TrendSendRequest(BaseModel):
     user_id: str
     trend_query: str
     created_at: Optional[datetime] = None
+    force_refresh: bool = Field(default=False, description="Bypass the result cache and run the agents")
+    pipeline_mode: Optional[Literal["sequential", "parallel"]] = Field(default=None, description="Agent pipeline to run; defaults to pipeline.mode in config.yaml")
+    latency_tier: Optional[Literal["fast", "deep"]] = Field(default=None, description="Model tier for the agents; defaults to model_tiers.default_tier in config.yaml")
+    force_all_categories: bool = Field(default=False, description="Run every category agent instead of only those the query router selects (parallel pipeline)")
 
 
 class TrendItem(BaseModel):
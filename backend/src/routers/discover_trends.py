@@ -1,21 +1,180 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from src.models.session_models import TrendSendRequest, SephoraTrendsReport, TrendItem, TrendCategory
 from src.config.load_config import load_config
-from src.utils.service import run_conversation
+from src.utils.service import run_conversation, discovery_flight, session_service, starts_new_run
+from src.utils.result_cache import result_cache
+from src.utils.category_findings_store import category_findings_store
+from src.utils.query_router import query_router
+from src.utils.rate_limiter import gemini_rate_limiter, ModelRateLimitedError
+from src.utils.model_tiers import model_latency
+from src.utils.report_parser import report_parser
+from src.utils.search_tool import search_cache
+from src.utils.genai_client import genai_client
+from src.utils.admission import admission, AdmissionRejectedError
+from src.utils.database import get_db
+from src.utils.sqlite_session_store import SQLiteSessionService
+from src.utils.deadline import (
+    ClientDisconnectedError,
+    DeadlineExceededError,
+    cancel_on_disconnect,
+    cancellation_stats,
+    deadline_config,
+    resolve_deadline,
+)
+from src.utils.job_queue import job_manager, Job, JobQueueFullError
 from src.utils.setup_log import setup_logger
 from src.utils.file_output import save_final_response, create_session_summary
 from pydantic import ValidationError
 from datetime import datetime
+from typing import Literal, Optional
+import asyncio
 import json
 
 logger = setup_logger()
 
 router = APIRouter(prefix="/analysis", tags=["chat"])
 
+def build_trends_response(request: TrendSendRequest, trends_report):
+    """
+    Format an agent trends report for the frontend and persist it to the session folder.
+
+    Args:
+        request: The originating discovery request
+        trends_report: Structured report returned by run_conversation
+
+    Returns:
+        The camelCase response payload, or the raw report if it is not a dict
+
+    Raises:
+        ValueError: If no report was generated
+    """
+    # Check if we got None or empty result
+    if not trends_report:
+        logger.error("ERROR: No trends report generated by agent")
+        raise ValueError("No trends report generated")
+    
+    # If it's a dictionary, extract data directly and format for frontend
+    if isinstance(trends_report, dict):
+        logger.info("=== PROCESSING TRENDS DATA ===")
+        
+        # Extract trends data
+        trends_data = trends_report.get('trends', {})
+        logger.info(f"Trends data structure: {trends_data.keys() if trends_data else 'Empty trends data'}")
+        
+        makeup_trends = trends_data.get('makeup_trends', [])
+        skincare_trends = trends_data.get('skincare_trends', [])
+        hair_trends = trends_data.get('hair_trends', [])
+        tools_brushes_trends = trends_data.get('tools_brushes_trends', [])
+        mini_size_trends = trends_data.get('mini_size_trends', [])
+        men_trends = trends_data.get('men_trends', [])
+        gifts_trends = trends_data.get('gifts_trends', [])
+        fragrance_trends = trends_data.get('fragrance_trends', [])
+        bath_body_trends = trends_data.get('bath_body_trends', [])
+        
+        # Calculate total trends
+        total_trends = (len(makeup_trends) + len(skincare_trends) + len(hair_trends) + 
+                      len(tools_brushes_trends) + len(mini_size_trends) + len(men_trends) +
+                      len(gifts_trends) + len(fragrance_trends) + len(bath_body_trends))
+        
+        logger.info(f"=== EXTRACTED TRENDS SUMMARY ===")
+        logger.info(f"Makeup trends: {len(makeup_trends)} items")
+        logger.info(f"Skincare trends: {len(skincare_trends)} items")
+        logger.info(f"Hair trends: {len(hair_trends)} items")
+        logger.info(f"Tools & Brushes trends: {len(tools_brushes_trends)} items")
+        logger.info(f"Mini Size trends: {len(mini_size_trends)} items")
+        logger.info(f"Men trends: {len(men_trends)} items")
+        logger.info(f"Gifts trends: {len(gifts_trends)} items")
+        logger.info(f"Fragrance trends: {len(fragrance_trends)} items")
+        logger.info(f"Bath & Body trends: {len(bath_body_trends)} items")
+        logger.info(f"Total trends: {total_trends}")
+        
+        # Log sample trend data for debugging
+        if makeup_trends:
+            logger.info(f"Sample makeup trend: {makeup_trends[0].get('trend_name', 'No name')} - {makeup_trends[0].get('id', 'No ID')}")
+        if skincare_trends:
+            logger.info(f"Sample skincare trend: {skincare_trends[0].get('trend_name', 'No name')} - {skincare_trends[0].get('id', 'No ID')}")
+        if hair_trends:
+            logger.info(f"Sample hair trend: {hair_trends[0].get('trend_name', 'No name')} - {hair_trends[0].get('id', 'No ID')}")
+        
+        # Create response dictionary directly without Pydantic validation
+        logger.info("=== BUILDING RESPONSE DATA ===")
+        response_data = {
+            "reportSummary": trends_report.get("report_summary", "No summary available"),
+            "trends": {
+                "makeupTrends": makeup_trends,
+                "skincareTrends": skincare_trends,
+                "hairTrends": hair_trends,
+                "toolsBrushesTrends": tools_brushes_trends,
+                "miniSizeTrends": mini_size_trends,
+                "menTrends": men_trends,
+                "giftsTrends": gifts_trends,
+                "fragranceTrends": fragrance_trends,
+                "bathBodyTrends": bath_body_trends
+            },
+            "discoveryDate": trends_report.get("discovery_date", datetime.utcnow().strftime("%Y-%m-%d")),
+            "totalTrendsFound": total_trends
+        }
+        
+        logger.info(f"=== RESPONSE READY ===")
+        logger.info(f"Response contains {total_trends} total trends")
+        logger.info(f"Report summary length: {len(response_data.get('reportSummary', ''))}")
+        logger.info(f"Discovery date: {response_data.get('discoveryDate')}")
+        
+        # Save final response to file and export to CSV/Excel
+        config_data = load_config()
+        output_dir = config_data.get("output_folder", {}).get("OUTPUT_DIR", "src/data/outputs")
+        response_file = save_final_response(
+            response_data, 
+            request.session_id, 
+            request.user_id,
+            request.trend_query,  # Pass the query for metadata
+            output_dir
+        )
+        logger.info(f"Final response saved to: {response_file}")
+        
+        # Create session summary with all files
+        summary_file = create_session_summary(
+            request.session_id,
+            request.user_id,
+            request.trend_query,
+            output_dir
+        )
+        logger.info(f"Session summary created: {summary_file}")
+        
+        logger.info("=== RETURNING TRENDS DATA TO CLIENT ===")
+        
+        return response_data
+        
+    logger.info("=== RETURNING RAW TRENDS REPORT ===")
+    return trends_report
+
+
+# Clients may set their own deadline (seconds) with this header
+DEADLINE_HEADER = deadline_config.get("header", "X-Request-Timeout")
+
+# Non-standard status (as used by nginx) logged for requests whose client went away
+CLIENT_CLOSED_REQUEST = 499
+
+
+def _rejected_exception(e: AdmissionRejectedError) -> HTTPException:
+    """HTTP error for a request turned away by admission control."""
+    return HTTPException(
+        status_code=e.status_code,
+        detail="Trend discovery is at capacity. Please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
 @router.post("/")
-async def chat(request: TrendSendRequest):
+async def chat(request: TrendSendRequest, http_request: Request):
     """
     Process a query and return multiple beauty trends.
+
+    The run is cancelled if the client disconnects or the request deadline
+    (``X-Request-Timeout`` header, else ``deadlines.default_seconds``) passes.
+    Requests that need a new agent run queue for admission, or get 429/503 with
+    ``Retry-After``; cached reports and runs already in flight are served without.
     """
     logger.info("=== TREND DISCOVERY REQUEST RECEIVED ===")
     logger.info(f"Session ID: {request.session_id}")
@@ -25,110 +184,14 @@ async def chat(request: TrendSendRequest):
     
     try:
         logger.info("=== STARTING AGENT CONVERSATION ===")
-        trends_report = await run_conversation(request)
+        deadline = resolve_deadline(http_request.headers.get(DEADLINE_HEADER))
+        trends_report = await cancel_on_disconnect(http_request, run_conversation(request, deadline=deadline, admit=True))
         logger.info(f"=== AGENT CONVERSATION COMPLETED ===")
         logger.info(f"Received trends report type: {type(trends_report)}")
         logger.info(f"Received trends report keys: {trends_report.keys() if isinstance(trends_report, dict) else 'Not a dict'}")
         
-        # Check if we got None or empty result
-        if not trends_report:
-            logger.error("ERROR: No trends report generated by agent")
-            raise ValueError("No trends report generated")
-        
-        # If it's a dictionary, extract data directly and format for frontend
-        if isinstance(trends_report, dict):
-            logger.info("=== PROCESSING TRENDS DATA ===")
-            
-            # Extract trends data
-            trends_data = trends_report.get('trends', {})
-            logger.info(f"Trends data structure: {trends_data.keys() if trends_data else 'Empty trends data'}")
-            
-            makeup_trends = trends_data.get('makeup_trends', [])
-            skincare_trends = trends_data.get('skincare_trends', [])
-            hair_trends = trends_data.get('hair_trends', [])
-            tools_brushes_trends = trends_data.get('tools_brushes_trends', [])
-            mini_size_trends = trends_data.get('mini_size_trends', [])
-            men_trends = trends_data.get('men_trends', [])
-            gifts_trends = trends_data.get('gifts_trends', [])
-            fragrance_trends = trends_data.get('fragrance_trends', [])
-            bath_body_trends = trends_data.get('bath_body_trends', [])
-            
-            # Calculate total trends
-            total_trends = (len(makeup_trends) + len(skincare_trends) + len(hair_trends) + 
-                          len(tools_brushes_trends) + len(mini_size_trends) + len(men_trends) +
-                          len(gifts_trends) + len(fragrance_trends) + len(bath_body_trends))
-            
-            logger.info(f"=== EXTRACTED TRENDS SUMMARY ===")
-            logger.info(f"Makeup trends: {len(makeup_trends)} items")
-            logger.info(f"Skincare trends: {len(skincare_trends)} items")
-            logger.info(f"Hair trends: {len(hair_trends)} items")
-            logger.info(f"Tools & Brushes trends: {len(tools_brushes_trends)} items")
-            logger.info(f"Mini Size trends: {len(mini_size_trends)} items")
-            logger.info(f"Men trends: {len(men_trends)} items")
-            logger.info(f"Gifts trends: {len(gifts_trends)} items")
-            logger.info(f"Fragrance trends: {len(fragrance_trends)} items")
-            logger.info(f"Bath & Body trends: {len(bath_body_trends)} items")
-            logger.info(f"Total trends: {total_trends}")
-            
-            # Log sample trend data for debugging
-            if makeup_trends:
-                logger.info(f"Sample makeup trend: {makeup_trends[0].get('trend_name', 'No name')} - {makeup_trends[0].get('id', 'No ID')}")
-            if skincare_trends:
-                logger.info(f"Sample skincare trend: {skincare_trends[0].get('trend_name', 'No name')} - {skincare_trends[0].get('id', 'No ID')}")
-            if hair_trends:
-                logger.info(f"Sample hair trend: {hair_trends[0].get('trend_name', 'No name')} - {hair_trends[0].get('id', 'No ID')}")
-            
-            # Create response dictionary directly without Pydantic validation
-            logger.info("=== BUILDING RESPONSE DATA ===")
-            response_data = {
-                "reportSummary": trends_report.get("report_summary", "No summary available"),
-                "trends": {
-                    "makeupTrends": makeup_trends,
-                    "skincareTrends": skincare_trends,
-                    "hairTrends": hair_trends,
-                    "toolsBrushesTrends": tools_brushes_trends,
-                    "miniSizeTrends": mini_size_trends,
-                    "menTrends": men_trends,
-                    "giftsTrends": gifts_trends,
-                    "fragranceTrends": fragrance_trends,
-                    "bathBodyTrends": bath_body_trends
-                },
-                "discoveryDate": trends_report.get("discovery_date", datetime.utcnow().strftime("%Y-%m-%d")),
-                "totalTrendsFound": total_trends
-            }
-            
-            logger.info(f"=== RESPONSE READY ===")
-            logger.info(f"Response contains {total_trends} total trends")
-            logger.info(f"Report summary length: {len(response_data.get('reportSummary', ''))}")
-            logger.info(f"Discovery date: {response_data.get('discoveryDate')}")
-            
-            # Save final response to file and export to CSV/Excel
-            config_data = load_config()
-            output_dir = config_data.get("output_folder", {}).get("OUTPUT_DIR", "src/data/outputs")
-            response_file = save_final_response(
-                response_data, 
-                request.session_id, 
-                request.user_id,
-                request.trend_query,  # Pass the query for metadata
-                output_dir
-            )
-            logger.info(f"Final response saved to: {response_file}")
-            
-            # Create session summary with all files
-            summary_file = create_session_summary(
-                request.session_id,
-                request.user_id,
-                request.trend_query,
-                output_dir
-            )
-            logger.info(f"Session summary created: {summary_file}")
-            
-            logger.info("=== RETURNING TRENDS DATA TO CLIENT ===")
-            
-            return response_data
-            
-        logger.info("=== RETURNING RAW TRENDS REPORT ===")
-        return trends_report
+        # File export and the trends database write are blocking; keep them off the event loop
+        return await asyncio.to_thread(build_trends_response, request, trends_report)
         
     except ValidationError as ve:
         logger.error(f"Pydantic validation error: {ve}")
@@ -138,6 +201,24 @@ async def chat(request: TrendSendRequest):
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=error_msg
         )
+    except AdmissionRejectedError as e:
+        raise _rejected_exception(e)
+    except DeadlineExceededError as e:
+        logger.error(f"Deadline exceeded in chat endpoint: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Trend discovery did not finish in time ({e.stage}). Please retry or allow a longer timeout.",
+        )
+    except ClientDisconnectedError as e:
+        logger.info(f"Client for session {request.session_id} disconnected; run cancelled")
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail=str(e))
+    except ModelRateLimitedError as e:
+        logger.error(f"Model rate limit exhausted in chat endpoint: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The trend research models are at capacity. Please retry shortly.",
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.5)))},
+        )
     except Exception as e:
         config_data = load_config()
         error_msg = config_data.get('error_messages', {}).get('technical_issue', f"Error: {str(e)}")
@@ -145,4 +226,190 @@ async def chat(request: TrendSendRequest):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=error_msg
-        )
\ No newline at end of file
+        )
+
+
+async def _run_discovery_job(request: TrendSendRequest, job: Job):
+    """Job handler: run discovery, reporting stage changes on the job."""
+    def on_progress(event):
+        if event.get("type") == "stage":
+            job.set_stage(event["stage"])
+
+    trends_report = await run_conversation(request, progress_callback=on_progress)
+    job.set_stage("persisting")
+    # File and CSV/Excel export is blocking; keep it off the event loop shared by other workers
+    return await asyncio.to_thread(build_trends_response, request, trends_report)
+
+
+job_manager.set_handler(_run_discovery_job)
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: TrendSendRequest):
+    """
+    Enqueue a trend discovery request and return its job id immediately.
+    """
+    logger.info("=== TREND DISCOVERY JOB SUBMITTED ===")
+    logger.info(f"Session ID: {request.session_id}")
+    logger.info(f"User ID: {request.user_id}")
+    logger.info(f"Trend Query: '{request.trend_query}'")
+
+    try:
+        job = job_manager.submit(request)
+    except JobQueueFullError as e:
+        logger.warning(f"Rejecting job submission: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "30"},
+        )
+
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "stage": job.stage,
+        "status_url": f"{router.prefix}/jobs/{job.job_id}",
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Return the status, current stage and (when finished) the result of a discovery job.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    return job.to_dict()
+
+
+def _format_sse(event_type: str, data) -> str:
+    """Encode one Server-Sent Events message."""
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/stream")
+async def stream_trends(
+    http_request: Request,
+    session_id: str = Query(..., description="Session identifier"),
+    user_id: str = Query(..., description="User identifier"),
+    trend_query: str = Query(..., min_length=1, description="Trend query"),
+    force_refresh: bool = Query(False, description="Bypass the result cache"),
+    pipeline_mode: Optional[Literal["sequential", "parallel"]] = Query(None, description="Agent pipeline to run"),
+    force_all_categories: bool = Query(False, description="Run every category agent in the parallel pipeline"),
+    latency_tier: Optional[Literal["fast", "deep"]] = Query(None, description="Model tier for the agents"),
+):
+    """
+    Stream trend discovery progress as Server-Sent Events.
+
+    Emits ``stage`` and ``agent`` events as the pipeline advances, a ``routing`` event
+    with the categories selected in parallel mode, ``text`` events with
+    research output as it is generated, ``sources`` events when research sources are
+    collected, a ``search_stats`` event with the run's search tool counters, and a final
+    ``report`` event with the same payload as ``POST /analysis/``. Closing the stream
+    cancels the run; past the request deadline an ``error`` event is sent.
+    Returns 429 with ``Retry-After`` when a new run is needed and the admission
+    queue is already full.
+    """
+    request = TrendSendRequest(
+        session_id=session_id,
+        user_id=user_id,
+        trend_query=trend_query,
+        created_at=datetime.utcnow(),
+        force_refresh=force_refresh,
+        pipeline_mode=pipeline_mode,
+        force_all_categories=force_all_categories,
+        latency_tier=latency_tier,
+    )
+    logger.info("=== TREND DISCOVERY STREAM REQUESTED ===")
+    logger.info(f"Session ID: {request.session_id}")
+    logger.info(f"User ID: {request.user_id}")
+    logger.info(f"Trend Query: '{request.trend_query}'")
+
+    config_data = load_config()
+    keepalive_seconds = config_data.get("streaming", {}).get("keepalive_seconds", 15)
+    deadline = resolve_deadline(http_request.headers.get(DEADLINE_HEADER))
+    try:
+        if starts_new_run(request):
+            admission.check()
+    except AdmissionRejectedError as e:
+        raise _rejected_exception(e)
+
+    async def event_stream():
+        progress_queue: asyncio.Queue = asyncio.Queue()
+        run_task = asyncio.create_task(
+            run_conversation(request, progress_callback=progress_queue.put_nowait, deadline=deadline, admit=True)
+        )
+        try:
+            yield _format_sse("stage", {"type": "stage", "stage": "queued"})
+            while not (run_task.done() and progress_queue.empty()):
+                next_event = asyncio.ensure_future(progress_queue.get())
+                done, _ = await asyncio.wait(
+                    {next_event, run_task},
+                    timeout=keepalive_seconds,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if next_event in done:
+                    event = next_event.result()
+                    yield _format_sse(event.get("type", "message"), event)
+                    continue
+                next_event.cancel()
+                if not done:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+
+            trends_report = run_task.result()
+            yield _format_sse("stage", {"type": "stage", "stage": "persisting"})
+            response_data = await asyncio.to_thread(build_trends_response, request, trends_report)
+            logger.info("=== STREAMING FINAL REPORT TO CLIENT ===")
+            yield _format_sse("report", {"type": "report", "report": response_data})
+        except AdmissionRejectedError as e:
+            yield _format_sse("error", {"type": "error", "detail": str(e), "retry_after": e.retry_after})
+        except DeadlineExceededError as e:
+            logger.error(f"Deadline exceeded in trend stream: {e}")
+            yield _format_sse("error", {"type": "error", "detail": f"Trend discovery did not finish in time ({e.stage})."})
+        except Exception as e:
+            logger.error(f"Error in trend stream: {e}")
+            error_msg = config_data.get('error_messages', {}).get('technical_issue', f"Error: {str(e)}")
+            yield _format_sse("error", {"type": "error", "detail": error_msg})
+        finally:
+            if not run_task.done():
+                logger.info(f"Stream for session {request.session_id} closed before the run finished")
+                cancellation_stats.record_caller("disconnect")
+                run_task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Return runtime metrics for the trend discovery pipeline.
+    """
+    if isinstance(session_service, SQLiteSessionService):
+        session_stats = await asyncio.to_thread(session_service.stats)
+    else:
+        session_stats = session_service.stats()
+    return {
+        "result_cache": result_cache.stats(),
+        "single_flight": discovery_flight.stats(),
+        "jobs": job_manager.stats(),
+        "category_findings": category_findings_store.stats(),
+        "query_router": query_router.stats(),
+        "rate_limiter": gemini_rate_limiter.stats(),
+        "model_latency": model_latency.stats(),
+        "report_parser": report_parser.stats(),
+        "search_tool": search_cache.stats(),
+        "session_store": session_stats,
+        "genai_client": genai_client.stats(),
+        "cancellations": cancellation_stats.stats(),
+        "admission": admission.stats(),
+        "trends_db": get_db().stats(),
+    }
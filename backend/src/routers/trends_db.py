@@ -1,22 +1,104 @@
-"""Router for database trend queries and statistics."""
+"""Router for database trend queries and statistics.
 
-from fastapi import APIRouter, HTTPException, Query, status
-from typing import List, Dict, Any, Optional
-from src.utils.database import db
+Database calls run on the trends database's thread pools (``get_db().read`` /
+``get_db().write``), not on the event loop.
+
+The listing endpoints (session, recent, category) are paged by cursor: each page
+returns a ``next_cursor`` to pass as ``cursor`` for the next one. With
+``Accept: application/x-ndjson`` they instead stream every trend from the cursor
+on, one JSON object per line, read from the database a batch at a time.
+"""
+
+import functools
+import json
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.config.load_config import load_config
+from src.utils.database import decode_cursor, encode_cursor, get_db
 from src.utils.setup_log import setup_logger
 
 logger = setup_logger()
 
 router = APIRouter(prefix="/trends", tags=["trends"])
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+stream_batch_size = (load_config().get("trends_db", {}) or {}).get("stream_batch_size", 500)
+
+CURSOR_QUERY = Query(None, description="next_cursor of the previous page")
+
+
+def _after(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Decode the ``cursor`` query parameter, rejecting a malformed one with a 400."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _wants_ndjson(http_request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in http_request.headers.get("accept", "")
+
+
+async def _page(
+    fetch: Callable[..., List[Dict[str, Any]]], limit: int, after: Optional[Tuple[str, int]]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Read one page; fetching one extra row tells whether there is a next page."""
+    trends = await get_db().read(fetch, limit + 1, after=after)
+    next_cursor = encode_cursor(trends[limit - 1]) if len(trends) > limit else None
+    return trends[:limit], next_cursor
+
+
+def _ndjson_response(
+    fetch: Callable[..., List[Dict[str, Any]]], first_batch: List[Dict[str, Any]]
+) -> StreamingResponse:
+    """
+    Stream ``first_batch`` and every following batch as NDJSON.
+
+    Each line carries the trend's ``cursor``, so a client that lost the
+    connection can resume after the last line it received.
+    """
+    async def lines():
+        batch = first_batch
+        while True:
+            for trend in batch:
+                yield json.dumps({**trend, "cursor": encode_cursor(trend)}, ensure_ascii=False, default=str) + "\n"
+            if len(batch) < stream_batch_size:
+                return
+            batch = await get_db().read(fetch, stream_batch_size, after=(batch[-1]["created_at"], batch[-1]["id"]))
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
 @router.get("/session/{session_id}")
-async def get_session_trends(session_id: str):
-    """Get all trends for a specific session."""
+async def get_session_trends(
+    session_id: str,
+    http_request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = CURSOR_QUERY
+):
+    """Get the trends of a specific session, oldest first."""
     try:
+        db = get_db()
         logger.info(f"Fetching trends for session: {session_id}")
-        trends = db.get_session_trends(session_id)
+        after = _after(cursor)
+        fetch = functools.partial(db.get_session_trends, session_id)
+        
+        if _wants_ndjson(http_request):
+            first_batch = await db.read(fetch, stream_batch_size, after=after)
+            if not first_batch and not after:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No trends found for session {session_id}"
+                )
+            return _ndjson_response(fetch, first_batch)
         
-        if not trends:
+        trends, next_cursor = await _page(fetch, limit, after)
+        
+        if not trends and not after:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No trends found for session {session_id}"
@@ -26,9 +108,13 @@ async def get_session_trends(session_id: str):
         return {
             "session_id": session_id,
             "total_trends": len(trends),
+            "limit": limit,
+            "next_cursor": next_cursor,
             "trends": trends
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching session trends: {e}")
         raise HTTPException(
@@ -37,19 +123,33 @@ async def get_session_trends(session_id: str):
         )
 
 @router.get("/recent")
-async def get_recent_trends(limit: int = Query(50, ge=1, le=200)):
-    """Get recent trends across all sessions."""
+async def get_recent_trends(
+    http_request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = CURSOR_QUERY
+):
+    """Get recent trends across all sessions, newest first."""
     try:
+        db = get_db()
         logger.info(f"Fetching {limit} recent trends")
-        trends = db.get_recent_trends(limit)
+        after = _after(cursor)
+        
+        if _wants_ndjson(http_request):
+            first_batch = await db.read(db.get_recent_trends, stream_batch_size, after=after)
+            return _ndjson_response(db.get_recent_trends, first_batch)
+        
+        trends, next_cursor = await _page(db.get_recent_trends, limit, after)
         
         logger.info(f"Found {len(trends)} recent trends")
         return {
             "total_trends": len(trends),
             "limit": limit,
+            "next_cursor": next_cursor,
             "trends": trends
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching recent trends: {e}")
         raise HTTPException(
@@ -60,14 +160,29 @@ async def get_recent_trends(limit: int = Query(50, ge=1, le=200)):
 @router.get("/category/{category}")
 async def get_trends_by_category(
     category: str,
-    limit: int = Query(20, ge=1, le=100)
+    http_request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = CURSOR_QUERY
 ):
-    """Get trends by category."""
+    """Get trends by category, newest first."""
     try:
+        db = get_db()
         logger.info(f"Fetching {limit} trends for category: {category}")
-        trends = db.get_trends_by_category(category, limit)
+        after = _after(cursor)
+        fetch = functools.partial(db.get_trends_by_category, category)
+        
+        if _wants_ndjson(http_request):
+            first_batch = await db.read(fetch, stream_batch_size, after=after)
+            if not first_batch and not after:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No trends found for category {category}"
+                )
+            return _ndjson_response(fetch, first_batch)
         
-        if not trends:
+        trends, next_cursor = await _page(fetch, limit, after)
+        
+        if not trends and not after:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No trends found for category {category}"
@@ -78,9 +193,12 @@ async def get_trends_by_category(
             "category": category,
             "total_trends": len(trends),
             "limit": limit,
+            "next_cursor": next_cursor,
             "trends": trends
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching category trends: {e}")
         raise HTTPException(
@@ -94,39 +212,11 @@ async def search_trends(
     category: Optional[str] = Query(None, description="Filter by category"),
     limit: int = Query(20, ge=1, le=100)
 ):
-    """Search trends by name or description."""
+    """Search trends by name, description, summary, keywords and hashtags, best match first."""
     try:
+        db = get_db()
         logger.info(f"Searching trends with query: '{q}', category: {category}, limit: {limit}")
-        
-        # Since we don't have a full-text search in basic SQLite, we'll use a simple LIKE query
-        import sqlite3
-        
-        with sqlite3.connect(db.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Build query based on filters
-            if category:
-                cursor.execute("""
-                    SELECT t.*, s.user_id 
-                    FROM trends t
-                    JOIN sessions s ON t.session_id = s.session_id
-                    WHERE (t.trend_name LIKE ? OR t.trend_description LIKE ? OR t.trend_summary LIKE ?)
-                    AND t.category = ?
-                    ORDER BY t.created_at DESC
-                    LIMIT ?
-                """, (f"%{q}%", f"%{q}%", f"%{q}%", category, limit))
-            else:
-                cursor.execute("""
-                    SELECT t.*, s.user_id 
-                    FROM trends t
-                    JOIN sessions s ON t.session_id = s.session_id
-                    WHERE t.trend_name LIKE ? OR t.trend_description LIKE ? OR t.trend_summary LIKE ?
-                    ORDER BY t.created_at DESC
-                    LIMIT ?
-                """, (f"%{q}%", f"%{q}%", f"%{q}%", limit))
-            
-            trends = [dict(row) for row in cursor.fetchall()]
+        trends = await db.read(db.search_trends, q, category=category, limit=limit)
         
         logger.info(f"Found {len(trends)} trends matching search")
         return {
@@ -148,8 +238,9 @@ async def search_trends(
 async def get_database_stats():
     """Get database statistics."""
     try:
+        db = get_db()
         logger.info("Fetching database statistics")
-        stats = db.get_database_stats()
+        stats = await db.read(db.get_database_stats)
         
         logger.info(f"Database stats: {stats}")
         return stats
@@ -165,19 +256,10 @@ async def get_database_stats():
 async def get_available_categories():
     """Get list of all available categories."""
     try:
+        db = get_db()
         logger.info("Fetching available categories")
         
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT category, COUNT(*) as trend_count
-                FROM trends
-                GROUP BY category
-                ORDER BY trend_count DESC
-            """)
-            
-            categories = [{"category": row[0], "trend_count": row[1]} for row in cursor.fetchall()]
+        categories = await db.read(db.get_categories)
         
         logger.info(f"Found {len(categories)} categories")
         return {
@@ -196,34 +278,12 @@ async def get_available_categories():
 async def delete_session_trends(session_id: str):
     """Delete all trends and session data for a specific session."""
     try:
+        db = get_db()
         logger.info(f"Deleting session data for: {session_id}")
         
-        import sqlite3
-        with sqlite3.connect(db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Delete trend details first (foreign key constraint)
-            cursor.execute("""
-                DELETE FROM trend_details 
-                WHERE trend_id IN (
-                    SELECT id FROM trends WHERE session_id = ?
-                )
-            """, (session_id,))
-            
-            # Delete trends
-            cursor.execute("DELETE FROM trends WHERE session_id = ?", (session_id,))
-            trends_deleted = cursor.rowcount
-            
-            # Delete session categories
-            cursor.execute("DELETE FROM session_categories WHERE session_id = ?", (session_id,))
-            
-            # Delete session
-            cursor.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-            session_deleted = cursor.rowcount
-            
-            conn.commit()
-        
-        if session_deleted == 0:
+        trends_deleted = await db.write(db.delete_session, session_id)
+        
+        if trends_deleted is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Session {session_id} not found"
@@ -236,6 +296,8 @@ async def delete_session_trends(session_id: str):
             "message": "Session data deleted successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting session: {e}")
         raise HTTPException(
@@ -0,0 +1,224 @@
+"""Admission control for the discovery endpoints.
+
+Each agent run holds memory, model quota and file handles for minutes, so
+``POST /analysis/`` and ``GET /analysis/stream`` admit at most
+``admission.max_in_flight`` requests at a time. Further requests wait in a
+bounded FIFO queue for up to ``max_wait_seconds``; when the queue is full they
+are rejected immediately (429) and when their wait runs out they get a 503,
+both with a ``Retry-After`` estimated from recent run durations.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+from src.config.load_config import load_config
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is not admitted.
+
+    Attributes:
+        reason (str): "queue_full" or "queue_timeout".
+        status_code (int): HTTP status to answer with.
+        retry_after (int): Seconds the client should wait before retrying.
+    """
+
+    def __init__(self, message: str, reason: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Caps concurrent discovery requests, with a bounded FIFO wait queue.
+
+    A finished request hands its slot straight to the longest-waiting one, so
+    new arrivals cannot overtake the queue. State is only touched from the event
+    loop, so no lock is needed.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_in_flight: int = 8,
+        max_queue: int = 32,
+        max_wait_seconds: float = 30,
+        queue_full_status: int = 429,
+        queue_timeout_status: int = 503,
+        default_retry_after_seconds: int = 30,
+        window: int = 200,
+    ):
+        self.enabled = enabled
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait_seconds = max_wait_seconds
+        self.queue_full_status = queue_full_status
+        self.queue_timeout_status = queue_timeout_status
+        self.default_retry_after_seconds = default_retry_after_seconds
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._queued = 0
+        self._rejected = {"queue_full": 0, "queue_timeout": 0}
+        self._max_queue_depth_seen = 0
+        self._wait_seconds: Deque[float] = deque(maxlen=window)
+        self._hold_seconds: Deque[float] = deque(maxlen=window)
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "AdmissionController":
+        """Build the controller from the ``admission`` section of config.yaml."""
+        admission_config = config_data.get("admission", {}) or {}
+        return cls(
+            enabled=admission_config.get("enabled", True),
+            max_in_flight=admission_config.get("max_in_flight", 8),
+            max_queue=admission_config.get("max_queue", 32),
+            max_wait_seconds=admission_config.get("max_wait_seconds", 30),
+            queue_full_status=admission_config.get("queue_full_status", 429),
+            queue_timeout_status=admission_config.get("queue_timeout_status", 503),
+            default_retry_after_seconds=admission_config.get("default_retry_after_seconds", 30),
+        )
+
+    @asynccontextmanager
+    async def admit(self, max_wait_seconds: Optional[float] = None):
+        """
+        Hold an admission slot for the duration of a request.
+
+        Args:
+            max_wait_seconds: Cap on the queue wait, e.g. the request's remaining
+                deadline; the configured ``max_wait_seconds`` applies if lower
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait ran out
+        """
+        if not self.enabled:
+            yield
+            return
+
+        await self._acquire(max_wait_seconds)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_seconds.append(time.monotonic() - started)
+            self._release()
+
+    def check(self) -> None:
+        """
+        Reject now if a new request could not even queue.
+
+        For endpoints that must choose their response status before doing any
+        work (the SSE stream); they still go through ``admit`` afterwards.
+        """
+        if self.enabled and self._in_flight >= self.max_in_flight and len(self._waiters) >= self.max_queue:
+            raise self._rejection("queue_full")
+
+    def retry_after(self) -> int:
+        """Estimate when a slot frees up: the queue ahead drained at the recent request rate."""
+        if not self._hold_seconds:
+            return self.default_retry_after_seconds
+        mean_hold = sum(self._hold_seconds) / len(self._hold_seconds)
+        rounds = (len(self._waiters) + 1) / self.max_in_flight
+        return max(1, math.ceil(mean_hold * rounds))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get slot usage, queue depth, wait times and rejection counters."""
+        waits = sorted(self._wait_seconds)
+        return {
+            "enabled": self.enabled,
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "max_queue_depth_seen": self._max_queue_depth_seen,
+            "admitted": self._admitted,
+            "queued": self._queued,
+            "rejected": dict(self._rejected),
+            "wait_seconds_p50": round(_percentile(waits, 0.50), 3) if waits else None,
+            "wait_seconds_p95": round(_percentile(waits, 0.95), 3) if waits else None,
+            "wait_seconds_max": round(waits[-1], 3) if waits else None,
+            "retry_after_seconds": self.retry_after(),
+        }
+
+    async def _acquire(self, max_wait_seconds: Optional[float]) -> None:
+        """Take a free slot, or queue for one until handed over or the wait runs out."""
+        started = time.monotonic()
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._record_admitted(started)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._rejection("queue_full")
+
+        timeout = self.max_wait_seconds
+        if max_wait_seconds is not None:
+            timeout = max_wait_seconds if timeout is None else min(timeout, max_wait_seconds)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued += 1
+        self._max_queue_depth_seen = max(self._max_queue_depth_seen, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            handed_over = waiter.done() and not waiter.cancelled()
+            if handed_over and isinstance(e, asyncio.TimeoutError):
+                # The slot was handed over just as the wait ran out; the request holds it now
+                self._record_admitted(started)
+                return
+            if handed_over:
+                # Cancelled after the handover; pass the slot on
+                self._release()
+            else:
+                waiter.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._rejection("queue_timeout") from None
+            raise
+        self._record_admitted(started)
+
+    def _release(self) -> None:
+        """Hand the slot to the next live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _record_admitted(self, started: float) -> None:
+        self._admitted += 1
+        self._wait_seconds.append(time.monotonic() - started)
+
+    def _rejection(self, reason: str) -> AdmissionRejectedError:
+        self._rejected[reason] += 1
+        retry_after = self.retry_after()
+        status_code = self.queue_full_status if reason == "queue_full" else self.queue_timeout_status
+        logger.warning(
+            f"ADMISSION: Rejected request ({reason}), {self._in_flight} in flight, "
+            f"{len(self._waiters)} queued, retry after {retry_after}s"
+        )
+        return AdmissionRejectedError(
+            f"Trend discovery is at capacity ({reason.replace('_', ' ')})",
+            reason=reason,
+            status_code=status_code,
+            retry_after=retry_after,
+        )
+
+
+def _percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+admission = AdmissionController.from_config(load_config())
@@ -1,10 +1,13 @@
 import re
 import logging
+from typing import Optional
 from difflib import SequenceMatcher
 
 from google.adk.agents.callback_context import CallbackContext
 from google.genai import types as genai_types
 from src.utils.setup_log import setup_logger
+from src.utils.report_parser import report_parser
+from src.utils.search_tool import recorded_sources, source_short_id
 
 # Setup logger for callbacks
 logger = setup_logger()
@@ -92,7 +95,9 @@ def collect_research_sources_callback(
     This function processes the agent's `session.events` to extract web source details (URLs,
     titles, domains from `grounding_chunks`) and associated text segments with confidence scores
     (from `grounding_supports`). The aggregated source information and a mapping of URLs to short
-    IDs are cumulatively stored in `callback_context.state`.
+    IDs are cumulatively stored in `callback_context.state`. Short IDs are derived from the URL,
+    so concurrent category agents assign the same ID to the same source, and sources recorded
+    by the caching search tool (``source:<short_id>`` keys) are merged in for citation.
 
     Args:
         callback_context (CallbackContext): The context object providing access to the agent's
@@ -106,7 +111,6 @@ def collect_research_sources_callback(
     session = callback_context._invocation_context.session
     url_to_short_id = callback_context.state.get("url_to_short_id", {})
     sources = callback_context.state.get("sources", {})
-    id_counter = len(url_to_short_id) + 1
     for event in session.events:
         if not (event.grounding_metadata and event.grounding_metadata.grounding_chunks):
             continue
@@ -121,7 +125,7 @@ def collect_research_sources_callback(
                 else chunk.web.domain
             )
             if url not in url_to_short_id:
-                short_id = f"src-{id_counter}"
+                short_id = source_short_id(url)
                 url_to_short_id[url] = short_id
                 sources[short_id] = {
                     "short_id": short_id,
@@ -130,7 +134,6 @@ def collect_research_sources_callback(
                     "domain": chunk.web.domain,
                     "supported_claims": [],
                 }
-                id_counter += 1
             chunks_info[idx] = url_to_short_id[url]
         if event.grounding_metadata.grounding_supports:
             for support in event.grounding_metadata.grounding_supports:
@@ -159,10 +162,11 @@ def collect_research_sources_callback(
 
     # First, add citation tags to the report based on supported claims
     report_with_citations = add_citations_to_report(research_report, sources)
+    citable_sources = {**recorded_sources(callback_context.state), **sources}
 
     def tag_replacer(match: re.Match) -> str:
         short_id = match.group(1)
-        if not (source_info := sources.get(short_id)):
+        if not (source_info := citable_sources.get(short_id)):
             logging.warning(f"Invalid citation tag found and removed: {match.group(0)}")
             return ""
         display_text = source_info.get("title", source_info.get("domain", short_id))
@@ -214,3 +218,28 @@ def output_composer_callback(
     return genai_types.Content(parts=[genai_types.Part(text="Output composition completed")])
 
 
+def local_structuring_callback(
+    callback_context: CallbackContext,
+) -> Optional[genai_types.Content]:
+    """Structures the research findings locally so the output composer LLM call can be skipped.
+
+    Runs before the output composer agent. If the findings parse and validate as a
+    ``SephoraTrendsReport``, the report is returned as the agent's content in the same
+    camelCase JSON the model would produce, which ends the agent without a model call.
+    Otherwise returns None and the output composer runs as usual.
+
+    Args:
+        callback_context (CallbackContext): The context object providing access to the agent's
+            persistent state.
+    """
+    trends_report = report_parser.parse(callback_context.state.to_dict())
+    if trends_report is None:
+        return None
+
+    logger.info("OUTPUT COMPOSER: Research findings structured locally, skipping the model call")
+    callback_context.state["sephora_trends_report"] = trends_report.model_dump(exclude_none=True)
+    callback_context.state["report_structuring"] = "local"
+    return genai_types.Content(
+        role="model",
+        parts=[genai_types.Part(text=trends_report.model_dump_json(by_alias=True, exclude_none=True))],
+    )
@@ -0,0 +1,197 @@
+"""Per-category findings store for the parallel category pipeline.
+
+Each category agent writes ``<category>_category_findings`` into session state.
+This store keeps those findings, with the search sources the agent found, per
+(normalized query, category) with a TTL per category, so a refresh only re-runs
+the categories whose findings are stale.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from src.config.load_config import load_config
+from src.utils.json_persist import DebouncedJSONWriter
+from src.utils.result_cache import normalize_query
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class CategoryFindingsStore:
+    """
+    TTL store of category research findings with JSON persistence.
+
+    TTLs are configured per category (e.g. Fragrance weekly, Makeup daily) with a
+    default for categories that are not listed. The JSON file is rewritten by a
+    background thread at most once per ``persist_delay_seconds``.
+    """
+
+    def __init__(
+        self,
+        default_ttl_hours: float = 24,
+        ttl_hours: Optional[Dict[str, float]] = None,
+        max_entries: int = 2000,
+        persist_path: Optional[str] = None,
+        enabled: bool = True,
+        persist_delay_seconds: float = 1.0,
+    ):
+        self.default_ttl_hours = default_ttl_hours
+        self.ttl_hours = ttl_hours or {}
+        self.max_entries = max_entries
+        self.persist_path = os.path.abspath(persist_path) if persist_path else None
+        self.enabled = enabled
+
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._writer = (
+            DebouncedJSONWriter(self.persist_path, self._snapshot, persist_delay_seconds, "CATEGORY FINDINGS")
+            if self.persist_path else None
+        )
+
+        if self.enabled and self.persist_path:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "CategoryFindingsStore":
+        """Build a store from the ``category_findings`` section of config.yaml."""
+        store_config = config_data.get("category_findings", {}) or {}
+        return cls(
+            default_ttl_hours=store_config.get("default_ttl_hours", 24),
+            ttl_hours=store_config.get("ttl_hours", {}),
+            max_entries=store_config.get("max_entries", 2000),
+            persist_path=store_config.get("persist_path", "src/data/cache/category_findings.json"),
+            enabled=store_config.get("enabled", True),
+            persist_delay_seconds=store_config.get("persist_delay_seconds", 1.0),
+        )
+
+    def ttl_seconds(self, category: str) -> float:
+        """Get the TTL configured for a category, in seconds."""
+        return float(self.ttl_hours.get(category, self.default_ttl_hours)) * 3600
+
+    def get_fresh(self, query: str, categories: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get findings that are still within their category's TTL.
+
+        Args:
+            query: Raw user query
+            categories: Categories to look up
+
+        Returns:
+            dict: Mapping of category to ``{"findings": str, "sources": dict}``, for fresh
+            categories only. ``sources`` maps short ids to the sources cited by the findings.
+        """
+        if not self.enabled:
+            return {}
+
+        now = time.time()
+        fresh = {}
+        with self._lock:
+            for category in categories:
+                entry = self._entries.get(self._key(query, category))
+                if entry and now - entry["updated_at"] < self.ttl_seconds(category):
+                    fresh[category] = {"findings": entry["findings"], "sources": entry.get("sources", {})}
+                    self._hits[category] = self._hits.get(category, 0) + 1
+                else:
+                    self._misses[category] = self._misses.get(category, 0) + 1
+        return fresh
+
+    def put_many(
+        self,
+        query: str,
+        findings_by_category: Dict[str, str],
+        sources_by_category: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+    ) -> None:
+        """
+        Store freshly produced findings for several categories at once.
+
+        Args:
+            query: Raw user query the findings were produced for
+            findings_by_category: Mapping of category to findings text
+            sources_by_category: Mapping of category to the sources its agent found, by short id
+        """
+        if not self.enabled or not findings_by_category:
+            return
+
+        sources_by_category = sources_by_category or {}
+        now = time.time()
+        with self._lock:
+            for category, findings in findings_by_category.items():
+                self._entries[self._key(query, category)] = {
+                    "query": normalize_query(query),
+                    "category": category,
+                    "updated_at": now,
+                    "findings": findings,
+                    "sources": sources_by_category.get(category, {}),
+                }
+            self._prune(now)
+            self._persist()
+
+        logger.info(f"CATEGORY FINDINGS: Stored findings for {sorted(findings_by_category)}")
+
+    def flush(self) -> None:
+        """Write pending changes to disk now. Blocks; call it off the event loop."""
+        if self._writer:
+            self._writer.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get per-category hit/miss counters and occupancy."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits_by_category": dict(self._hits),
+                "misses_by_category": dict(self._misses),
+                "hits": sum(self._hits.values()),
+                "misses": sum(self._misses.values()),
+                "persist_writes": self._writer.writes if self._writer else 0,
+            }
+
+    @staticmethod
+    def _key(query: str, category: str) -> str:
+        return f"{normalize_query(query)}|{category}"
+
+    def _prune(self, now: float) -> None:
+        """Drop expired entries, then the oldest entries past the cap. Callers hold the lock."""
+        expired = [
+            key for key, entry in self._entries.items()
+            if now - entry["updated_at"] >= self.ttl_seconds(entry["category"])
+        ]
+        for key in expired:
+            del self._entries[key]
+
+        if len(self._entries) > self.max_entries:
+            by_age = sorted(self._entries, key=lambda key: self._entries[key]["updated_at"])
+            for key in by_age[:len(self._entries) - self.max_entries]:
+                del self._entries[key]
+
+    def _load(self) -> None:
+        """Load persisted findings, dropping any that have expired."""
+        if not os.path.exists(self.persist_path):
+            return
+
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f).get("entries", {})
+            self._prune(time.time())
+            logger.info(f"CATEGORY FINDINGS: Loaded {len(self._entries)} entries from {self.persist_path}")
+        except Exception as e:
+            logger.error(f"CATEGORY FINDINGS: Failed to load {self.persist_path}: {e}")
+            self._entries = {}
+
+    def _persist(self) -> None:
+        """Schedule a background write of the store. Callers must hold the lock."""
+        if self._writer:
+            self._writer.schedule()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Copy the entries for the writer thread; entries are replaced, never mutated."""
+        with self._lock:
+            return {"entries": dict(self._entries)}
+
+
+category_findings_store = CategoryFindingsStore.from_config(load_config())
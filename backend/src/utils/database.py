@@ -0,0 +1,854 @@
+"""SQLite store for discovered trends.
+
+Every final report is recorded here (see ``save_final_response``), one row per
+trend, for the ``/trends`` endpoints and the import scripts. Trends are unique by
+normalized name within a session: a report never stores the same trend twice, and
+a trend found again in a later session is stored under that session too, so every
+session lists the full report it produced.
+
+The database runs in WAL mode, so readers do not block the writer. Reads use a
+small pool of connections and writes one dedicated connection, serialized by a
+lock; every connection is reused, so it keeps its compiled statements cached
+(every query is a constant parameterized SQL string). A whole report is inserted
+in one transaction.
+
+The methods are blocking. Async code (the ``/trends`` router) runs them through
+``read`` and ``write``, on a thread pool with one thread per reader connection
+and a single writer thread, so queries never block the event loop and a slow
+query only holds up other database calls.
+
+Search goes through an FTS5 index (``trends_fts``) over each trend's name,
+description, summary, keywords and hashtags, kept in sync with ``trends`` by
+triggers and ranked by bm25. Triggers also keep the summary tables
+(``category_stats``, ``session_categories``, ``trend_totals``) up to date in the
+same transaction as each write, so the statistics are read, never computed.
+"""
+
+import asyncio
+import base64
+import functools
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config.load_config import load_config
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    query TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trends (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trend_uid TEXT,
+    session_id TEXT NOT NULL REFERENCES sessions (session_id),
+    category TEXT NOT NULL COLLATE NOCASE,
+    trend_name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    trend_description TEXT NOT NULL DEFAULT '',
+    trend_summary TEXT NOT NULL DEFAULT '',
+    keywords TEXT NOT NULL DEFAULT '[]',
+    hashtags TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trends_session_created ON trends (session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_trends_category_created ON trends (category, created_at);
+CREATE INDEX IF NOT EXISTS idx_trends_created ON trends (created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trends_session_name ON trends (session_id, normalized_name);
+CREATE INDEX IF NOT EXISTS idx_trends_normalized_name ON trends (normalized_name);
+CREATE TABLE IF NOT EXISTS trend_details (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trend_id INTEGER NOT NULL REFERENCES trends (id) ON DELETE CASCADE,
+    detail_type TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trend_details_trend ON trend_details (trend_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS trends_fts USING fts5 (
+    trend_name, trend_description, trend_summary, keywords, hashtags, category UNINDEXED,
+    content = 'trends', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trends_fts_insert AFTER INSERT ON trends BEGIN
+    INSERT INTO trends_fts (rowid, trend_name, trend_description, trend_summary, keywords, hashtags, category)
+    VALUES (new.id, new.trend_name, new.trend_description, new.trend_summary, new.keywords, new.hashtags, new.category);
+END;
+CREATE TRIGGER IF NOT EXISTS trends_fts_delete AFTER DELETE ON trends BEGIN
+    INSERT INTO trends_fts (trends_fts, rowid, trend_name, trend_description, trend_summary, keywords, hashtags, category)
+    VALUES ('delete', old.id, old.trend_name, old.trend_description, old.trend_summary, old.keywords, old.hashtags, old.category);
+END;
+CREATE TRIGGER IF NOT EXISTS trends_fts_update AFTER UPDATE ON trends BEGIN
+    INSERT INTO trends_fts (trends_fts, rowid, trend_name, trend_description, trend_summary, keywords, hashtags, category)
+    VALUES ('delete', old.id, old.trend_name, old.trend_description, old.trend_summary, old.keywords, old.hashtags, old.category);
+    INSERT INTO trends_fts (rowid, trend_name, trend_description, trend_summary, keywords, hashtags, category)
+    VALUES (new.id, new.trend_name, new.trend_description, new.trend_summary, new.keywords, new.hashtags, new.category);
+END;
+CREATE TABLE IF NOT EXISTS session_categories (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id),
+    category TEXT NOT NULL COLLATE NOCASE,
+    trend_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, category)
+);
+CREATE TABLE IF NOT EXISTS category_stats (
+    category TEXT PRIMARY KEY COLLATE NOCASE,
+    trend_count INTEGER NOT NULL DEFAULT 0,
+    last_trend_at TEXT
+);
+CREATE TABLE IF NOT EXISTS trend_totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_trends INTEGER NOT NULL DEFAULT 0,
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    last_trend_at TEXT,
+    last_updated TEXT
+);
+INSERT OR IGNORE INTO trend_totals (id) VALUES (1);
+CREATE TRIGGER IF NOT EXISTS trends_stats_insert AFTER INSERT ON trends BEGIN
+    INSERT INTO category_stats (category, trend_count, last_trend_at) VALUES (new.category, 1, new.created_at)
+    ON CONFLICT (category) DO UPDATE SET
+        trend_count = trend_count + 1,
+        last_trend_at = MAX(COALESCE(last_trend_at, ''), excluded.last_trend_at);
+    INSERT INTO session_categories (session_id, category, trend_count) VALUES (new.session_id, new.category, 1)
+    ON CONFLICT (session_id, category) DO UPDATE SET trend_count = trend_count + 1;
+    UPDATE trend_totals SET
+        total_trends = total_trends + 1,
+        last_trend_at = MAX(COALESCE(last_trend_at, ''), new.created_at),
+        last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trends_stats_delete AFTER DELETE ON trends BEGIN
+    UPDATE category_stats SET
+        trend_count = trend_count - 1,
+        last_trend_at = (SELECT MAX(created_at) FROM trends WHERE category = old.category)
+    WHERE category = old.category;
+    DELETE FROM category_stats WHERE category = old.category AND trend_count <= 0;
+    UPDATE session_categories SET trend_count = trend_count - 1
+    WHERE session_id = old.session_id AND category = old.category;
+    DELETE FROM session_categories
+    WHERE session_id = old.session_id AND category = old.category AND trend_count <= 0;
+    UPDATE trend_totals SET
+        total_trends = total_trends - 1,
+        last_trend_at = (SELECT MAX(created_at) FROM trends),
+        last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_stats_insert AFTER INSERT ON sessions BEGIN
+    UPDATE trend_totals SET total_sessions = total_sessions + 1, last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+    WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_stats_delete AFTER DELETE ON sessions BEGIN
+    UPDATE trend_totals SET total_sessions = total_sessions - 1, last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+    WHERE id = 1;
+END;
+"""
+
+# Recompute the summary tables from scratch; they are otherwise kept up to date by triggers
+REBUILD_STATS_SQL = """
+DELETE FROM category_stats;
+INSERT INTO category_stats (category, trend_count, last_trend_at)
+SELECT category, COUNT(*), MAX(created_at) FROM trends GROUP BY category;
+DELETE FROM session_categories;
+INSERT INTO session_categories (session_id, category, trend_count)
+SELECT session_id, category, COUNT(*) FROM trends GROUP BY session_id, category;
+UPDATE trend_totals SET
+    total_trends = (SELECT COUNT(*) FROM trends),
+    total_sessions = (SELECT COUNT(*) FROM sessions),
+    last_trend_at = (SELECT MAX(created_at) FROM trends),
+    last_updated = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+WHERE id = 1;
+"""
+
+# Report keys (frontend camelCase and agent snake_case) -> category names
+CATEGORY_KEYS = {
+    "makeupTrends": "Makeup",
+    "makeup_trends": "Makeup",
+    "skincareTrends": "Skincare",
+    "skincare_trends": "Skincare",
+    "hairTrends": "Hair",
+    "hair_trends": "Hair",
+    "toolsBrushesTrends": "Tools & Brushes",
+    "tools_brushes_trends": "Tools & Brushes",
+    "miniSizeTrends": "Mini Size",
+    "mini_size_trends": "Mini Size",
+    "menTrends": "Men",
+    "men_trends": "Men",
+    "giftsTrends": "Gifts",
+    "gifts_trends": "Gifts",
+    "fragranceTrends": "Fragrance",
+    "fragrance_trends": "Fragrance",
+    "bathBodyTrends": "Bath & Body",
+    "bath_body_trends": "Bath & Body",
+}
+
+# List fields of a trend card stored as trend_details rows: card field -> detail_type
+DETAIL_FIELDS = {
+    "category_associations": "category_association",
+    "ingredients": "ingredient",
+    "product_features": "product_feature",
+}
+
+TREND_COLUMNS = (
+    "t.id, t.trend_uid, t.session_id, t.category, t.trend_name, t.trend_description, "
+    "t.trend_summary, t.keywords, t.hashtags, t.created_at, s.user_id"
+)
+
+UPSERT_SESSION_SQL = """
+INSERT INTO sessions (session_id, user_id, query, created_at, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (session_id) DO UPDATE SET
+    user_id = COALESCE(excluded.user_id, sessions.user_id),
+    query = COALESCE(excluded.query, sessions.query),
+    updated_at = excluded.updated_at
+"""
+INSERT_TREND_SQL = """
+INSERT INTO trends (
+    trend_uid, session_id, category, trend_name, normalized_name,
+    trend_description, trend_summary, keywords, hashtags, created_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (session_id, normalized_name) DO NOTHING
+"""
+INSERT_DETAIL_SQL = "INSERT INTO trend_details (trend_id, detail_type, value) VALUES (?, ?, ?)"
+TREND_EXISTS_SQL = "SELECT 1 FROM trends WHERE normalized_name = ? LIMIT 1"
+# Listings are paged by keyset on (created_at, id): a page starts after the last
+# row of the previous one, so every page is an index range scan however deep it is.
+# A session's trends are listed oldest first, the other listings newest first.
+SESSION_TRENDS_SQL = f"""
+SELECT {TREND_COLUMNS} FROM trends t LEFT JOIN sessions s ON s.session_id = t.session_id
+WHERE t.session_id = ? ORDER BY t.created_at, t.id LIMIT ?
+"""
+SESSION_TRENDS_AFTER_SQL = f"""
+SELECT {TREND_COLUMNS} FROM trends t LEFT JOIN sessions s ON s.session_id = t.session_id
+WHERE t.session_id = ? AND (t.created_at, t.id) > (?, ?) ORDER BY t.created_at, t.id LIMIT ?
+"""
+RECENT_TRENDS_SQL = f"""
+SELECT {TREND_COLUMNS} FROM trends t LEFT JOIN sessions s ON s.session_id = t.session_id
+ORDER BY t.created_at DESC, t.id DESC LIMIT ?
+"""
+RECENT_TRENDS_AFTER_SQL = f"""
+SELECT {TREND_COLUMNS} FROM trends t LEFT JOIN sessions s ON s.session_id = t.session_id
+WHERE (t.created_at, t.id) < (?, ?) ORDER BY t.created_at DESC, t.id DESC LIMIT ?
+"""
+CATEGORY_TRENDS_SQL = f"""
+SELECT {TREND_COLUMNS} FROM trends t LEFT JOIN sessions s ON s.session_id = t.session_id
+WHERE t.category = ? ORDER BY t.created_at DESC, t.id DESC LIMIT ?
+"""
+CATEGORY_TRENDS_AFTER_SQL = f"""
+SELECT {TREND_COLUMNS} FROM trends t LEFT JOIN sessions s ON s.session_id = t.session_id
+WHERE t.category = ? AND (t.created_at, t.id) < (?, ?) ORDER BY t.created_at DESC, t.id DESC LIMIT ?
+"""
+
+# Top matches by bm25 (a match in the name counts most, then keywords and hashtags).
+# Ordering by the FTS5 rank column lets the index stop after ``limit`` rows, so the
+# snippet and highlight are only built for the results, and the join comes after.
+SEARCH_HITS_SQL = """
+SELECT rowid AS trend_id, rank AS score,
+    snippet(trends_fts, -1, :start, :end, '…', :tokens) AS snippet,
+    highlight(trends_fts, 0, :start, :end) AS highlighted_name
+FROM trends_fts
+WHERE trends_fts MATCH :match AND rank MATCH 'bm25(10.0, 2.0, 1.0, 4.0, 4.0, 0.0)'
+"""
+SEARCH_SQL = f"""
+WITH hits AS ({SEARCH_HITS_SQL} ORDER BY rank LIMIT :limit)
+SELECT {TREND_COLUMNS}, hits.score, hits.snippet, hits.highlighted_name
+FROM hits JOIN trends t ON t.id = hits.trend_id LEFT JOIN sessions s ON s.session_id = t.session_id
+ORDER BY hits.score
+"""
+SEARCH_CATEGORY_SQL = f"""
+WITH hits AS ({SEARCH_HITS_SQL} AND category = :category COLLATE NOCASE ORDER BY rank LIMIT :limit)
+SELECT {TREND_COLUMNS}, hits.score, hits.snippet, hits.highlighted_name
+FROM hits JOIN trends t ON t.id = hits.trend_id LEFT JOIN sessions s ON s.session_id = t.session_id
+ORDER BY hits.score
+"""
+
+def normalize_trend_name(trend_name: str) -> str:
+    """Normalize a trend name for duplicate detection: lowercase, single spaces."""
+    return " ".join((trend_name or "").lower().split())
+
+
+def encode_cursor(trend: Dict[str, Any]) -> str:
+    """Opaque cursor for the listing position right after ``trend``."""
+    key = json.dumps([trend["created_at"], trend["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor from ``encode_cursor`` into its (created_at, id) key.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, trend_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+    if not isinstance(created_at, str) or not isinstance(trend_id, int):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return created_at, trend_id
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix.
+
+    Words are quoted, so FTS5 operators and punctuation in the input are taken
+    literally; "glass sk" becomes ``"glass"* "sk"*``. Empty if there are no words.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", (text or "").lower()))
+
+
+def connect(db_path: str, busy_timeout_seconds: float = 30) -> sqlite3.Connection:
+    """Open a connection in autocommit mode (transactions are explicit), with WAL and a busy timeout."""
+    conn = sqlite3.connect(
+        db_path,
+        timeout=busy_timeout_seconds,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=256,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_seconds * 1000)}")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections to one database file.
+
+    Connections are opened lazily up to ``size`` and handed out one caller at a
+    time; a caller waits when all are in use.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, busy_timeout_seconds: float = 30):
+        self.db_path = db_path
+        self.size = max(1, size)
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the block."""
+        conn = self._borrow()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self.size, "opened": self._opened, "idle": self._idle.qsize()}
+
+    def _borrow(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return connect(self.db_path, self.busy_timeout_seconds)
+        return self._idle.get()
+
+
+class TrendDatabase:
+    """
+    Trends recorded from final reports, with their sessions and per-session category counts.
+
+    Attributes:
+        db_path (str): Absolute path of the SQLite database file.
+        pool (ConnectionPool): Reader connections.
+    """
+
+    def __init__(self, db_path: str = "src/data/trends.db", pool_size: int = 4, busy_timeout_seconds: float = 30):
+        self.db_path = os.path.abspath(db_path)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self.pool = ConnectionPool(self.db_path, size=pool_size, busy_timeout_seconds=busy_timeout_seconds)
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._executors_lock = threading.Lock()
+        self._calls = {"read": 0, "write": 0}
+        self._pending = {"read": 0, "write": 0}
+        self._seconds = {"read": 0.0, "write": 0.0}
+        self._max_seconds = {"read": 0.0, "write": 0.0}
+        with self._write_connection() as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            conn.executescript(SCHEMA)
+            if "trends_fts" not in tables:
+                # Index trends stored before the search index existed
+                conn.execute("INSERT INTO trends_fts (trends_fts) VALUES ('rebuild')")
+        if "category_stats" not in tables:
+            # Count trends stored before the summary tables existed
+            self.rebuild_stats()
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "TrendDatabase":
+        """Build the database from the ``trends_db`` section of config.yaml."""
+        db_config = config_data.get("trends_db", {}) or {}
+        return cls(
+            db_path=db_config.get("path", "src/data/trends.db"),
+            pool_size=db_config.get("pool_size", 4),
+            busy_timeout_seconds=db_config.get("busy_timeout_seconds", 30),
+        )
+
+    async def read(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking read method on the reader thread pool.
+
+        Example: ``trends = await db.read(db.get_recent_trends, 50)``
+        """
+        return await self._submit("read", fn, *args, **kwargs)
+
+    async def write(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking write method on the single writer thread, after earlier writes."""
+        return await self._submit("write", fn, *args, **kwargs)
+
+    def write_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a write method on the single writer thread from synchronous code and wait for it.
+
+        For code already running in a worker thread (e.g. under ``asyncio.to_thread``);
+        async code uses ``write``. Never call it from the writer thread itself.
+        """
+        with self._timed("write"):
+            return self._executor("write").submit(fn, *args, **kwargs).result()
+
+    def save_trends_batch(
+        self,
+        trends_data: Dict[str, List[Dict[str, Any]]],
+        session_id: str,
+        user_id: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> int:
+        """
+        Save every trend of a report in one transaction, skipping trends the session already has.
+
+        Args:
+            trends_data: Report ``trends`` mapping category keys (``makeupTrends``
+                or ``makeup_trends``) to lists of trend cards
+            session_id: Session the report belongs to
+            user_id: User who ran the session
+            query: The session's trend query
+
+        Returns:
+            int: Number of trends added to the session
+        """
+        rows = []
+        for category_key, trends in (trends_data or {}).items():
+            if not isinstance(trends, list):
+                continue
+            category = CATEGORY_KEYS.get(category_key, category_key.replace("_", " ").title())
+            rows.extend((trend, category) for trend in trends if isinstance(trend, dict))
+        return self._save(rows, session_id, user_id, query)
+
+    def save_trend(
+        self,
+        trend: Dict[str, Any],
+        session_id: str,
+        category: str,
+        user_id: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Save one trend card.
+
+        Returns:
+            int: The new trend's id, or None if the session already has a trend with the same name
+        """
+        if not self._save([(trend, category)], session_id, user_id, None):
+            return None
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT id FROM trends WHERE session_id = ? AND normalized_name = ?",
+                (session_id, normalize_trend_name(_trend_name(trend))),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def check_trend_exists(self, trend_name: str) -> bool:
+        """Whether a trend with this name (case and spacing ignored) is stored."""
+        with self.pool.connection() as conn:
+            return conn.execute(TREND_EXISTS_SQL, (normalize_trend_name(trend_name),)).fetchone() is not None
+
+    def get_session_trends(
+        self, session_id: str, limit: Optional[int] = None, after: Optional[Tuple[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a session's trends, oldest first.
+
+        Args:
+            session_id: Session to list
+            limit: Maximum number of trends; all of them if None
+            after: (created_at, id) key of the last trend of the previous page
+        """
+        limit = -1 if limit is None else limit
+        with self.pool.connection() as conn:
+            if after:
+                rows = conn.execute(SESSION_TRENDS_AFTER_SQL, (session_id, *after, limit)).fetchall()
+            else:
+                rows = conn.execute(SESSION_TRENDS_SQL, (session_id, limit)).fetchall()
+            return self._with_details(conn, rows)
+
+    def get_recent_trends(self, limit: int = 50, after: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """Get the most recently added trends across sessions, newest first, after the ``after`` key."""
+        with self.pool.connection() as conn:
+            if after:
+                rows = conn.execute(RECENT_TRENDS_AFTER_SQL, (*after, limit)).fetchall()
+            else:
+                rows = conn.execute(RECENT_TRENDS_SQL, (limit,)).fetchall()
+            return self._with_details(conn, rows)
+
+    def get_trends_by_category(
+        self, category: str, limit: int = 20, after: Optional[Tuple[str, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the most recent trends of a category (case-insensitive), newest first, after the ``after`` key."""
+        with self.pool.connection() as conn:
+            if after:
+                rows = conn.execute(CATEGORY_TRENDS_AFTER_SQL, (category, *after, limit)).fetchall()
+            else:
+                rows = conn.execute(CATEGORY_TRENDS_SQL, (category, limit)).fetchall()
+            return self._with_details(conn, rows)
+
+    def search_trends(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 20,
+        highlight_start: str = "<mark>",
+        highlight_end: str = "</mark>",
+        snippet_tokens: int = 16,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over trend names, descriptions, summaries, keywords and hashtags.
+
+        Args:
+            query: Free text; every word must match, as a prefix ("hydrat" finds "hydrating")
+            category: Only return trends of this category (case-insensitive)
+            limit: Maximum number of results
+            highlight_start: Marker inserted before each matched term
+            highlight_end: Marker inserted after each matched term
+            snippet_tokens: Length of the snippet, in tokens
+
+        Returns:
+            list: Trends by relevance (bm25), each with its ``score`` (lower is
+            better), a ``snippet`` of the best-matching field and the
+            ``highlighted_name``
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+        params = {
+            "match": match,
+            "category": category,
+            "limit": limit,
+            "start": highlight_start,
+            "end": highlight_end,
+            "tokens": snippet_tokens,
+        }
+        with self.pool.connection() as conn:
+            rows = conn.execute(SEARCH_CATEGORY_SQL if category else SEARCH_SQL, params).fetchall()
+            return self._with_details(conn, rows)
+
+    def get_categories(self) -> List[Dict[str, Any]]:
+        """Get every category with its trend count and latest trend time, largest first."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT category, trend_count, last_trend_at FROM category_stats ORDER BY trend_count DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_session(self, session_id: str) -> Optional[int]:
+        """
+        Delete a session with its trends, their details and its category counts.
+
+        Returns:
+            int: Number of trends deleted, or None if the session does not exist
+        """
+        with self._write_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Delete details explicitly: trend_details tables created before it had
+                # ON DELETE CASCADE keep their rows otherwise. Search index entries and
+                # counts go with their trends, through triggers.
+                conn.execute(
+                    "DELETE FROM trend_details WHERE trend_id IN (SELECT id FROM trends WHERE session_id = ?)",
+                    (session_id,),
+                )
+                trends_deleted = conn.execute("DELETE FROM trends WHERE session_id = ?", (session_id,)).rowcount
+                session_deleted = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if not session_deleted:
+            return None
+        logger.info(f"TRENDS DB: Deleted session '{session_id}' with {trends_deleted} trends")
+        return trends_deleted
+
+    def rebuild_stats(self) -> None:
+        """Recompute the summary tables from ``trends`` and ``sessions`` (e.g. after editing the file by hand)."""
+        with self._write_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for statement in REBUILD_STATS_SQL.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info("TRENDS DB: Rebuilt summary tables")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get reader pool usage and read/write counts, backlog and durations."""
+        return {
+            "read_connections": self.pool.stats(),
+            **{
+                kind: {
+                    "calls": self._calls[kind],
+                    "pending": self._pending[kind],
+                    "mean_seconds": round(self._seconds[kind] / self._calls[kind], 4) if self._calls[kind] else None,
+                    "max_seconds": round(self._max_seconds[kind], 4),
+                }
+                for kind in ("read", "write")
+            },
+        }
+
+    def get_database_stats(self) -> Dict[str, Any]:
+        """
+        Get trend and session totals, per-category counts and the latest trend time.
+
+        Read from the trigger-maintained summary tables, so this does not scan
+        ``trends`` however large it grows.
+        """
+        with self.pool.connection() as conn:
+            totals = conn.execute(
+                "SELECT total_trends, total_sessions, last_trend_at, last_updated FROM trend_totals WHERE id = 1"
+            ).fetchone()
+            by_category = conn.execute(
+                "SELECT category, trend_count FROM category_stats ORDER BY trend_count DESC"
+            ).fetchall()
+        return {
+            "total_trends": totals["total_trends"],
+            "total_sessions": totals["total_sessions"],
+            "trends_by_category": {row["category"]: row["trend_count"] for row in by_category},
+            "latest_trend_at": totals["last_trend_at"],
+            "last_updated": totals["last_updated"],
+            "database_path": self.db_path,
+            "database_size_bytes": os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+        }
+
+    def close(self) -> None:
+        """Finish queued calls, then close the thread pools and connections (reopened on next use)."""
+        with self._executors_lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+        self.pool.close()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    @contextmanager
+    def _write_connection(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer connection; one writer at a time, whichever thread it runs on."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = connect(self.db_path, self.busy_timeout_seconds)
+            yield self._writer
+
+    async def _submit(self, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn`` on the ``kind`` ("read" or "write") thread pool and record its timing."""
+        with self._timed(kind):
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor(kind), functools.partial(fn, *args, **kwargs)
+            )
+
+    @contextmanager
+    def _timed(self, kind: str) -> Iterator[None]:
+        self._pending[kind] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._pending[kind] -= 1
+            self._calls[kind] += 1
+            self._seconds[kind] += elapsed
+            self._max_seconds[kind] = max(self._max_seconds[kind], elapsed)
+
+    def _executor(self, kind: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(kind)
+        if executor is None:
+            with self._executors_lock:
+                executor = self._executors.get(kind)
+                if executor is None:
+                    # One thread per reader connection, so a read never waits for a connection
+                    workers = self.pool.size if kind == "read" else 1
+                    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"trends-db-{kind}")
+                    self._executors[kind] = executor
+        return executor
+
+    def _save(
+        self,
+        items: List[Tuple[Dict[str, Any], str]],
+        session_id: str,
+        user_id: Optional[str],
+        query: Optional[str],
+    ) -> int:
+        """Insert trend cards, their details and category counts in one write transaction."""
+        now = datetime.utcnow().isoformat()
+        trend_rows = []
+        details: Dict[str, List[Tuple[str, str]]] = {}
+        seen = set()
+        for trend, category in items:
+            name = _trend_name(trend).strip()
+            normalized = normalize_trend_name(name)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            trend_rows.append((
+                str(trend.get("id") or ""),
+                session_id,
+                category,
+                name,
+                normalized,
+                _text(trend, "trend_description", "trendDescription"),
+                _text(trend, "trend_summary", "trendSummary"),
+                json.dumps(_list(trend, "keywords", "keywords"), ensure_ascii=False),
+                json.dumps(_list(trend, "hashtags", "hashtags"), ensure_ascii=False),
+                now,
+            ))
+            details[normalized] = [
+                (detail_type, str(value))
+                for field, detail_type in DETAIL_FIELDS.items()
+                for value in _list(trend, field, _camel(field))
+            ]
+
+        with self._write_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(UPSERT_SESSION_SQL, (session_id, user_id, query, now, now))
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM trends").fetchone()[0]
+                conn.executemany(INSERT_TREND_SQL, trend_rows)
+                added = conn.execute(
+                    "SELECT id, normalized_name FROM trends WHERE id > ?", (last_id,)
+                ).fetchall()
+                conn.executemany(INSERT_DETAIL_SQL, [
+                    (row["id"], detail_type, value)
+                    for row in added
+                    for detail_type, value in details.get(row["normalized_name"], [])
+                ])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        logger.info(
+            f"TRENDS DB: Session '{session_id}': {len(added)} new trends saved, "
+            f"{len(trend_rows) - len(added)} already stored"
+        )
+        return len(added)
+
+    def _with_details(self, conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        """Convert trend rows to dicts with their list fields, loading all details in one query."""
+        trends = []
+        for row in rows:
+            trend = dict(row)
+            trend["keywords"] = json.loads(trend["keywords"] or "[]")
+            trend["hashtags"] = json.loads(trend["hashtags"] or "[]")
+            for field in DETAIL_FIELDS:
+                trend[field] = []
+            trends.append(trend)
+        if not trends:
+            return trends
+
+        by_id = {trend["id"]: trend for trend in trends}
+        field_of = {detail_type: field for field, detail_type in DETAIL_FIELDS.items()}
+        ids = list(by_id)
+        # json_each keeps this one prepared statement whatever the number of ids
+        detail_rows = conn.execute(
+            "SELECT trend_id, detail_type, value FROM trend_details "
+            "WHERE trend_id IN (SELECT value FROM json_each(?)) ORDER BY id",
+            (json.dumps(ids),),
+        ).fetchall()
+        for detail in detail_rows:
+            field = field_of.get(detail["detail_type"])
+            if field:
+                by_id[detail["trend_id"]][field].append(detail["value"])
+        return trends
+
+
+def _camel(field: str) -> str:
+    first, *rest = field.split("_")
+    return first + "".join(part.title() for part in rest)
+
+
+def _trend_name(trend: Dict[str, Any]) -> str:
+    return str(trend.get("trend_name") or trend.get("trendName") or "")
+
+
+def _text(trend: Dict[str, Any], field: str, alias: str) -> str:
+    return str(trend.get(field) or trend.get(alias) or "")
+
+
+def _list(trend: Dict[str, Any], field: str, alias: str) -> List[Any]:
+    value = trend.get(field, trend.get(alias))
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value.strip():
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return []
+
+
+_db: Optional[TrendDatabase] = None
+_db_lock = threading.Lock()
+
+
+def get_db() -> TrendDatabase:
+    """
+    Get the process-wide trends database, opening it on first use.
+
+    Opening creates or migrates the schema (and can rebuild the search index and
+    summary tables), so it is not done at import; the app opens it at startup,
+    off the event loop.
+    """
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = TrendDatabase.from_config(load_config())
+    return _db
+
+
+def __getattr__(name: str):
+    # Module-level ``db`` (used by the import scripts) opens the database on first access, not at import
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
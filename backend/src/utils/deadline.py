@@ -0,0 +1,196 @@
+"""Request deadlines and cancellation of abandoned agent runs.
+
+Every discovery request gets a deadline, from the ``X-Request-Timeout`` header
+(seconds) or ``deadlines.default_seconds`` in config.yaml. The deadline is held
+in a context variable, so it reaches every stage of the run (agent tasks inherit
+it): the model rate limiter, for one, fails fast instead of waiting out a retry
+delay that would end past the deadline.
+
+A caller stops waiting when its deadline passes or its client disconnects. Once
+no caller is waiting on a run, ``SingleFlight`` cancels it, so the remaining
+agents, model calls and output files are skipped. ``CancellationStats`` counts
+those cancellations and the work they avoided.
+"""
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+from src.config.load_config import load_config
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+deadline_config = load_config().get("deadlines", {}) or {}
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before its run finished.
+
+    Attributes:
+        stage (str): Pipeline stage the run was in.
+    """
+
+    def __init__(self, message: str, stage: str = "unknown"):
+        super().__init__(message)
+        self.stage = stage
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client closed the connection before its run finished."""
+
+
+class Deadline:
+    """
+    A point in time (monotonic) by which a run must finish; ``None`` never expires.
+
+    A run shared by several callers holds one ``Deadline`` that is extended to the
+    latest of theirs, so it keeps going as long as any caller will wait for it.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, never below 0, or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def extend(self, other: "Deadline") -> None:
+        """Push this deadline out to ``other`` if that is later."""
+        if self.expires_at is None:
+            return
+        if other.expires_at is None or other.expires_at > self.expires_at:
+            self.expires_at = other.expires_at
+
+
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "current_deadline", default=None
+)
+
+
+def resolve_deadline(header_value: Optional[str] = None) -> Deadline:
+    """
+    Build a request's deadline from its timeout header, falling back to config.
+
+    Args:
+        header_value: Value of the ``deadlines.header`` request header, in seconds
+
+    Returns:
+        Deadline: Capped at ``deadlines.max_seconds``; without a deadline if
+        neither the header nor ``deadlines.default_seconds`` is set
+    """
+    seconds = deadline_config.get("default_seconds", 600)
+    if header_value:
+        try:
+            seconds = float(header_value)
+        except ValueError:
+            logger.warning(f"DEADLINE: Ignoring invalid timeout header '{header_value}'")
+    max_seconds = deadline_config.get("max_seconds")
+    if seconds is not None and max_seconds:
+        seconds = min(seconds, max_seconds)
+    if seconds is not None and seconds <= 0:
+        seconds = None
+    return Deadline(seconds)
+
+
+def check_deadline(stage: str) -> None:
+    """Raise ``DeadlineExceededError`` if the current request's deadline has passed."""
+    deadline = current_deadline.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceededError(f"Deadline exceeded during {stage}", stage=stage)
+
+
+def deadline_allows(seconds: float) -> bool:
+    """Whether waiting ``seconds`` more still ends before the current deadline."""
+    deadline = current_deadline.get()
+    remaining = deadline.remaining() if deadline is not None else None
+    return remaining is None or seconds < remaining
+
+
+async def cancel_on_disconnect(http_request: Any, awaitable: Awaitable[Any]) -> Any:
+    """
+    Await ``awaitable`` in a task that is cancelled if the client disconnects.
+
+    Starlette does not cancel a plain (non-streaming) endpoint when its client
+    goes away, so the connection is polled every ``deadlines.disconnect_poll_seconds``.
+
+    Raises:
+        ClientDisconnectedError: If the client disconnected first
+    """
+    poll_seconds = deadline_config.get("disconnect_poll_seconds", 1.0)
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                cancellation_stats.record_caller("disconnect")
+                raise ClientDisconnectedError("Client disconnected before the run finished")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+class CancellationStats:
+    """Counters for cancelled callers and runs, and the work the cancellations avoided."""
+
+    def __init__(self):
+        self._callers = {"deadline": 0, "disconnect": 0}
+        self._runs_cancelled = 0
+        self._cancelled_at_stage: Dict[str, int] = {}
+        self._seconds_spent = 0.0
+        self._events_processed = 0
+        self._output_writes_avoided = 0
+        self._sessions_cleaned = 0
+        self._runs_completed = 0
+        self._completed_seconds = 0.0
+
+    def record_caller(self, reason: str) -> None:
+        """Count a caller that stopped waiting ("deadline" or "disconnect")."""
+        self._callers[reason] = self._callers.get(reason, 0) + 1
+
+    def record_completed(self, seconds: float) -> None:
+        """Record a completed run's duration, used to estimate time avoided by cancellations."""
+        self._runs_completed += 1
+        self._completed_seconds += seconds
+
+    def record_run_cancelled(self, stage: str, seconds: float, events: int, session_cleaned: bool) -> None:
+        """Record an agent run cancelled at ``stage`` after ``seconds`` and ``events``."""
+        self._runs_cancelled += 1
+        self._cancelled_at_stage[stage] = self._cancelled_at_stage.get(stage, 0) + 1
+        self._seconds_spent += seconds
+        self._events_processed += events
+        if stage != "persisting":
+            self._output_writes_avoided += 1
+        if session_cleaned:
+            self._sessions_cleaned += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cancellation counters and the estimated agent time avoided."""
+        mean_run_seconds = self._completed_seconds / self._runs_completed if self._runs_completed else None
+        avoided = None
+        if mean_run_seconds is not None:
+            avoided = max(0.0, mean_run_seconds * self._runs_cancelled - self._seconds_spent)
+        return {
+            "callers_cancelled": dict(self._callers),
+            "runs_cancelled": self._runs_cancelled,
+            "cancelled_at_stage": dict(self._cancelled_at_stage),
+            "seconds_spent_on_cancelled_runs": round(self._seconds_spent, 3),
+            "events_processed_before_cancel": self._events_processed,
+            "output_writes_avoided": self._output_writes_avoided,
+            "partial_sessions_cleaned": self._sessions_cleaned,
+            "runs_completed": self._runs_completed,
+            "mean_run_seconds": round(mean_run_seconds, 3) if mean_run_seconds is not None else None,
+            "estimated_seconds_avoided": round(avoided, 3) if avoided is not None else None,
+        }
+
+
+cancellation_stats = CancellationStats()
@@ -4,13 +4,15 @@ import os
 import sys
 import json
 import csv
-import pandas as pd
 from datetime import datetime
 from typing import Any, Dict, List
+from src.config.load_config import load_config
 from src.utils.setup_log import setup_logger
 
 logger = setup_logger()
 
+trends_db_config = load_config().get("trends_db", {}) or {}
+
 
 def export_trends_to_csv_excel(
     trends_data: Dict,
@@ -108,6 +110,9 @@ def export_trends_to_csv_excel(
         excel_filename = f"trends_export_{user_id}_{timestamp}.xlsx"
         excel_filepath = os.path.join(session_dir, excel_filename)
         
+        # pandas/openpyxl are only needed for the Excel export; imported here to keep startup fast
+        import pandas as pd
+
         df = pd.DataFrame(export_rows)
         with pd.ExcelWriter(excel_filepath, engine='openpyxl') as writer:
             # Write all trends to main sheet
@@ -321,6 +326,15 @@ def save_final_response(
                 logger.info(f"Excel exported to: {excel_path}")
             else:
                 logger.warning("Failed to export trends to CSV/Excel")
+
+            if trends_db_config.get("save_reports", True):
+                try:
+                    from src.utils.database import get_db
+                    # Called from a worker thread; queue behind the other writes on the single writer
+                    db = get_db()
+                    db.write_blocking(db.save_trends_batch, trends_data, session_id, user_id=user_id, query=query)
+                except Exception as e:
+                    logger.error(f"Failed to save trends to the trends database: {e}")
         
         logger.info(f"=== FINAL RESPONSE SAVED ===")
         logger.info(f"Session folder: {session_dir}")
@@ -0,0 +1,219 @@
+"""Shared Google GenAI client with a pooled HTTP connection.
+
+By default every ADK ``Gemini`` model builds its own ``genai.Client`` (one per
+model per event loop), each with its own httpx connection pool, so the agents of
+one pipeline open separate TLS connections to the same endpoint and the clients
+are torn down by garbage collection. ``SharedGenAIClient`` keeps one
+``genai.Client`` per event loop, backed by one keep-alive ``httpx.AsyncClient``
+with configurable limits, used by every agent model and the search backend, and
+closed in the FastAPI lifespan shutdown.
+
+Each client is built with the same ``HttpOptions`` and constructor arguments
+ADK's ``Gemini.api_client`` would use for the model (tracking headers, retry
+options, base URL and API version, Vertex AI / project defaults and the model's
+``client_kwargs``), plus the pooled httpx client. Models whose options differ
+get separate ``genai.Client`` objects that share the loop's connection pool.
+"""
+
+import asyncio
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import httpx
+from google import genai
+from google.adk.models import google_llm
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+
+from src.config.load_config import load_config
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class SharedGenAIClient:
+    """
+    Pooled ``httpx.AsyncClient`` per event loop, with ``genai.Client`` objects on top.
+
+    httpx connections are bound to the loop that opened them, so a pool is
+    created lazily for each running loop (the service uses one; CLI scripts and
+    tests may run several) and pools of loops that have since closed are dropped.
+    Within a loop there is one ``genai.Client`` per distinct set of model client
+    options; with the default agent models that is a single client.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 60,
+        connect_timeout_seconds: float = 10,
+        timeout_seconds: Optional[float] = None,
+        http2: bool = False,
+    ):
+        self.enabled = enabled
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry_seconds = keepalive_expiry_seconds
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.timeout_seconds = timeout_seconds
+        self.http2 = http2
+
+        # id(loop) -> (loop, httpx client, {client options key: genai client})
+        self._clients: Dict[
+            int, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, Dict[Hashable, genai.Client]]
+        ] = {}
+        self._default_model: Optional[Gemini] = None
+        self._created = 0
+        self._closed = 0
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "SharedGenAIClient":
+        """Build the shared client from the ``genai_client`` section of config.yaml."""
+        client_config = config_data.get("genai_client", {}) or {}
+        return cls(
+            enabled=client_config.get("enabled", True),
+            max_connections=client_config.get("max_connections", 100),
+            max_keepalive_connections=client_config.get("max_keepalive_connections", 20),
+            keepalive_expiry_seconds=client_config.get("keepalive_expiry_seconds", 60),
+            connect_timeout_seconds=client_config.get("connect_timeout_seconds", 10),
+            timeout_seconds=client_config.get("timeout_seconds"),
+            http2=client_config.get("http2", False),
+        )
+
+    def get(self, model: Optional[Gemini] = None) -> genai.Client:
+        """
+        Get the pooled client for the running event loop, creating it on first use.
+
+        Args:
+            model: Gemini model whose client options to apply (defaults to a
+                plain ``Gemini()``, as used by the search backend)
+
+        Returns:
+            genai.Client: Client configured like ``model.api_client`` but using the shared pool
+        """
+        loop = asyncio.get_running_loop()
+        if model is None:
+            model = self._default_model = self._default_model or Gemini()
+        key, http_options, client_args = _client_options(model)
+
+        entry = self._clients.get(id(loop))
+        if entry is None or entry[0] is not loop:
+            self._drop_closed_loops()
+            entry = (loop, self._new_http_client(), {})
+            self._clients[id(loop)] = entry
+        _, http_client, clients = entry
+
+        client = clients.get(key)
+        if client is None:
+            http_options["httpx_async_client"] = http_client
+            client = genai.Client(http_options=types.HttpOptions(**http_options), **client_args)
+            clients[key] = client
+            self._created += 1
+            logger.info(
+                f"GENAI CLIENT: Created shared client (max_connections={self.max_connections}, "
+                f"max_keepalive={self.max_keepalive_connections}, base_url={http_options.get('base_url')})"
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """Close the running loop's clients and their connections, and forget clients of closed loops."""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.pop(id(loop), None)
+        if entry is not None and entry[0] is loop:
+            _, http_client, clients = entry
+            await http_client.aclose()
+            for client in clients.values():
+                client.close()
+            self._closed += len(clients)
+            logger.info("GENAI CLIENT: Closed shared client")
+        self._drop_closed_loops()
+
+    def _new_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds),
+            http2=self.http2,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool limits, client counts and open connections."""
+        return {
+            "enabled": self.enabled,
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry_seconds": self.keepalive_expiry_seconds,
+            "clients": sum(len(clients) for _, _, clients in self._clients.values()),
+            "clients_created": self._created,
+            "clients_closed": self._closed,
+            "open_connections": sum(
+                _open_connections(http_client) for _, http_client, _ in self._clients.values()
+            ),
+        }
+
+    def _drop_closed_loops(self) -> None:
+        """Forget clients whose loop has closed; their connections went with the loop."""
+        for key, (loop, _, clients) in list(self._clients.items()):
+            if loop.is_closed():
+                del self._clients[key]
+                for client in clients.values():
+                    client.close()
+                self._closed += len(clients)
+
+
+def _client_options(model: Gemini) -> Tuple[Hashable, Dict[str, Any], Dict[str, Any]]:
+    """
+    Build the client arguments ``Gemini.api_client`` would use for ``model``.
+
+    Mirrors ADK's construction so the pooled client sends the same tracking
+    headers, retries the same way and targets the same backend and project.
+
+    Returns:
+        tuple: (cache key, ``HttpOptions`` fields, other ``genai.Client`` arguments)
+    """
+    base_url, api_version = model._base_url_and_api_version
+    if api_version is None:
+        api_version = model._configured_api_version()
+    http_options: Dict[str, Any] = {
+        "headers": model._tracking_headers(),
+        "retry_options": model.retry_options,
+        "base_url": base_url,
+    }
+    if api_version:
+        http_options["api_version"] = api_version
+
+    client_args: Dict[str, Any] = {}
+    enterprise = model.model.startswith("projects/")
+    if enterprise:
+        client_args["enterprise"] = True
+    client_kwargs = getattr(model, "client_kwargs", None)
+    if not enterprise:
+        client_args.update(google_llm.get_gcp_client_defaults(client_kwargs))
+    if client_kwargs:
+        client_args.update(client_kwargs)
+    # As in ADK, explicit http_options in client_kwargs replace the defaults
+    explicit = client_args.pop("http_options", None)
+    if explicit is not None:
+        http_options = dict(explicit) if isinstance(explicit, dict) else explicit.model_dump(exclude_none=True)
+
+    key = (
+        base_url,
+        api_version,
+        repr(http_options.get("retry_options")),
+        repr(sorted((http_options.get("headers") or {}).items())),
+        repr(sorted(client_args.items())),
+    )
+    return key, http_options, client_args
+
+
+def _open_connections(http_client: httpx.AsyncClient) -> int:
+    """Number of connections in an httpx client's pool (0 if not introspectable)."""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    return len(getattr(pool, "connections", None) or [])
+
+
+genai_client = SharedGenAIClient.from_config(load_config())
@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Dict, List, Set
 
 # Add the backend directory to the path so we can import from src
-backend_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, backend_dir)
 
 from src.utils.setup_log import setup_logger
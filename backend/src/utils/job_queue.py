@@ -0,0 +1,218 @@
+"""Asynchronous job queue for long-running trend discovery requests."""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config.load_config import load_config
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A queued trend discovery request and its progress.
+
+    Attributes:
+        job_id (str): Unique job identifier returned to the client.
+        request (Any): The TrendSendRequest to process.
+        status (str): One of queued, running, completed, failed.
+        stage (str): Current pipeline stage (queued, research, composing, persisting, done).
+        result (Any): Final response payload once completed.
+        error (Optional[str]): Error message if the job failed.
+    """
+
+    job_id: str
+    request: Any
+    status: str = JOB_QUEUED
+    stage: str = "queued"
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def set_stage(self, stage: str) -> None:
+        """Record a stage transition reported by the pipeline."""
+        if self.stage != stage:
+            logger.info(f"JOB {self.job_id}: Stage '{self.stage}' -> '{stage}'")
+            self.stage = stage
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for the status endpoint."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "stage": self.stage,
+            "session_id": self.request.session_id,
+            "user_id": self.request.user_id,
+            "trend_query": self.request.trend_query,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobManager:
+    """
+    Bounded queue of discovery jobs drained by a fixed pool of asyncio workers.
+
+    The handler is registered by the router that owns the request/response
+    formatting; workers are started and stopped from the application lifespan.
+    """
+
+    def __init__(self, workers: int = 2, max_queue_size: int = 100, retention_seconds: int = 3600):
+        self.workers = max(1, int(workers))
+        self.max_queue_size = max_queue_size
+        self.retention_seconds = retention_seconds
+
+        self._handler: Optional[Callable[[Any, Job], Awaitable[Any]]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._jobs: Dict[str, Job] = {}
+        self._completed = 0
+        self._failed = 0
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "JobManager":
+        """Build a job manager from the ``jobs`` section of config.yaml."""
+        jobs_config = config_data.get("jobs", {}) or {}
+        return cls(
+            workers=jobs_config.get("workers", 2),
+            max_queue_size=jobs_config.get("max_queue_size", 100),
+            retention_seconds=jobs_config.get("retention_seconds", 3600),
+        )
+
+    def set_handler(self, handler: Callable[[Any, Job], Awaitable[Any]]) -> None:
+        """Register the coroutine that processes a job and returns its result."""
+        self._handler = handler
+
+    async def start(self) -> None:
+        """Create the queue and start the worker pool."""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i), name=f"trend-job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"JOB MANAGER: Started {self.workers} workers (queue size {self.max_queue_size})")
+
+    async def stop(self) -> None:
+        """Cancel the worker pool. Jobs still queued are marked failed."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        for job in self._jobs.values():
+            if job.status in (JOB_QUEUED, JOB_RUNNING):
+                self._finish(job, JOB_FAILED, error="Server shut down before the job completed")
+        logger.info("JOB MANAGER: Stopped")
+
+    def submit(self, request: Any) -> Job:
+        """
+        Enqueue a discovery request.
+
+        Args:
+            request: TrendSendRequest to process
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            RuntimeError: If the worker pool has not been started
+            JobQueueFullError: If the queue is at capacity
+        """
+        if self._queue is None or not self._worker_tasks:
+            raise RuntimeError("Job workers are not running")
+
+        self._prune()
+        job = Job(job_id=str(uuid.uuid4()), request=request)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+
+        self._jobs[job.job_id] = job
+        logger.info(f"JOB {job.job_id}: Queued for session '{request.session_id}' (queue depth {self._queue.qsize()})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth and job counters."""
+        by_status: Dict[str, int] = {}
+        for job in self._jobs.values():
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": len(self._worker_tasks),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+            "jobs_by_status": by_status,
+            "completed_total": self._completed,
+            "failed_total": self._failed,
+        }
+
+    async def _worker(self, worker_id: int) -> None:
+        """Process jobs from the queue until cancelled."""
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = JOB_RUNNING
+                job.started_at = time.time()
+                logger.info(f"JOB {job.job_id}: Picked up by worker {worker_id}")
+
+                result = await self._handler(job.request, job)
+                job.result = result
+                self._finish(job, JOB_COMPLETED)
+            except asyncio.CancelledError:
+                self._finish(job, JOB_FAILED, error="Job was cancelled")
+                raise
+            except Exception as e:
+                logger.error(f"JOB {job.job_id}: Failed: {e}")
+                self._finish(job, JOB_FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        """Mark a job finished and update counters."""
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        if status == JOB_COMPLETED:
+            job.set_stage("done")
+            self._completed += 1
+        else:
+            self._failed += 1
+        logger.info(f"JOB {job.job_id}: {status.upper()}")
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention window."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager.from_config(load_config())
@@ -0,0 +1,88 @@
+"""Debounced background persistence for the JSON-backed caches.
+
+The caches change on the event loop, but serializing and rewriting their JSON
+files can take long enough to stall it. ``DebouncedJSONWriter`` moves that work
+to a timer thread and coalesces bursts of changes into one write.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class DebouncedJSONWriter:
+    """
+    Write a JSON snapshot to ``path`` on a background thread.
+
+    ``schedule()`` is cheap and safe to call while holding the owner's lock: it
+    only starts a timer if none is pending. When the timer fires, ``snapshot()``
+    is called to copy the data (it takes the owner's lock itself), and the copy
+    is serialized outside that lock to a temp file that then replaces ``path``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        snapshot: Callable[[], Dict[str, Any]],
+        delay_seconds: float = 1.0,
+        name: str = "JSON WRITER",
+    ):
+        self.path = path
+        self.delay_seconds = delay_seconds
+        self.name = name
+        self._snapshot = snapshot
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self.writes = 0
+        self.failures = 0
+
+    def schedule(self) -> None:
+        """Mark the data as changed and start the write timer if it is not running."""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay_seconds, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Write any pending change now, cancelling the timer. Blocks; call off the loop."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self._write()
+
+    def _fire(self) -> None:
+        with self._lock:
+            self._timer = None
+        self._write()
+
+    def _write(self) -> None:
+        # One write at a time, so an older snapshot never replaces a newer one
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
+
+            try:
+                data = self._snapshot()
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, default=str)
+                os.replace(tmp_path, self.path)
+                self.writes += 1
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"{self.name}: Failed to persist {self.path}: {e}")
@@ -0,0 +1,218 @@
+"""Per-agent model assignment and request latency tiers.
+
+``model_tiers`` in config.yaml maps each agent role to a model for every latency
+tier ("fast" and "deep"). Models are given as ``critic`` / ``worker`` (the models
+in ``ResearchConfiguration``) or as a literal model name. While the observed
+p95 latency of an agent role's model is over the model's SLO, that role's calls
+fall back to the worker model, apart from periodic probes of the model, until
+the slow samples age out of the latency window.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, Optional, Tuple
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.config.load_config import load_config
+from src.config.research_config import config
+from src.utils.rate_limiter import RateLimitedGemini
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+LATENCY_TIERS = ("fast", "deep")
+
+# Agent roles that can be assigned a model in config.yaml
+AGENT_ROLES = ("trend_research_agent", "category_agent", "consolidation_agent", "output_composer_agent")
+
+tier_config = load_config().get("model_tiers", {}) or {}
+
+# (agent role, model name)
+LatencyKey = Tuple[str, str]
+
+
+def resolve_model_name(model: str) -> str:
+    """Resolve a ``critic`` / ``worker`` alias to its model name; other names pass through."""
+    aliases = {"critic": config.critic_model, "worker": config.worker_model}
+    return aliases.get(model, model)
+
+
+def resolve_latency_tier(latency_tier: Optional[str] = None) -> str:
+    """Get the requested latency tier, falling back to ``model_tiers.default_tier``."""
+    tier = latency_tier or tier_config.get("default_tier", "deep")
+    if tier not in LATENCY_TIERS:
+        raise ValueError(f"Unknown latency tier '{tier}'. Available tiers: {list(LATENCY_TIERS)}")
+    return tier
+
+
+def agent_model_name(agent_role: str, latency_tier: Optional[str] = None) -> str:
+    """
+    Get the model assigned to an agent role for a latency tier.
+
+    Args:
+        agent_role: One of ``AGENT_ROLES``
+        latency_tier: "fast" or "deep"; defaults to ``model_tiers.default_tier``
+
+    Returns:
+        str: Model name (defaults to the critic model if the role is not configured)
+    """
+    tier = resolve_latency_tier(latency_tier)
+    tier_models = (tier_config.get("tiers", {}) or {}).get(tier, {}) or {}
+    return resolve_model_name(tier_models.get(agent_role, "critic"))
+
+
+class ModelLatencyTracker:
+    """
+    Rolling latency samples per (agent role, model) used to check p95 against an SLO.
+
+    Roles are tracked separately because their calls differ in size: a slow
+    consolidation call should not move the category agents off the same model.
+    Samples older than ``window_seconds`` are dropped. While a role's model is
+    over its SLO, one call every ``probe_interval_seconds`` still goes to it,
+    so fresh samples can show it has recovered before the slow ones expire.
+    """
+
+    def __init__(
+        self,
+        slo_p95_seconds: Optional[Dict[str, float]] = None,
+        window_seconds: float = 900,
+        min_samples: int = 5,
+        probe_interval_seconds: float = 120,
+    ):
+        self.slo_p95_seconds = {
+            resolve_model_name(model): float(seconds)
+            for model, seconds in (slo_p95_seconds or {}).items()
+        }
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.probe_interval_seconds = probe_interval_seconds
+
+        self._samples: Dict[LatencyKey, Deque[Tuple[float, float]]] = {}
+        self._last_probe: Dict[LatencyKey, float] = {}
+        self._fallbacks: Dict[LatencyKey, int] = {}
+        self._probes: Dict[LatencyKey, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "ModelLatencyTracker":
+        """Build a tracker from the ``model_tiers`` section of config.yaml."""
+        tiers = config_data.get("model_tiers", {}) or {}
+        return cls(
+            slo_p95_seconds=tiers.get("slo_p95_seconds", {}),
+            window_seconds=tiers.get("latency_window_seconds", 900),
+            min_samples=tiers.get("min_latency_samples", 5),
+            probe_interval_seconds=tiers.get("latency_probe_interval_seconds", 120),
+        )
+
+    def record(self, role: str, model: str, seconds: float) -> None:
+        """Add a latency sample for an agent role's model."""
+        now = time.time()
+        with self._lock:
+            samples = self._samples.setdefault((role, model), deque())
+            samples.append((now, seconds))
+            self._expire(samples, now)
+
+    def p95(self, role: str, model: str) -> Optional[float]:
+        """Get the p95 latency of a role's model over the window, or None with too few samples."""
+        with self._lock:
+            samples = self._samples.get((role, model))
+            if not samples:
+                return None
+            self._expire(samples, time.time())
+            if len(samples) < self.min_samples:
+                return None
+            latencies = sorted(seconds for _, seconds in samples)
+            return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def over_slo(self, role: str, model: str) -> bool:
+        """Whether the observed p95 of a role's model is above the model's configured SLO."""
+        slo = self.slo_p95_seconds.get(model)
+        if slo is None:
+            return False
+        p95 = self.p95(role, model)
+        return p95 is not None and p95 > slo
+
+    def should_fall_back(self, role: str, model: str) -> bool:
+        """
+        Whether a role's next call should move off ``model``.
+
+        True while the model is over its SLO, except for one probe call per
+        ``probe_interval_seconds``. Counts the fallback or probe.
+        """
+        if not self.over_slo(role, model):
+            return False
+        key = (role, model)
+        now = time.time()
+        with self._lock:
+            if now - self._last_probe.get(key, 0.0) >= self.probe_interval_seconds:
+                self._last_probe[key] = now
+                self._probes[key] = self._probes.get(key, 0) + 1
+                return False
+            self._fallbacks[key] = self._fallbacks.get(key, 0) + 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get sample counts, p95, fallback and probe counters per ``role/model``."""
+        models = {}
+        for role, model in list(self._samples):
+            p95 = self.p95(role, model)
+            models[f"{role}/{model}"] = {
+                "samples": len(self._samples.get((role, model), ())),
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "slo_p95_seconds": self.slo_p95_seconds.get(model),
+                "over_slo": self.over_slo(role, model),
+            }
+        with self._lock:
+            fallbacks = {f"{role}/{model}": count for (role, model), count in self._fallbacks.items()}
+            probes = {f"{role}/{model}": count for (role, model), count in self._probes.items()}
+        return {"models": models, "fallbacks": fallbacks, "probes": probes}
+
+    def _expire(self, samples: Deque[Tuple[float, float]], now: float) -> None:
+        """Drop samples older than the window. Callers hold the lock."""
+        while samples and now - samples[0][0] > self.window_seconds:
+            samples.popleft()
+
+
+model_latency = ModelLatencyTracker.from_config(load_config())
+
+
+class TieredGemini(RateLimitedGemini):
+    """
+    Rate-limited Gemini model that records call latency for its agent role and
+    switches to ``fallback_model`` while its own model is over its p95 SLO.
+    """
+
+    agent_role: str = "default"
+    fallback_model: Optional[str] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        model = llm_request.model or self.model
+        if self.fallback_model and self.fallback_model != model and model_latency.should_fall_back(self.agent_role, model):
+            logger.warning(f"MODEL TIERS: {model} p95 for {self.agent_role} is over its SLO, using {self.fallback_model}")
+            llm_request.model = self.fallback_model
+
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        model_latency.record(self.agent_role, model, seconds)
+
+
+def agent_model(agent_role: str, latency_tier: Optional[str] = None) -> TieredGemini:
+    """
+    Create the model for an agent role in a latency tier.
+
+    Args:
+        agent_role: One of ``AGENT_ROLES``
+        latency_tier: "fast" or "deep"; defaults to ``model_tiers.default_tier``
+
+    Returns:
+        TieredGemini: Rate-limited model falling back to the worker model over SLO
+    """
+    model_name = agent_model_name(agent_role, latency_tier)
+    return TieredGemini(model=model_name, agent_role=agent_role, fallback_model=config.worker_model)
@@ -4,11 +4,79 @@ Prompt loader utility for loading agent prompts from YAML configuration.
 
 import yaml
 import os
+from functools import lru_cache
 from typing import Dict, Any
 
+# Category-specific focus areas, shared with the query router
+CATEGORY_FOCUS_AREAS = {
+    "Tools & Brushes": """
+   - Innovative brush designs and technologies
+   - Multi-functional beauty tools
+   - Sustainable and eco-friendly options
+   - Professional vs consumer tool trends
+   - Color and aesthetic trends in tool design""",
+    
+    "Skincare": """
+   - Active ingredients and formulations
+   - K-beauty and J-beauty innovations
+   - Anti-aging and preventative care trends
+   - Sustainable and clean beauty products
+   - Skin concerns and targeted solutions""",
+    
+    "Mini Size": """
+   - Travel-friendly product innovations
+   - Gift set and sampler trends
+   - Value-sized versions of popular products
+   - Limited edition mini collections
+   - Subscription box favorites""",
+    
+    "Men": """
+   - Men's grooming and skincare trends
+   - Color cosmetics for men
+   - Fragrance preferences and launches
+   - Celebrity male beauty influences
+   - Breaking gender beauty norms""",
+    
+    "Makeup": """
+   - Color trends and seasonal palettes
+   - Application techniques and styles
+   - Long-wear and innovative formulas
+   - Social media beauty challenges
+   - Runway and editorial inspirations""",
+    
+    "Hair": """
+   - Hair color trends and techniques
+   - Styling tools and innovations
+   - Hair care for different textures
+   - Protective and treatment products
+   - Celebrity and influencer hair looks""",
+    
+    "Gifts": """
+   - Holiday and seasonal gift sets
+   - Limited edition collections
+   - Luxury and prestige gifting
+   - Personalized and customizable options
+   - Value sets and bundles""",
+    
+    "Fragrance": """
+   - New fragrance launches and collections
+   - Scent families and note trends
+   - Celebrity and designer collaborations
+   - Niche and indie fragrance brands
+   - Seasonal and occasion-specific scents""",
+    
+    "Bath & Body": """
+   - Body care innovations and trends
+   - Aromatherapy and wellness products
+   - Seasonal scents and collections
+   - Sustainable and natural formulations
+   - Self-care and ritual-focused products"""
+}
+
+@lru_cache(maxsize=1)
 def load_prompts() -> Dict[str, Any]:
     """
-    Load prompts from the prompts.yml file.
+    Load prompts from the prompts.yml file, parsed once and cached.
     
     Returns:
         Dict containing all agent prompts and configurations
@@ -81,77 +149,32 @@ def get_category_agent_prompt(category: str) -> str:
     agent_config = get_agent_prompt('category_agent')
     base_instruction = agent_config['instruction']
 
-    # Category-specific focus areas
-    category_specifics = {
-        "Tools & Brushes": """
-   - Innovative brush designs and technologies
-   - Multi-functional beauty tools
-   - Sustainable and eco-friendly options
-   - Professional vs consumer tool trends
-   - Color and aesthetic trends in tool design""",
-        
-        "Skincare": """
-   - Active ingredients and formulations
-   - K-beauty and J-beauty innovations
-   - Anti-aging and preventative care trends
-   - Sustainable and clean beauty products
-   - Skin concerns and targeted solutions""",
-        
-        "Mini Size": """
-   - Travel-friendly product innovations
-   - Gift set and sampler trends
-   - Value-sized versions of popular products
-   - Limited edition mini collections
-   - Subscription box favorites""",
-        
-        "Men": """
-   - Men's grooming and skincare trends
-   - Color cosmetics for men
-   - Fragrance preferences and launches
-   - Celebrity male beauty influences
-   - Breaking gender beauty norms""",
-        
-        "Makeup": """
-   - Color trends and seasonal palettes
-   - Application techniques and styles
-   - Long-wear and innovative formulas
-   - Social media beauty challenges
-   - Runway and editorial inspirations""",
-        
-        "Hair": """
-   - Hair color trends and techniques
-   - Styling tools and innovations
-   - Hair care for different textures
-   - Protective and treatment products
-   - Celebrity and influencer hair looks""",
-        
-        "Gifts": """
-   - Holiday and seasonal gift sets
-   - Limited edition collections
-   - Luxury and prestige gifting
-   - Personalized and customizable options
-   - Value sets and bundles""",
-        
-        "Fragrance": """
-   - New fragrance launches and collections
-   - Scent families and note trends
-   - Celebrity and designer collaborations
-   - Niche and indie fragrance brands
-   - Seasonal and occasion-specific scents""",
-        
-        "Bath & Body": """
-   - Body care innovations and trends
-   - Aromatherapy and wellness products
-   - Seasonal scents and collections
-   - Sustainable and natural formulations
-   - Self-care and ritual-focused products"""
-    }
-    
-    category_focus = category_specifics.get(category, f"   - Product innovations in {category}\n   - Popular brands and launches\n   - Price point trends\n   - Consumer preferences")
+    category_focus = CATEGORY_FOCUS_AREAS.get(category, f"   - Product innovations in {category}\n   - Popular brands and launches\n   - Price point trends\n   - Consumer preferences")
     
     # Replace placeholders in the template
     return base_instruction.format(category=category, category_focus=category_focus)
 
+def get_consolidation_agent_prompt(category_output_keys: Dict[str, str]) -> str:
+    """
+    Get the consolidation agent instruction prompt.
+
+    Each category's findings are referenced as an optional ADK state placeholder
+    (``{<output_key>?}``) so the agent reads whatever the category agents wrote to
+    session state, and categories that did not run are simply left empty.
+
+    Args:
+        category_output_keys: Mapping of category name to the state key holding its findings
+
+    Returns:
+        The instruction string for the consolidation agent
+    """
+    agent_config = get_agent_prompt('consolidation_agent')
+    category_findings = "\n\n".join(
+        f"#### {category}\n{{{output_key}?}}"
+        for category, output_key in category_output_keys.items()
+    )
+    return agent_config['instruction'].format(category_findings=category_findings)
+
 # Convenience functions for backwards compatibility
 def get_trend_research_config() -> Dict[str, str]:
     """
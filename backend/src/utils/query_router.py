@@ -0,0 +1,286 @@
+"""Local query router that selects the category agents relevant to a query.
+
+A narrow query such as "bakuchiol serum" only needs the Skincare agent, not all
+nine categories. Routing is a keyword score over the category focus areas used
+in the category prompts plus curated keyword and ingredient dictionaries; broad
+queries that match nothing specific still go to every category.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Set
+
+from src.agents.create_parallel_category_agent import categories
+from src.config.load_config import load_config
+from src.utils.prompt_loader import CATEGORY_FOCUS_AREAS
+from src.utils.result_cache import normalize_query
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+# Weights for the different kinds of evidence a query term can provide
+CATEGORY_NAME_WEIGHT = 4
+KEYWORD_WEIGHT = 3
+INGREDIENT_WEIGHT = 3
+FOCUS_TERM_WEIGHT = 1
+
+# Curated product-type and vocabulary terms per category
+CATEGORY_KEYWORDS: Dict[str, List[str]] = {
+    "Makeup": [
+        "makeup", "foundation", "concealer", "lipstick", "lip gloss", "lip liner", "lip oil", "lip stain",
+        "eyeshadow", "mascara", "blush", "bronzer", "highlighter", "contour", "eyeliner", "brow",
+        "primer", "setting spray", "setting powder", "palette", "tinted moisturizer", "skin tint", "glam",
+    ],
+    "Skincare": [
+        "skincare", "skin care", "serum", "moisturizer", "cleanser", "toner", "essence", "sunscreen", "spf",
+        "face mask", "sheet mask", "eye cream", "exfoliant", "peel", "acne", "pores", "wrinkles",
+        "hyperpigmentation", "dark spots", "glass skin", "skin barrier", "k-beauty", "j-beauty", "anti-aging",
+    ],
+    "Hair": [
+        "hair", "shampoo", "conditioner", "hair mask", "hair oil", "scalp", "curls", "curly", "frizz",
+        "blowout", "hair color", "balayage", "highlights", "braids", "bond repair", "heat protectant",
+        "dry shampoo", "hairstyle", "haircut",
+    ],
+    "Tools & Brushes": [
+        "brush", "brushes", "sponge", "blender", "tool", "tools", "device", "led mask", "gua sha",
+        "jade roller", "face roller", "microcurrent", "curling iron", "straightener", "hair dryer",
+        "eyelash curler", "tweezers", "applicator",
+    ],
+    "Mini Size": [
+        "mini", "minis", "travel size", "travel-size", "sample", "samples", "trial size", "deluxe sample",
+        "travel", "on the go", "pocket size",
+    ],
+    "Men": [
+        "men", "mens", "men's", "male", "guys", "grooming", "beard", "shaving", "aftershave", "cologne for men",
+    ],
+    "Gifts": [
+        "gift", "gifts", "gifting", "gift set", "holiday set", "advent calendar", "stocking stuffer",
+        "value set", "bundle", "christmas", "valentine", "mother's day",
+    ],
+    "Fragrance": [
+        "fragrance", "perfume", "cologne", "eau de parfum", "eau de toilette", "body mist", "scent",
+        "scents", "notes", "layering scents", "gourmand", "oud", "musk", "vanilla perfume", "niche fragrance",
+    ],
+    "Bath & Body": [
+        "body", "body care", "body wash", "body lotion", "body oil", "body scrub", "body butter", "bath",
+        "bath bomb", "shower", "deodorant", "hand cream", "self tanner", "body sunscreen", "cellulite",
+    ],
+}
+
+# Ingredients and the categories they are most associated with
+INGREDIENT_CATEGORIES: Dict[str, List[str]] = {
+    "bakuchiol": ["Skincare"],
+    "retinol": ["Skincare"],
+    "retinal": ["Skincare"],
+    "tretinoin": ["Skincare"],
+    "niacinamide": ["Skincare"],
+    "hyaluronic acid": ["Skincare"],
+    "vitamin c": ["Skincare"],
+    "azelaic acid": ["Skincare"],
+    "salicylic acid": ["Skincare", "Bath & Body"],
+    "glycolic acid": ["Skincare", "Bath & Body"],
+    "lactic acid": ["Skincare", "Bath & Body"],
+    "ceramides": ["Skincare", "Bath & Body"],
+    "peptides": ["Skincare"],
+    "copper peptides": ["Skincare"],
+    "snail mucin": ["Skincare"],
+    "centella": ["Skincare"],
+    "cica": ["Skincare"],
+    "squalane": ["Skincare"],
+    "tranexamic acid": ["Skincare"],
+    "pdrn": ["Skincare"],
+    "exosomes": ["Skincare"],
+    "spf": ["Skincare"],
+    "keratin": ["Hair"],
+    "biotin": ["Hair"],
+    "rosemary oil": ["Hair"],
+    "rice water": ["Hair"],
+    "argan oil": ["Hair", "Skincare"],
+    "castor oil": ["Hair"],
+    "bond builder": ["Hair"],
+    "vanilla": ["Fragrance", "Bath & Body"],
+    "sandalwood": ["Fragrance"],
+    "bergamot": ["Fragrance"],
+    "amber": ["Fragrance"],
+    "pistachio": ["Fragrance", "Bath & Body"],
+    "shea butter": ["Bath & Body"],
+    "cocoa butter": ["Bath & Body"],
+    "urea": ["Bath & Body", "Skincare"],
+    "mica": ["Makeup"],
+    "pigment": ["Makeup"],
+}
+
+# Words in the focus areas that say nothing about a specific category
+_FOCUS_STOPWORDS = {
+    "and", "or", "the", "for", "of", "in", "to", "vs", "new", "trends", "trend", "products", "product",
+    "innovations", "innovative", "options", "popular", "seasonal", "limited", "edition", "collections",
+    "collection", "sustainable", "eco", "friendly", "natural", "clean", "beauty", "celebrity", "influencer",
+    "influences", "looks", "care", "different", "specific", "value", "launches", "designs", "technologies",
+    "formulations", "formulas", "preferences", "breaking", "norms", "professional", "consumer", "aesthetic",
+    "color", "styles", "social", "media", "challenges", "editorial", "inspirations", "runway", "self",
+    "ritual", "focused", "occasion", "sized", "versions", "favorites", "box", "sets", "set", "wellness",
+}
+
+
+@dataclass
+class RoutingDecision:
+    """The categories selected for a query and why.
+
+    Attributes:
+        categories (List[str]): Categories whose agents should run, in pipeline order.
+        scores (Dict[str, int]): Relevance score per matched category.
+        matched_terms (Dict[str, List[str]]): Query terms that matched each category.
+        reason (str): "routed", "broad_query", "forced" or "disabled".
+    """
+
+    categories: List[str]
+    scores: Dict[str, int] = field(default_factory=dict)
+    matched_terms: Dict[str, List[str]] = field(default_factory=dict)
+    reason: str = "routed"
+
+    @property
+    def is_subset(self) -> bool:
+        """Whether fewer than all categories were selected."""
+        return self.reason == "routed"
+
+
+def _focus_terms(focus_text: str) -> Set[str]:
+    """Extract distinctive single-word terms from a category focus area block."""
+    words = re.findall(r"[a-z][a-z'\-]+", focus_text.lower())
+    return {word for word in words if len(word) > 3 and word not in _FOCUS_STOPWORDS}
+
+
+class QueryRouter:
+    """
+    Scores a query against per-category term dictionaries.
+
+    A category is selected when its score reaches ``min_score`` and is at least
+    ``relative_threshold`` of the best category's score. If nothing qualifies the
+    query is treated as broad and every category is selected.
+    """
+
+    def __init__(
+        self,
+        categories: List[str],
+        min_score: int = 3,
+        relative_threshold: float = 0.5,
+        enabled: bool = True,
+    ):
+        self.categories = list(categories)
+        self.min_score = min_score
+        self.relative_threshold = relative_threshold
+        self.enabled = enabled
+
+        # term -> [(category, weight)]
+        self._terms: Dict[str, List[tuple]] = {}
+        for category in self.categories:
+            self._add_term(category.lower(), category, CATEGORY_NAME_WEIGHT)
+            for keyword in CATEGORY_KEYWORDS.get(category, []):
+                self._add_term(keyword, category, KEYWORD_WEIGHT)
+            for term in _focus_terms(CATEGORY_FOCUS_AREAS.get(category, "")):
+                self._add_term(term, category, FOCUS_TERM_WEIGHT)
+        for ingredient, ingredient_categories in INGREDIENT_CATEGORIES.items():
+            for category in ingredient_categories:
+                if category in self.categories:
+                    self._add_term(ingredient, category, INGREDIENT_WEIGHT)
+
+        self._max_term_words = max(len(term.split()) for term in self._terms)
+        self._routed = 0
+        self._broad = 0
+        self._forced = 0
+        self._agent_runs_skipped = 0
+
+    @classmethod
+    def from_config(cls, config_data: Dict, categories: List[str]) -> "QueryRouter":
+        """Build a router from the ``query_router`` section of config.yaml."""
+        router_config = config_data.get("query_router", {}) or {}
+        return cls(
+            categories=categories,
+            min_score=router_config.get("min_score", 3),
+            relative_threshold=router_config.get("relative_threshold", 0.5),
+            enabled=router_config.get("enabled", True),
+        )
+
+    def route(self, query: str, force_all: bool = False) -> RoutingDecision:
+        """
+        Select the categories relevant to a query and count the decision.
+
+        Args:
+            query: Raw user query
+            force_all: Skip routing and select every category
+
+        Returns:
+            RoutingDecision: Selected categories with scores and matched terms
+        """
+        decision = self.select(query, force_all=force_all)
+        if decision.reason in ("forced", "disabled"):
+            self._forced += 1
+            return decision
+        if decision.reason == "broad_query":
+            self._broad += 1
+        else:
+            self._routed += 1
+            self._agent_runs_skipped += len(self.categories) - len(decision.categories)
+
+        logger.info(f"QUERY ROUTER: '{query}' -> {decision.categories} ({decision.reason}, scores={decision.scores})")
+        return decision
+
+    def select(self, query: str, force_all: bool = False) -> RoutingDecision:
+        """Select the categories relevant to a query, without counting or logging it (see ``route``)."""
+        if force_all or not self.enabled:
+            return RoutingDecision(categories=list(self.categories), reason="forced" if force_all else "disabled")
+
+        scores: Dict[str, int] = {}
+        matched: Dict[str, List[str]] = {}
+        for term in self._query_terms(query):
+            for category, weight in self._terms.get(term, []):
+                scores[category] = scores.get(category, 0) + weight
+                matched.setdefault(category, []).append(term)
+
+        best = max(scores.values(), default=0)
+        selected = [
+            category for category in self.categories
+            if scores.get(category, 0) >= self.min_score
+            and scores.get(category, 0) >= best * self.relative_threshold
+        ]
+
+        if not selected:
+            return RoutingDecision(categories=list(self.categories), scores=scores, matched_terms=matched, reason="broad_query")
+        return RoutingDecision(categories=selected, scores=scores, matched_terms=matched)
+
+    def stats(self) -> Dict:
+        """Get routing counters."""
+        return {
+            "enabled": self.enabled,
+            "routed_queries": self._routed,
+            "broad_queries": self._broad,
+            "forced_all_categories": self._forced,
+            "category_agent_runs_skipped": self._agent_runs_skipped,
+        }
+
+    def _add_term(self, term: str, category: str, weight: int) -> None:
+        """Register a term, keeping only the strongest weight per category."""
+        entries = self._terms.setdefault(term.lower(), [])
+        for i, (existing_category, existing_weight) in enumerate(entries):
+            if existing_category == category:
+                entries[i] = (category, max(existing_weight, weight))
+                return
+        entries.append((category, weight))
+
+    def _query_terms(self, query: str) -> List[str]:
+        """Get the distinct 1..n-word phrases of a query that appear in the dictionaries."""
+        words = re.findall(r"[a-z0-9][a-z0-9'\-]*", normalize_query(query))
+        terms = []
+        for size in range(1, self._max_term_words + 1):
+            for start in range(len(words) - size + 1):
+                phrase = " ".join(words[start:start + size])
+                if phrase in self._terms and phrase not in terms:
+                    terms.append(phrase)
+        # A plural query word also matches the singular dictionary term
+        for word in words:
+            if word.endswith("s") and word[:-1] in self._terms and word[:-1] not in terms:
+                terms.append(word[:-1])
+        return terms
+
+
+query_router = QueryRouter.from_config(load_config(), categories)
@@ -0,0 +1,353 @@
+"""Process-wide rate limiting for Gemini model calls.
+
+Every agent's model is a ``RateLimitedGemini``, so all concurrent sessions and
+category agents draw from one token bucket and one adaptive concurrency limit.
+On a 429 RESOURCE_EXHAUSTED the limit is cut multiplicatively (AIMD), all calls
+pause for the server's retry delay, and the call is retried transparently.
+"""
+
+import asyncio
+import contextlib
+import random
+import re
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Deque, Dict, Optional
+
+from google.adk.models import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import Client
+from google.genai.errors import ClientError
+
+from src.config.load_config import load_config
+from src.utils.deadline import DeadlineExceededError, check_deadline, deadline_allows
+from src.utils.genai_client import genai_client
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class ModelRateLimitedError(Exception):
+    """Raised when a model call is still rate limited after all retries.
+
+    Attributes:
+        retry_after (float): Seconds the server asked clients to wait.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_delay(error: Exception) -> Optional[float]:
+    """
+    Get the retry delay the server sent with a 429 error.
+
+    Reads the ``google.rpc.RetryInfo`` detail (``"retryDelay": "12s"``) and falls
+    back to the "retry in 12.3s" hint in the error message.
+
+    Args:
+        error: The ClientError raised by the model call
+
+    Returns:
+        float: Seconds to wait, or None if the server did not say
+    """
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        for detail in details.get("error", {}).get("details", []) or []:
+            if isinstance(detail, dict) and detail.get("@type", "").endswith("RetryInfo"):
+                match = re.match(r"([\d.]+)s", str(detail.get("retryDelay", "")))
+                if match:
+                    return float(match.group(1))
+
+    match = re.search(r"retry in ([\d.]+)\s*s", str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket plus an AIMD concurrency limit shared by all model calls.
+
+    The bucket caps the request rate; the concurrency limit grows by one after
+    ``increase_every`` consecutive successes and is multiplied by
+    ``decrease_factor`` on every 429. State is only touched from the event loop,
+    so no lock is needed.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        burst: int = 10,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        increase_every: int = 5,
+        decrease_factor: float = 0.5,
+        max_retries: int = 5,
+        base_backoff_seconds: float = 2.0,
+        max_backoff_seconds: float = 60.0,
+        enabled: bool = True,
+    ):
+        self.rate_per_second = max(requests_per_minute, 1) / 60.0
+        self.burst = max(1, burst)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.increase_every = max(1, increase_every)
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.enabled = enabled
+
+        self._limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._success_streak = 0
+
+        self._calls = 0
+        self._rate_limited = 0
+        self._retries = 0
+        self._exhausted = 0
+        self._wait_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "AdaptiveRateLimiter":
+        """Build a limiter from the ``rate_limiter`` section of config.yaml."""
+        limiter_config = config_data.get("rate_limiter", {}) or {}
+        return cls(
+            requests_per_minute=limiter_config.get("requests_per_minute", 60),
+            burst=limiter_config.get("burst", 10),
+            initial_concurrency=limiter_config.get("initial_concurrency", 8),
+            min_concurrency=limiter_config.get("min_concurrency", 1),
+            max_concurrency=limiter_config.get("max_concurrency", 16),
+            increase_every=limiter_config.get("increase_every", 5),
+            decrease_factor=limiter_config.get("decrease_factor", 0.5),
+            max_retries=limiter_config.get("max_retries", 5),
+            base_backoff_seconds=limiter_config.get("base_backoff_seconds", 2.0),
+            max_backoff_seconds=limiter_config.get("max_backoff_seconds", 60.0),
+            enabled=limiter_config.get("enabled", True),
+        )
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Current whole-number concurrency limit."""
+        return max(self.min_concurrency, int(self._limit))
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one concurrency slot and one rate token for the duration of a call."""
+        if not self.enabled:
+            yield
+            return
+
+        started = time.monotonic()
+        await self._acquire_slot()
+        try:
+            await self._acquire_token()
+            self._calls += 1
+            self._wait_seconds += time.monotonic() - started
+            yield
+        finally:
+            self._in_flight -= 1
+            self._wake_waiters()
+
+    def record_success(self) -> None:
+        """Additive increase: raise the limit after a streak of successful calls."""
+        self._success_streak += 1
+        if self._success_streak >= self.increase_every and self._limit < self.max_concurrency:
+            self._limit = min(self.max_concurrency, self._limit + 1)
+            self._success_streak = 0
+            logger.info(f"RATE LIMITER: Concurrency limit raised to {self.concurrency_limit}")
+            self._wake_waiters()
+
+    def record_rate_limited(self, retry_after: float) -> None:
+        """
+        Multiplicative decrease: cut the limit and pause every caller.
+
+        Args:
+            retry_after: Seconds before any call may be sent again
+        """
+        self._rate_limited += 1
+        self._success_streak = 0
+        self._limit = max(self.min_concurrency, self._limit * self.decrease_factor)
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._tokens = 0.0
+        logger.warning(
+            f"RATE LIMITER: 429 from model, concurrency limit cut to {self.concurrency_limit}, "
+            f"pausing calls for {retry_after:.1f}s"
+        )
+
+    def record_retry(self) -> None:
+        """Count a call retried after a 429."""
+        self._retries += 1
+
+    def record_exhausted(self) -> None:
+        """Count a call that gave up after a 429."""
+        self._exhausted += 1
+
+    def backoff_delay(self, attempt: int, server_delay: Optional[float]) -> float:
+        """Get the delay before retry ``attempt``, preferring the server's value."""
+        if server_delay is not None:
+            return server_delay
+        delay = min(self.max_backoff_seconds, self.base_backoff_seconds * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter state and counters."""
+        return {
+            "enabled": self.enabled,
+            "concurrency_limit": self.concurrency_limit,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "calls": self._calls,
+            "rate_limited": self._rate_limited,
+            "retries": self._retries,
+            "retries_exhausted": self._exhausted,
+            "avg_wait_seconds": round(self._wait_seconds / self._calls, 4) if self._calls else 0.0,
+        }
+
+    async def _acquire_slot(self) -> None:
+        """Wait until a call may start under the current concurrency limit."""
+        while self._in_flight >= self.concurrency_limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._in_flight += 1
+
+    async def _acquire_token(self) -> None:
+        """Wait out any 429 pause, then take one token from the bucket."""
+        while True:
+            now = time.monotonic()
+            if self._paused_until > now:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_second)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+    def _wake_waiters(self) -> None:
+        """Wake as many waiting callers as there are free slots."""
+        free = self.concurrency_limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+gemini_rate_limiter = AdaptiveRateLimiter.from_config(load_config())
+
+
+class RateLimitedGemini(Gemini):
+    """
+    Gemini model whose calls go through the shared ``gemini_rate_limiter``.
+
+    A 429 is retried after the server's retry delay (or exponential backoff)
+    unless part of a streamed response was already yielded, since that output
+    cannot be taken back. No call is started, and no retry waited for, past the
+    request deadline (``src.utils.deadline``). A call holds its limiter slot only
+    while the request is sent and its response read, not while the caller handles
+    the responses, so latency samples measure the model alone. Calls use the
+    process-wide pooled ``genai_client`` unless the model was given its own ``client``.
+    """
+
+    @property
+    def api_client(self) -> Client:
+        """The shared pooled client of the running loop (see ``src.utils.genai_client``)."""
+        if self.client is None and genai_client.enabled:
+            return genai_client.get(self)
+        return Gemini.api_client.__get__(self, type(self))
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        limiter = gemini_rate_limiter
+        attempt = 0
+        while True:
+            yielded = False
+            check_deadline("model_call")
+            try:
+                async for response in self._call_in_slot(llm_request, stream):
+                    yielded = True
+                    yield response
+                limiter.record_success()
+                return
+            except ClientError as e:
+                if e.code != 429:
+                    raise
+
+                server_delay = parse_retry_delay(e)
+                delay = limiter.backoff_delay(attempt, server_delay)
+                limiter.record_rate_limited(delay)
+                if yielded or attempt >= limiter.max_retries or not limiter.enabled:
+                    limiter.record_exhausted()
+                    raise ModelRateLimitedError(
+                        f"Model {self.model} is rate limited after {attempt + 1} attempts", retry_after=delay
+                    ) from e
+
+                if not deadline_allows(delay):
+                    limiter.record_exhausted()
+                    raise DeadlineExceededError(
+                        f"Model {self.model} retry in {delay:.1f}s would end past the request deadline",
+                        stage="model_call",
+                    ) from e
+
+                attempt += 1
+                limiter.record_retry()
+                logger.info(f"RATE LIMITER: Retrying {self.model} call (attempt {attempt + 1}) after {delay:.1f}s")
+
+    async def _call_in_slot(self, llm_request: LlmRequest, stream: bool) -> AsyncGenerator[LlmResponse, None]:
+        """
+        Make one model call under a limiter slot, handing its responses over through a queue.
+
+        The slot covers only the request and the reading of its response stream,
+        which run in their own task. It is released when the stream ends, not
+        when the caller has handled every response: ADK runs function tools and
+        callbacks while the caller handles a response, and those may need a slot
+        of their own (the search tool does), which would deadlock at a limit of 1.
+        """
+        responses: asyncio.Queue = asyncio.Queue()
+        end = object()
+
+        async def read_stream() -> None:
+            try:
+                async with gemini_rate_limiter.slot():
+                    started = time.monotonic()
+                    async for response in Gemini.generate_content_async(self, llm_request, stream):
+                        responses.put_nowait(response)
+                    self.record_latency(llm_request.model or self.model, time.monotonic() - started)
+                responses.put_nowait(end)
+            except Exception as e:
+                responses.put_nowait(e)
+
+        reader = asyncio.create_task(read_stream())
+        try:
+            while True:
+                item = await responses.get()
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not reader.done():
+                reader.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await reader
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        """Hook called with the model time of each successful call, excluding limiter waits."""
@@ -0,0 +1,436 @@
+"""Local structuring of research findings into a ``SephoraTrendsReport``.
+
+The output composer spends a full LLM round trip restructuring research
+markdown into JSON. When the findings follow the research prompt's layout
+(category headings, then per-trend "Trend Name:", "Trend Summary:",
+"Keyword Associations:", "Hashtags:" ... fields) this parser builds the report
+directly. Category findings from the parallel pipeline are JSON arrays and are
+mapped field by field. The result is validated against the pydantic models and
+only used when it passes; otherwise the output composer agent runs as before.
+"""
+
+import json
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from src.config.load_config import load_config
+from src.models.session_models import SephoraTrendsReport, TrendCategory, TrendItem
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+# Category name patterns (checked in order) and the TrendCategory field they map to
+CATEGORY_PATTERNS: List[Tuple[str, str, str]] = [
+    (r"tools?\s*(?:&|and)\s*brush(?:es)?|beauty tools|tools", "tools_brushes_trends", "Tools & Brushes"),
+    (r"bath\s*(?:&|and)\s*body|body care", "bath_body_trends", "Bath & Body"),
+    (r"mini[\s-]*sizes?|minis?|travel[\s-]*size", "mini_size_trends", "Mini Size"),
+    (r"men'?s?(?:'s)?(?:\s+grooming)?|grooming", "men_trends", "Men"),
+    (r"skin\s*care", "skincare_trends", "Skincare"),
+    (r"make\s*-?up", "makeup_trends", "Makeup"),
+    (r"hair(?:\s*care)?", "hair_trends", "Hair"),
+    (r"gifts?(?:\s*sets?)?|gifting", "gifts_trends", "Gifts"),
+    (r"fragrances?|perfumes?", "fragrance_trends", "Fragrance"),
+]
+
+# Output keys written by the parallel category agents, mapped to TrendCategory fields
+CATEGORY_FINDINGS_KEYS: Dict[str, str] = {
+    "tools_brushes_category_findings": "tools_brushes_trends",
+    "skincare_category_findings": "skincare_trends",
+    "mini_size_category_findings": "mini_size_trends",
+    "men_category_findings": "men_trends",
+    "makeup_category_findings": "makeup_trends",
+    "hair_category_findings": "hair_trends",
+    "gifts_category_findings": "gifts_trends",
+    "fragrance_category_findings": "fragrance_trends",
+    "bath_body_category_findings": "bath_body_trends",
+}
+
+# Research prompt field labels and the TrendItem field they fill
+FIELD_LABELS: Dict[str, str] = {
+    "trend name": "trend_name",
+    "trend summary": "trend_summary",
+    "trend description": "trend_description",
+    "category associations": "category_associations",
+    "category association": "category_associations",
+    "ingredients": "ingredients",
+    "product feature associations": "product_features",
+    "product features": "product_features",
+    "keyword associations": "keywords",
+    "keywords": "keywords",
+    "hashtags": "hashtags",
+}
+
+# Other labels from the research prompt; they end the current field but are not mapped
+IGNORED_LABEL_PREFIXES = (
+    "consumer sentiment", "virality", "style and look", "image bank", "expert comments",
+    "external beauty experts", "relevant influencers", "relevant style content", "synthesized insights",
+    "summaries from social data", "summarized social data", "social data", "citations", "sources",
+    "top sephora brands", "associated sephora products", "top categories", "top sub-categories",
+    "world", "key products", "difficulty", "target demographic", "techniques", "popularity",
+)
+
+# List values that mean "nothing found"
+_EMPTY_VALUES = {"n/a", "na", "none", "not applicable", "not specified", "not found", "-"}
+
+LIST_FIELDS = {"category_associations", "ingredients", "product_features", "keywords", "hashtags"}
+
+# Words that may appear in a category heading besides the category name itself
+_HEADING_FILLER = {
+    "trends", "trend", "category", "categories", "top", "emerging", "key", "the", "in", "for", "s",
+    "specific", "highlights", "findings", "world",
+}
+
+_FIELD_LINE = re.compile(
+    r"^\s*(?:[-*+]\s+|\d+[.)]\s+)?[*_]*\s*(?P<label>[A-Za-z][A-Za-z &()/'-]{1,60}?)\s*[*_]*\s*:\s*[*_]*\s*(?P<value>.*)$"
+)
+_HEADING_LINE = re.compile(r"^\s*(?:#{1,6}\s+|\d+[.)]\s+\*\*|\*\*)(?P<text>.+?)\s*$")
+
+
+class LocalReportParser:
+    """
+    Builds and validates a ``SephoraTrendsReport`` without an LLM call.
+
+    ``stats()`` reports how often the fast path succeeded and why it fell back.
+    """
+
+    def __init__(self, enabled: bool = True, min_trends: int = 2):
+        self.enabled = enabled
+        self.min_trends = min_trends
+
+        self._lock = threading.Lock()
+        self._attempts = 0
+        self._successes = 0
+        self._fallback_reasons: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "LocalReportParser":
+        """Build a parser from the ``report_parser`` section of config.yaml."""
+        parser_config = config_data.get("report_parser", {}) or {}
+        return cls(
+            enabled=parser_config.get("enabled", True),
+            min_trends=parser_config.get("min_trends", 2),
+        )
+
+    def parse(self, state: Dict[str, Any]) -> Optional[SephoraTrendsReport]:
+        """
+        Structure the research findings in session state.
+
+        Category findings from the parallel pipeline are used when every one of
+        them parses as JSON; otherwise the research markdown is parsed.
+
+        Args:
+            state: Session state holding ``sephora_trend_research_findings`` and,
+                for the parallel pipeline, the ``*_category_findings`` entries
+
+        Returns:
+            SephoraTrendsReport: The validated report, or None to fall back to the output composer
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            self._attempts += 1
+
+        research = state.get("sephora_trend_research_findings") or ""
+        category_findings = {
+            key: value for key, value in state.items()
+            if key in CATEGORY_FINDINGS_KEYS and value
+        }
+
+        trends = parse_category_findings(category_findings) if category_findings else None
+        if trends is None:
+            if not research:
+                return self._fallback("no_research_findings")
+            trends = parse_research_markdown(research)
+
+        report = {
+            "report_summary": extract_report_summary(research, trends),
+            "trends": trends,
+            "discovery_date": datetime.utcnow().strftime("%Y-%m-%d"),
+            "total_trends_found": sum(len(items) for items in trends.values()),
+        }
+
+        reason = self._validation_error(report)
+        if reason:
+            return self._fallback(reason)
+
+        with self._lock:
+            self._successes += 1
+        logger.info(f"REPORT PARSER: Structured {report['total_trends_found']} trends locally")
+        return SephoraTrendsReport.model_validate(_with_aliases(report))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get fast-path attempt/success counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "attempts": self._attempts,
+                "fast_path_successes": self._successes,
+                "fast_path_rate": round(self._successes / self._attempts, 4) if self._attempts else 0.0,
+                "fallback_reasons": dict(self._fallback_reasons),
+            }
+
+    def _validation_error(self, report: Dict[str, Any]) -> Optional[str]:
+        """Get the reason a parsed report is not good enough, or None if it is."""
+        if report["total_trends_found"] < self.min_trends:
+            return "too_few_trends"
+        for items in report["trends"].values():
+            for item in items:
+                if not item.get("trend_name") or len(item["trend_name"]) > 120:
+                    return "invalid_trend_name"
+                if not (item.get("trend_summary") or item.get("trend_description")):
+                    return "missing_trend_text"
+        if not report["report_summary"]:
+            return "missing_summary"
+        try:
+            SephoraTrendsReport.model_validate(_with_aliases(report))
+        except ValidationError:
+            return "schema_validation"
+        return None
+
+    def _fallback(self, reason: str) -> None:
+        with self._lock:
+            self._fallback_reasons[reason] = self._fallback_reasons.get(reason, 0) + 1
+        logger.info(f"REPORT PARSER: Falling back to the output composer ({reason})")
+        return None
+
+
+def match_category_heading(line: str) -> Optional[Tuple[str, str]]:
+    """
+    Get the category a heading line introduces.
+
+    Args:
+        line: A line of research markdown
+
+    Returns:
+        tuple: (TrendCategory field, display name), or None if the line is not a category heading
+    """
+    heading = _HEADING_LINE.match(line)
+    if not heading:
+        return None
+    text = re.sub(r"[*_#`:]", " ", heading.group("text")).lower()
+    text = re.sub(r"^\s*\d+[.)]?\s*", "", text)
+    if len(text) > 60:
+        return None
+
+    for pattern, field, display_name in CATEGORY_PATTERNS:
+        match = re.search(rf"\b(?:{pattern})\b", text)
+        if not match:
+            continue
+        rest = (text[:match.start()] + " " + text[match.end():]).replace("(", " ").replace(")", " ")
+        leftover = [word for word in re.findall(r"[a-z']+", rest) if word not in _HEADING_FILLER]
+        if not leftover:
+            return field, display_name
+    return None
+
+
+def parse_research_markdown(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Parse research markdown laid out by category heading and labelled trend fields.
+
+    Args:
+        text: Research findings markdown
+
+    Returns:
+        dict: TrendCategory field -> list of trend dicts
+    """
+    trends: Dict[str, List[Dict[str, Any]]] = {field: [] for field in TrendCategory.model_fields}
+    category: Optional[Tuple[str, str]] = None
+    current: Optional[Dict[str, List[str]]] = None
+    current_field: Optional[str] = None
+
+    def flush() -> None:
+        if category and current and current.get("trend_name"):
+            raw = {field: "\n".join(lines) for field, lines in current.items()}
+            trends[category[0]].append(_build_trend(raw, category[1]))
+
+    for line in text.splitlines():
+        heading_category = match_category_heading(line)
+        if heading_category:
+            flush()
+            category, current, current_field = heading_category, None, None
+            continue
+
+        field_match = _FIELD_LINE.match(line)
+        if field_match:
+            label = field_match.group("label").strip().lower()
+            mapped = FIELD_LABELS.get(label)
+            if mapped == "trend_name":
+                flush()
+                current = {}
+            if mapped and current is not None:
+                current_field = mapped
+                current.setdefault(mapped, [])
+                if field_match.group("value").strip():
+                    current[mapped].append(field_match.group("value"))
+                continue
+            if label.startswith(IGNORED_LABEL_PREFIXES):
+                current_field = None
+                continue
+
+        if current is not None and current_field:
+            current[current_field].append(line)
+
+    flush()
+    return trends
+
+
+def parse_category_findings(findings_by_key: Dict[str, Any]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """
+    Map the parallel pipeline's per-category JSON findings to trend dicts.
+
+    Args:
+        findings_by_key: ``*_category_findings`` state entries
+
+    Returns:
+        dict: TrendCategory field -> list of trend dicts, or None if any entry is not a JSON array
+    """
+    trends: Dict[str, List[Dict[str, Any]]] = {field: [] for field in TrendCategory.model_fields}
+    display_names = {field: display_name for _, field, display_name in CATEGORY_PATTERNS}
+
+    for key, findings in findings_by_key.items():
+        items = _load_json_array(findings)
+        if items is None:
+            return None
+        field = CATEGORY_FINDINGS_KEYS[key]
+        for item in items:
+            if not isinstance(item, dict):
+                return None
+            normalized = {re.sub(r"[\s_]+", " ", str(name)).strip().lower(): value for name, value in item.items()}
+            raw = {
+                "trend_name": normalized.get("trend name", ""),
+                "trend_summary": normalized.get("trend summary", ""),
+                "trend_description": normalized.get("trend description", ""),
+                "keywords": normalized.get("keywords", []),
+                "hashtags": normalized.get("hashtags", []),
+                "product_features": normalized.get("product features", []),
+                "ingredients": normalized.get("ingredients", []),
+                "category_associations": normalized.get("top categories", []),
+            }
+            trends[field].append(_build_trend(raw, display_names[field]))
+    return trends
+
+
+def extract_report_summary(research: str, trends: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    Get the report summary: the research text before the first category section,
+    or a generated overview when the research has no introduction.
+    """
+    paragraphs: List[str] = []
+    for line in (research or "").splitlines():
+        if match_category_heading(line) or _is_trend_field(line):
+            break
+        if line.lstrip().startswith("#"):
+            continue
+        paragraphs.append(line.rstrip())
+
+    summary = re.sub(r"\n{3,}", "\n\n", "\n".join(paragraphs)).strip()
+    if len(summary) >= 100:
+        return summary
+
+    counts = {
+        display_name: len(trends.get(field, []))
+        for _, field, display_name in CATEGORY_PATTERNS
+        if trends.get(field)
+    }
+    if not counts:
+        return ""
+    total = sum(counts.values())
+    breakdown = ", ".join(f"{name} ({count})" for name, count in counts.items())
+    return f"The research identified {total} emerging beauty trends across {len(counts)} Sephora categories: {breakdown}."
+
+
+def _with_aliases(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-key a report by field alias for validation.
+
+    The models only accept their camelCase aliases; like the output composer's
+    structured output, the report is validated by alias and dumped by field name.
+    """
+    def by_alias(model, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {(model.model_fields[key].alias or key) if key in model.model_fields else key: value
+                for key, value in data.items()}
+
+    aliased = by_alias(SephoraTrendsReport, report)
+    aliased["trends"] = {
+        TrendCategory.model_fields[field].alias or field: [by_alias(TrendItem, item) for item in items]
+        for field, items in report["trends"].items()
+    }
+    return aliased
+
+
+def _is_trend_field(line: str) -> bool:
+    """Whether a line starts one of the mapped trend fields."""
+    field_match = _FIELD_LINE.match(line)
+    return bool(field_match and field_match.group("label").strip().lower() in FIELD_LABELS)
+
+
+def _build_trend(raw: Dict[str, Any], category_name: str) -> Dict[str, Any]:
+    """Turn collected field values into a TrendItem dict."""
+    trend: Dict[str, Any] = {}
+    for field in ("trend_name", "trend_summary", "trend_description"):
+        trend[field] = _clean_text(raw.get(field, ""))
+    for field in LIST_FIELDS:
+        trend[field] = _clean_list(raw.get(field, []), field)
+
+    trend["trend_name"] = trend["trend_name"].splitlines()[0].strip(" \"'") if trend["trend_name"] else ""
+    if not trend["category_associations"]:
+        trend["category_associations"] = [category_name]
+    return trend
+
+
+def _clean_text(value: Any) -> str:
+    """Strip markdown emphasis markers and surplus blank lines from a text field."""
+    text = re.sub(r"\*\*|__", "", str(value or ""))
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip().strip("*_ ").strip()
+
+
+def _clean_list(value: Any, field: str) -> List[str]:
+    """Get list items from a JSON list, or split text (bullets or comma-separated) into items."""
+    if isinstance(value, list):
+        parts = [str(part) for part in value]
+    else:
+        text = str(value or "").strip().strip("[]")
+        parts = []
+        for line in text.splitlines():
+            line = re.sub(r"^\s*(?:[-*+]\s+|\d+[.)]\s+)", "", line)
+            parts.extend(re.split(r"[,;]", line))
+
+    if field == "hashtags":
+        tags = re.findall(r"#[\w]+", " ".join(parts))
+        if tags:
+            parts = tags
+        else:
+            parts = [f"#{part.strip().lstrip('#')}" for part in parts if part.strip()]
+
+    items = []
+    for part in parts:
+        item = re.sub(r"\*\*|__|`", "", part).strip().strip("\"'.").strip()
+        if field == "keywords":
+            item = item.lstrip("#")
+        if item and item.lower() not in _EMPTY_VALUES and item not in items:
+            items.append(item)
+    return items
+
+
+def _load_json_array(findings: Any) -> Optional[List[Any]]:
+    """Get the JSON array in a category agent's output, tolerating code fences and prose."""
+    if isinstance(findings, list):
+        return findings
+    text = str(findings)
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, list) else None
+
+
+report_parser = LocalReportParser.from_config(load_config())
@@ -0,0 +1,262 @@
+"""Query-result cache for trend discovery runs.
+
+Caches the structured ``SephoraTrendsReport`` payload returned by the agent
+pipeline, keyed on the normalized query and the discovery date window, so a
+repeated query does not trigger another multi-minute agent run.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from src.config.load_config import load_config
+from src.utils.json_persist import DebouncedJSONWriter
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a trend query so trivially different phrasings share a cache entry.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        str: Lowercased query with collapsed whitespace and no trailing punctuation
+    """
+    normalized = unicodedata.normalize("NFKC", query or "").lower()
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return normalized.strip(" ?!.,;:")
+
+
+def discovery_window(window_days: int = 1, today: Optional[date] = None) -> str:
+    """
+    Get the discovery date window a query falls into.
+
+    Windows are aligned to fixed multiples of ``window_days`` since the epoch so
+    every process computes the same window for the same day.
+
+    Args:
+        window_days: Width of a window in days
+        today: Date to compute the window for (defaults to today, UTC)
+
+    Returns:
+        str: ISO date of the first day of the window
+    """
+    today = today or datetime.utcnow().date()
+    window_days = max(1, int(window_days))
+    ordinal = today.toordinal()
+    return date.fromordinal(ordinal - (ordinal % window_days)).isoformat()
+
+
+class QueryResultCache:
+    """
+    TTL + LRU cache of trend reports with JSON persistence.
+
+    Entries are kept in an ``OrderedDict`` in least-recently-used order and
+    written to ``persist_path`` so they survive restarts. Writes happen on a
+    background thread at most once per ``persist_delay_seconds``; call
+    ``flush()`` at shutdown to write the last changes.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 21600,
+        max_entries: int = 256,
+        persist_path: Optional[str] = None,
+        window_days: int = 1,
+        enabled: bool = True,
+        persist_delay_seconds: float = 1.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.persist_path = os.path.abspath(persist_path) if persist_path else None
+        self.window_days = window_days
+        self.enabled = enabled
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._writer = (
+            DebouncedJSONWriter(self.persist_path, self._snapshot, persist_delay_seconds, "RESULT CACHE")
+            if self.persist_path else None
+        )
+
+        if self.enabled and self.persist_path:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "QueryResultCache":
+        """Build a cache from the ``result_cache`` section of config.yaml."""
+        cache_config = config_data.get("result_cache", {}) or {}
+        return cls(
+            ttl_seconds=cache_config.get("ttl_seconds", 21600),
+            max_entries=cache_config.get("max_entries", 256),
+            persist_path=cache_config.get("persist_path", "src/data/cache/result_cache.json"),
+            window_days=cache_config.get("date_window_days", 1),
+            enabled=cache_config.get("enabled", True),
+            persist_delay_seconds=cache_config.get("persist_delay_seconds", 1.0),
+        )
+
+    def make_key(self, query: str, window: Optional[str] = None) -> str:
+        """
+        Build the cache key for a query.
+
+        Args:
+            query: Raw user query
+            window: Discovery window override (defaults to the current window)
+
+        Returns:
+            str: Cache key combining the discovery window and normalized query
+        """
+        window = window or discovery_window(self.window_days)
+        return f"{window}|{normalize_query(query)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached report.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            The cached report, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if entry["expires_at"] <= time.time():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                self._persist()
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry["value"]
+
+    def contains(self, key: str) -> bool:
+        """Whether an unexpired report is cached for ``key``, without counting a hit or miss."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry["expires_at"] > time.time()
+
+    def set(self, key: str, value: Dict[str, Any], query: str = "") -> None:
+        """
+        Store a report, evicting the least recently used entries past the cap.
+
+        Args:
+            key: Cache key from ``make_key``
+            value: Report payload to cache
+            query: Original query, kept for inspection of the cache file
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "query": query,
+                "created_at": now,
+                "expires_at": now + self.ttl_seconds,
+                "value": value,
+            }
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._evictions += 1
+                logger.info(f"RESULT CACHE: Evicted least recently used entry '{evicted_key}'")
+
+            self._persist()
+
+    def invalidate(self, key: str) -> bool:
+        """Remove a single entry. Returns True if it existed."""
+        with self._lock:
+            removed = self._entries.pop(key, None) is not None
+            if removed:
+                self._persist()
+            return removed
+
+    def clear(self) -> None:
+        """Remove every entry from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            self._persist()
+
+    def flush(self) -> None:
+        """Write pending changes to disk now. Blocks; call it off the event loop."""
+        if self._writer:
+            self._writer.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "persist_writes": self._writer.writes if self._writer else 0,
+            }
+
+    def _load(self) -> None:
+        """Load unexpired entries from disk, oldest first to preserve LRU order."""
+        if not os.path.exists(self.persist_path):
+            return
+
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            now = time.time()
+            entries = [
+                (key, entry)
+                for key, entry in data.get("entries", {}).items()
+                if entry.get("expires_at", 0) > now
+            ]
+            for key, entry in entries[-self.max_entries:]:
+                self._entries[key] = entry
+
+            logger.info(f"RESULT CACHE: Loaded {len(self._entries)} entries from {self.persist_path}")
+        except Exception as e:
+            logger.error(f"RESULT CACHE: Failed to load cache file {self.persist_path}: {e}")
+
+    def _persist(self) -> None:
+        """Schedule a background write of the cache. Callers must hold the lock."""
+        if self._writer:
+            self._writer.schedule()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Copy the entries for the writer thread; entries are replaced, never mutated."""
+        with self._lock:
+            return {"entries": dict(self._entries)}
+
+
+result_cache = QueryResultCache.from_config(load_config())
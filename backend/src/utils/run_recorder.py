@@ -0,0 +1,125 @@
+"""Recording of agent runs for offline replay.
+
+A recording holds the ``runner.run_async`` event stream of one run, with each
+event's offset from the start of the run, plus the final session state. Files are
+gzipped JSON, one per normalized query under ``replay.recordings_dir``.
+``src/agents/replay_agent.py`` plays them back through a ``Runner``.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.events import Event
+
+from src.config.load_config import load_config
+from src.utils.result_cache import normalize_query
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+RECORDING_VERSION = 1
+REPLAY_MODES = ("off", "record", "replay")
+
+replay_config = load_config().get("replay", {}) or {}
+
+
+def replay_mode() -> str:
+    """Get ``replay.mode`` from config.yaml: "off", "record" or "replay"."""
+    mode = replay_config.get("mode", "off") or "off"
+    if mode not in REPLAY_MODES:
+        raise ValueError(f"Unknown replay mode '{mode}'. Available modes: {list(REPLAY_MODES)}")
+    return mode
+
+
+def recording_path_for(query: str, recordings_dir: Optional[str] = None) -> str:
+    """
+    Get the recording file for a query.
+
+    Args:
+        query: User query; trivially different phrasings share a recording
+        recordings_dir: Directory of recordings; defaults to ``replay.recordings_dir``
+
+    Returns:
+        str: Path like ``<dir>/vegan-skincare-1a2b3c4d.json.gz``
+    """
+    normalized = normalize_query(query)
+    slug = re.sub(r"[^a-z0-9]+", "-", normalized).strip("-")[:60] or "query"
+    digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:8]
+    directory = recordings_dir or replay_config.get("recordings_dir", "src/data/recordings")
+    return os.path.join(directory, f"{slug}-{digest}.json.gz")
+
+
+def save_recording(recording: Dict[str, Any], path: str) -> str:
+    """Write a recording as gzipped JSON and return its path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(recording, f, separators=(",", ":"), default=str)
+    return path
+
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """
+    Read a recording written by ``save_recording``.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not a recording this version can replay
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        recording = json.load(f)
+    if recording.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version {recording.get('version')} in {path}")
+    return recording
+
+
+class RunRecorder:
+    """
+    Captures the events of one ``runner.run_async`` call and its final session state.
+
+    Call ``record`` for every event as it is yielded and ``save`` once the run
+    has finished.
+    """
+
+    def __init__(self, query: str, metadata: Optional[Dict[str, Any]] = None):
+        self.query = query
+        self.metadata = metadata or {}
+        self.started_at = time.time()
+        self.events: List[Dict[str, Any]] = []
+
+    def record(self, event: Event) -> None:
+        """Add an event with its offset in seconds from the start of the run."""
+        self.events.append({
+            "offset": round(time.time() - self.started_at, 4),
+            "event": json.loads(event.model_dump_json(exclude_none=True, by_alias=True)),
+        })
+
+    def save(self, final_state: Optional[Dict[str, Any]], path: Optional[str] = None) -> str:
+        """
+        Write the recording.
+
+        Args:
+            final_state: Session state at the end of the run
+            path: Output file; defaults to the query's file under ``replay.recordings_dir``
+
+        Returns:
+            str: Path of the written recording
+        """
+        path = save_recording({
+            "version": RECORDING_VERSION,
+            "query": self.query,
+            "recorded_at": self.started_at,
+            "duration_seconds": round(time.time() - self.started_at, 4),
+            "metadata": self.metadata,
+            "events": self.events,
+            "final_state": {
+                key: value for key, value in (final_state or {}).items()
+                if not key.startswith("temp:")
+            },
+        }, path or recording_path_for(self.query))
+        logger.info(f"RUN RECORDER: Saved {len(self.events)} events to {path}")
+        return path
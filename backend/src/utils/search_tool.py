@@ -0,0 +1,299 @@
+"""Caching web search tool shared by the research and category agents.
+
+The built-in ``google_search`` tool runs inside the model call, so identical
+searches issued by different agents or sessions cannot be reused. This module
+provides a ``google_search`` function tool with the same name the prompts use,
+backed by a pluggable ``SearchBackend``. Results are memoized by normalized
+query with a TTL, and concurrent identical searches share one backend call.
+
+Search results are recorded in session state for citations, one key per agent
+and URL (``source:<agent_name>:<short_id>``). Category agents search
+concurrently on their own branches, and per-URL keys with ids derived from the
+URL keep their state deltas from overwriting each other.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from google.adk.tools import FunctionTool, google_search as builtin_google_search
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from src.config.load_config import load_config
+from src.utils.result_cache import normalize_query
+from src.utils.setup_log import setup_logger
+from src.utils.single_flight import SingleFlight
+
+logger = setup_logger()
+
+
+class SearchBackend(ABC):
+    """Performs one web search. Subclasses return ``{"summary": str, "results": [...]}``."""
+
+    name = "base"
+
+    @abstractmethod
+    async def search(self, query: str) -> Dict[str, Any]:
+        """Search the web for ``query``."""
+
+
+class GeminiGroundedSearchBackend(SearchBackend):
+    """
+    Searches with Gemini grounded on Google Search.
+
+    Returns the grounded answer text plus the web sources from the grounding
+    metadata. Calls share the process-wide model rate limiter and pooled client.
+    Taking a limiter slot here is safe although the search runs as a tool inside
+    an agent's model call: ``RateLimitedGemini`` releases the agent's slot before
+    the tool runs.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        from src.utils.genai_client import genai_client
+        from src.utils.rate_limiter import gemini_rate_limiter
+
+        async with gemini_rate_limiter.slot():
+            response = await genai_client.get().aio.models.generate_content(
+                model=self.model,
+                contents=f"Search the web and summarize the most recent, relevant results for: {query}",
+                config=types.GenerateContentConfig(
+                    tools=[types.Tool(google_search=types.GoogleSearch())],
+                    temperature=0.0,
+                ),
+            )
+
+        results: List[Dict[str, str]] = []
+        candidate = response.candidates[0] if response.candidates else None
+        metadata = candidate.grounding_metadata if candidate else None
+        for chunk in (metadata.grounding_chunks or []) if metadata else []:
+            if chunk.web and chunk.web.uri:
+                results.append({
+                    "title": chunk.web.title or chunk.web.domain or "",
+                    "url": chunk.web.uri,
+                    "domain": chunk.web.domain or "",
+                })
+        return {"summary": response.text or "", "results": results}
+
+
+class StaticSearchBackend(SearchBackend):
+    """
+    Local stand-in that serves canned results, for tests and offline runs.
+
+    Results come from a JSON file mapping normalized queries to
+    ``{"summary": ..., "results": [...]}``; unknown queries get an empty result.
+    """
+
+    name = "static"
+
+    def __init__(self, fixtures_path: Optional[str] = None, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        if fixtures_path and os.path.exists(fixtures_path):
+            with open(fixtures_path, "r", encoding="utf-8") as f:
+                self.fixtures = {normalize_query(query): result for query, result in json.load(f).items()}
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self.fixtures.get(normalize_query(query), {"summary": f"No results found for '{query}'.", "results": []})
+
+
+class SearchToolCache:
+    """
+    TTL + LRU memo of search results with single-flight coalescing.
+
+    Counters are kept globally and per agent invocation, so a run can report
+    how many of its searches were served from cache.
+    """
+
+    # Runs that never pop their counters (e.g. failed runs) are dropped oldest-first past this
+    MAX_TRACKED_RUNS = 1000
+
+    def __init__(self, backend: SearchBackend, ttl_seconds: int = 3600, max_entries: int = 1000):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("search_tool")
+        self._totals = {"searches": 0, "cache_hits": 0, "coalesced": 0, "backend_calls": 0}
+        self._runs: Dict[str, Dict[str, int]] = {}
+
+    async def search(self, query: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get results for a query from the cache, an in-flight search or the backend.
+
+        Args:
+            query: Search query
+            run_id: Invocation id the search is counted against
+
+        Returns:
+            dict: ``{"query", "summary", "results", "cached"}``
+        """
+        key = normalize_query(query)
+        cached = self._get(key)
+        if cached is not None:
+            self._count(run_id, "cache_hits")
+            return {"query": query, **cached, "cached": True}
+
+        result, shared = await self._flight.do(key, lambda: self._search_backend(key, query))
+        self._count(run_id, "coalesced" if shared else "backend_calls")
+        return {"query": query, **result, "cached": shared}
+
+    def pop_run_stats(self, run_id: str) -> Dict[str, int]:
+        """Remove and return the counters of one run."""
+        with self._lock:
+            return self._runs.pop(run_id, {"searches": 0, "cache_hits": 0, "coalesced": 0, "backend_calls": 0})
+
+    def stats(self) -> Dict[str, Any]:
+        """Get global search counters."""
+        with self._lock:
+            searches = self._totals["searches"]
+            served = self._totals["cache_hits"] + self._totals["coalesced"]
+            return {
+                "backend": self.backend.name,
+                "entries": len(self._entries),
+                **self._totals,
+                "served_from_cache_rate": round(served / searches, 4) if searches else 0.0,
+            }
+
+    async def _search_backend(self, key: str, query: str) -> Dict[str, Any]:
+        logger.info(f"SEARCH TOOL: Searching '{query}' with the {self.backend.name} backend")
+        result = await self.backend.search(query)
+        with self._lock:
+            self._entries[key] = {"expires_at": time.time() + self.ttl_seconds, "value": result}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry["value"]
+
+    def _count(self, run_id: Optional[str], outcome: str) -> None:
+        with self._lock:
+            self._totals["searches"] += 1
+            self._totals[outcome] += 1
+            if run_id:
+                run = self._runs.setdefault(run_id, {"searches": 0, "cache_hits": 0, "coalesced": 0, "backend_calls": 0})
+                run["searches"] += 1
+                run[outcome] += 1
+                while len(self._runs) > self.MAX_TRACKED_RUNS:
+                    self._runs.pop(next(iter(self._runs)))
+
+
+def create_search_backend(search_config: Dict[str, Any]) -> SearchBackend:
+    """Build the backend named by ``search_tool.backend`` in config.yaml."""
+    backend = search_config.get("backend", "gemini")
+    if backend == "static":
+        return StaticSearchBackend(
+            fixtures_path=search_config.get("fixtures_path"),
+            latency_seconds=search_config.get("static_latency_seconds", 0.0),
+        )
+    if backend == "gemini":
+        from src.config.research_config import config
+        return GeminiGroundedSearchBackend(model=search_config.get("model") or config.worker_model)
+    raise ValueError(f"Unknown search backend '{backend}'. Available backends: ['gemini', 'static']")
+
+
+search_config = load_config().get("search_tool", {}) or {}
+search_cache = SearchToolCache(
+    backend=create_search_backend(search_config),
+    ttl_seconds=search_config.get("ttl_seconds", 3600),
+    max_entries=search_config.get("max_entries", 1000),
+)
+
+
+async def google_search(query: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """Searches the web with Google Search.
+
+    Args:
+        query: The search query, e.g. "viral skincare trend 2025" or "site:allure.com makeup trend".
+
+    Returns:
+        dict: A summary of the results and the list of sources (title, url, domain).
+    """
+    result = await search_cache.search(query, run_id=tool_context.invocation_id)
+    _record_sources(tool_context, result.get("results", []))
+    return result
+
+
+SOURCE_KEY_PREFIX = "source:"
+
+
+def source_short_id(url: str) -> str:
+    """Get the citation id of a URL; the same URL gets the same id on every branch."""
+    return f"src-{int(hashlib.sha1(url.encode('utf-8')).hexdigest()[:10], 16)}"
+
+
+def source_key(agent_name: str, short_id: str) -> str:
+    """Get the state key a source found by an agent is recorded under."""
+    return f"{SOURCE_KEY_PREFIX}{agent_name}:{short_id}"
+
+
+def recorded_sources(state: Any, agent_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the sources recorded by the search tool, keyed by short id.
+
+    Args:
+        state: Session state, either an ADK ``State`` or a plain dict
+        agent_name: Only return the sources found by this agent
+
+    Returns:
+        dict: Source details by short id
+    """
+    prefix = f"{SOURCE_KEY_PREFIX}{agent_name}:" if agent_name else SOURCE_KEY_PREFIX
+    items = state.to_dict().items() if hasattr(state, "to_dict") else state.items()
+    return {
+        value["short_id"]: value
+        for key, value in items
+        if key.startswith(prefix) and isinstance(value, dict) and value.get("short_id")
+    }
+
+
+def _record_sources(tool_context: ToolContext, results: List[Dict[str, str]]) -> None:
+    """Record search result URLs in state for citations, one key per agent and URL."""
+    for result in results:
+        url = result.get("url")
+        if not url:
+            continue
+        short_id = source_short_id(url)
+        key = source_key(tool_context.agent_name, short_id)
+        if key in tool_context.state:
+            continue
+        tool_context.state[key] = {
+            "short_id": short_id,
+            "title": result.get("title", ""),
+            "url": url,
+            "domain": result.get("domain", ""),
+            "supported_claims": [],
+        }
+
+
+cached_google_search = FunctionTool(google_search)
+
+
+def get_search_tool():
+    """Get the search tool for research agents: the caching tool, or the built-in one if disabled."""
+    return cached_google_search if search_config.get("enabled", True) else builtin_google_search
@@ -1,11 +1,37 @@
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from google.genai import types
 
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from src.agents.coordinator_agent import root_agent
+from google.adk.sessions.base_session_service import GetSessionConfig
+from src.agents.coordinator_agent import create_root_agent, create_parallel_root_agent
+from src.agents.create_parallel_category_agent import categories, category_agent_name, category_output_key
 from src.utils.setup_log import setup_logger
 from src.utils.file_output import save_agent_output, save_session_state, save_final_response
 from src.config.load_config import load_config
+from src.utils.result_cache import result_cache
+from src.utils.admission import admission
+from src.utils.single_flight import SingleFlight
+from src.utils.category_findings_store import category_findings_store
+from src.utils.query_router import query_router
+from src.utils.model_tiers import resolve_latency_tier
+from src.utils.search_tool import SOURCE_KEY_PREFIX, recorded_sources, search_cache, source_key
+from src.utils.run_recorder import RunRecorder, replay_config, replay_mode
+from src.agents.replay_agent import ReplayAgent
+from src.utils.session_store import create_session_service
+from src.utils.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    cancellation_stats,
+    current_deadline,
+    deadline_config,
+    resolve_deadline,
+)
 
 logger = setup_logger()
 config_data = load_config()
@@ -14,29 +40,175 @@ APP_NAME = "sephora_trend_agent"
 # USER_ID = "user1"
 # SESSION_ID = str(uuid.uuid4())
 
-# Create session service and session
-session_service = InMemorySessionService()
+# Create session service and session; bounded in memory or SQLite, per session_store in config.yaml
+session_service = create_session_service(config_data)
+
+PIPELINE_MODES = ("sequential", "parallel")
+pipeline_config = config_data.get("pipeline", {}) or {}
+# Runners are built on first use (or by the startup warmup), not at import
+_runners: Dict[Tuple[str, str], Runner] = {}
+
+
+def resolve_pipeline_mode(pipeline_mode: Optional[str] = None) -> str:
+    """Get the requested pipeline mode, falling back to ``pipeline.mode`` in config.yaml."""
+    mode = pipeline_mode or pipeline_config.get("mode", "sequential")
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}'. Available modes: {list(PIPELINE_MODES)}")
+    return mode
+
+
+def get_runner(pipeline_mode: Optional[str] = None, latency_tier: Optional[str] = None) -> Runner:
+    """
+    Get the runner for a pipeline mode and latency tier, building it on first use.
+
+    Args:
+        pipeline_mode: "sequential" (single research agent) or "parallel" (category
+            fan-out + consolidation); defaults to ``pipeline.mode`` in config.yaml
+        latency_tier: "fast" or "deep"; defaults to ``model_tiers.default_tier`` in config.yaml
+
+    With ``replay.mode: replay`` every call gets the runner that replays recorded runs.
+
+    Returns:
+        Runner: Runner sharing the module session service
+    """
+    key = (resolve_pipeline_mode(pipeline_mode), resolve_latency_tier(latency_tier))
+    if replay_mode() == "replay":
+        # Recordings are looked up by query, so one replay runner serves every mode and tier
+        key = ("replay", "replay")
+    if key not in _runners:
+        mode, tier = key
+        logger.info(f"=== BUILDING '{mode}' PIPELINE RUNNER ({tier} tier) ===")
+        if mode == "replay":
+            agent = ReplayAgent(
+                name="replay_agent",
+                recording_path=replay_config.get("recording_path"),
+                recordings_dir=replay_config.get("recordings_dir"),
+                time_scale=replay_config.get("time_scale", 1.0),
+            )
+        elif mode == "parallel":
+            agent = create_parallel_root_agent(pipeline_config.get("max_concurrency"), tier)
+        else:
+            agent = create_root_agent(tier)
+        _runners[key] = Runner(agent=agent, session_service=session_service, app_name=APP_NAME)
+    return _runners[key]
+
+# Stream partial model output so progress listeners get research text as it is generated
+run_config = RunConfig(
+    streaming_mode=StreamingMode.SSE
+    if config_data.get("streaming", {}).get("partial_events", True)
+    else StreamingMode.NONE
+)
 
-# Create runner with the session service
-runner = Runner(
-    agent=root_agent, session_service=session_service, app_name=APP_NAME
+# Coalesces concurrent discovery runs for the same normalized query; a run no caller waits for is cancelled
+discovery_flight = SingleFlight(
+    "trend_discovery", cancel_abandoned=deadline_config.get("cancel_abandoned_runs", True)
 )
 
+# Deadline of each in-flight run: the latest deadline of the callers attached to it
+_run_deadlines: Dict[str, Deadline] = {}
+
+# Progress listeners per in-flight run, so coalesced callers see the shared run's progress
+ProgressCallback = Callable[[Dict[str, Any]], None]
+_progress_listeners: Dict[str, List[ProgressCallback]] = {}
+
+
+def _notify(progress_callback: Optional[ProgressCallback], event: Dict[str, Any]) -> None:
+    """Deliver a progress event, never letting a listener break the agent run."""
+    if progress_callback is None:
+        return
+    try:
+        progress_callback(event)
+    except Exception as e:
+        logger.error(f"Progress listener failed for event {event.get('type')}: {e}")
+
+
+def _emit_event_progress(event, progress_callback: Optional[ProgressCallback], stream_state: Dict[str, bool]) -> None:
+    """
+    Translate an ADK event into text/sources progress events.
+
+    Research text is forwarded as it arrives. When partial (streamed) chunks were
+    already sent for a turn, the aggregated non-partial event that follows is skipped.
+    The output composer's JSON is not forwarded; it is delivered as the final report.
+    """
+    if progress_callback is None:
+        return
+
+    if event.author != "output_composer_agent" and event.content and event.content.parts:
+        text = "".join(
+            part.text for part in event.content.parts
+            if getattr(part, "text", None) and not getattr(part, "thought", False)
+        )
+        if text:
+            if event.partial:
+                stream_state["partial_pending"] = True
+                _notify(progress_callback, {"type": "text", "agent": event.author, "text": text, "partial": True})
+            elif stream_state.get("partial_pending"):
+                stream_state["partial_pending"] = False
+            else:
+                _notify(progress_callback, {"type": "text", "agent": event.author, "text": text, "partial": False})
+
+    state_delta = event.actions.state_delta if event.actions else None
+    if not state_delta:
+        return
+    # The search tool records one ``source:<agent_name>:<short_id>`` key per URL; grounding sources arrive as ``sources``
+    delta_sources = [value for key, value in state_delta.items() if key.startswith(SOURCE_KEY_PREFIX)]
+    delta_sources.extend((state_delta.get("sources") or {}).values())
+    if delta_sources:
+        sources = [
+            {
+                "short_id": source.get("short_id"),
+                "title": source.get("title"),
+                "url": source.get("url"),
+                "domain": source.get("domain"),
+            }
+            for source in delta_sources
+        ]
+        _notify(progress_callback, {"type": "sources", "agent": event.author, "sources": sources})
+
 
-async def call_agent_async(query: str, runner, user_id, session_id):
-        """Sends a query to the agent and prints the final response."""
+def _publish_progress(run_key: str, event: Dict[str, Any]) -> None:
+    """Fan a progress event out to every caller attached to a run."""
+    for listener in list(_progress_listeners.get(run_key, [])):
+        _notify(listener, event)
+
+
+async def call_agent_async(query: str, runner, user_id, session_id, progress_callback: Optional[ProgressCallback] = None, initial_state: Optional[Dict[str, Any]] = None):
+        """Sends a query to the agent and prints the final response.
+
+        ``progress_callback`` receives ``{"type": "stage", "stage": ...}`` events as the
+        run moves through research, composing and persisting, plus ``{"type": "agent"}``
+        events on agent transitions and a ``{"type": "search_stats"}`` event with the run's
+        search tool counters. ``initial_state`` seeds the session state, e.g. with
+        cached category findings.
+        """
         logger.info("=== AGENT SERVICE CALL STARTED ===")
         logger.info(f"User Query: {query}")
         logger.info(f"User ID: {user_id}")
         logger.info(f"Session ID: {session_id}")
         
-        logger.info("=== CREATING SESSION ===")
-        await session_service.create_session(
+        # Sessions can outlive the process (session_store.backend: sqlite); resume an existing one
+        existing_session = await session_service.get_session(
             app_name=APP_NAME,
             user_id=user_id,
             session_id=session_id,
+            config=GetSessionConfig(num_recent_events=0),
         )
-        logger.info(f"Session created: App='{APP_NAME}', User='{user_id}', Session='{session_id}'")
+        if existing_session:
+            logger.info(f"=== RESUMING SESSION === Existing state keys: {list(existing_session.state.keys())}")
+            if initial_state:
+                await session_service.append_event(
+                    existing_session,
+                    Event(author="user", invocation_id=Event.new_id(), actions=EventActions(state_delta=dict(initial_state))),
+                )
+        else:
+            logger.info("=== CREATING SESSION ===")
+            await session_service.create_session(
+                app_name=APP_NAME,
+                user_id=user_id,
+                session_id=session_id,
+                state=initial_state,
+            )
+            logger.info(f"Session created: App='{APP_NAME}', User='{user_id}', Session='{session_id}'")
 
         # Prepare the user's message in ADK format
         logger.info("=== PREPARING USER MESSAGE ===")
@@ -46,138 +218,413 @@ async def call_agent_async(query: str, runner, user_id, session_id):
         # Key Concept: run_async executes the agent logic and yields Events.
         # We iterate through events to find the final answer.
         logger.info("=== STARTING AGENT EXECUTION ===")
+        _notify(progress_callback, {"type": "stage", "stage": "research"})
         event_count = 0
         current_agent = None
-        async for event in runner.run_async(
-            user_id=user_id, session_id=session_id, new_message=content
-        ):
-            # Track agent transitions and log agent-specific information
-            event_count += 1
+        stream_state: Dict[str, bool] = {}
+        recorder = RunRecorder(query, metadata={"agent": runner.agent.name}) if replay_mode() == "record" else None
+        started = time.monotonic()
+        stage = "research"
+        invocation_id = None
+        try:
+            # aclosing closes the run's generator here, in this task, on return or cancellation
+            async with aclosing(runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=content, run_config=run_config
+            )) as events:
+                async for event in events:
+                    invocation_id = event.invocation_id
+                    if recorder:
+                        recorder.record(event)
+
+                    # Track agent transitions and log agent-specific information
+                    event_count += 1
             
-            # Log agent transition when author changes
-            if current_agent != event.author:
-                current_agent = event.author
-                logger.info(f"AGENT TRANSITION: Now executing '{current_agent}' agent")
-                logger.info(f"   └─ Agent Description: {getattr(event, 'description', 'N/A')}")
+                    # Log agent transition when author changes
+                    if current_agent != event.author:
+                        current_agent = event.author
+                        logger.info(f"AGENT TRANSITION: Now executing '{current_agent}' agent")
+                        logger.info(f"   └─ Agent Description: {getattr(event, 'description', 'N/A')}")
+                        _notify(progress_callback, {"type": "agent", "agent": current_agent})
+                        if current_agent == "output_composer_agent":
+                            stage = "composing"
+                            _notify(progress_callback, {"type": "stage", "stage": "composing"})
+
+                    _emit_event_progress(event, progress_callback, stream_state)
             
-            # Enhanced event logging with agent identification
-            logger.info(f"[Event #{event_count}] Agent: {event.author} | Type: {type(event).__name__} | Final: {event.is_final_response()}")
+                    # Enhanced event logging with agent identification
+                    logger.info(f"[Event #{event_count}] Agent: {event.author} | Type: {type(event).__name__} | Final: {event.is_final_response()}")
             
-            # Log additional details for specific event types
-            if hasattr(event, 'content') and event.content:
-                logger.info(f"   └─ Content Preview: {str(event.content)[:100]}{'...' if len(str(event.content)) > 100 else ''}")
+                    # Log additional details for specific event types
+                    if hasattr(event, 'content') and event.content:
+                        logger.info(f"   └─ Content Preview: {str(event.content)[:100]}{'...' if len(str(event.content)) > 100 else ''}")
             
-            # Log when an agent starts/completes
-            event_type_name = type(event).__name__
-            if 'Start' in event_type_name:
-                logger.info(f"AGENT START: '{event.author}' agent beginning execution")
-            elif 'Complete' in event_type_name or event.is_final_response():
-                logger.info(f"AGENT COMPLETE: '{event.author}' agent finished execution")
-
-            # Key Concept: Only check for final response from the root agent
-            if event.is_final_response() and event.author == "output_composer_agent":
-                logger.info("=== FINAL RESPONSE DETECTED ===")
-                logger.info(f"Final response from: {event.author}")
+                    # Log when an agent starts/completes
+                    event_type_name = type(event).__name__
+                    if 'Start' in event_type_name:
+                        logger.info(f"AGENT START: '{event.author}' agent beginning execution")
+                    elif 'Complete' in event_type_name or event.is_final_response():
+                        logger.info(f"AGENT COMPLETE: '{event.author}' agent finished execution")
+
+                    # Key Concept: Only check for final response from the root agent
+                    if event.is_final_response() and event.author == "output_composer_agent":
+                        logger.info("=== FINAL RESPONSE DETECTED ===")
+                        logger.info(f"Final response from: {event.author}")
+
+                        search_stats = search_cache.pop_run_stats(event.invocation_id)
+                        logger.info(
+                            f"SEARCH TOOL: {search_stats['searches']} searches this run, "
+                            f"{search_stats['cache_hits'] + search_stats['coalesced']} served from cache"
+                        )
+                        _notify(progress_callback, {"type": "search_stats", **search_stats})
                 
-                # Get the final session state to extract the structured output
-                logger.info("=== RETRIEVING SESSION STATE ===")
-                final_session = await session_service.get_session(
-                    app_name=APP_NAME,
-                    user_id=user_id,
-                    session_id=session_id,
-                )
-                logger.info(f"Session retrieved, has state: {final_session and final_session.state is not None}")
+                        # Get the final session state to extract the structured output
+                        logger.info("=== RETRIEVING SESSION STATE ===")
+                        final_session = await session_service.get_session(
+                            app_name=APP_NAME,
+                            user_id=user_id,
+                            session_id=session_id,
+                        )
+                        logger.info(f"Session retrieved, has state: {final_session and final_session.state is not None}")
+                        if recorder:
+                            recorder.save(final_session.state if final_session else None)
 
-                # Check for the final output in session state
-                final_output = None
-                if final_session and final_session.state:
-                    logger.info("=== EXTRACTING FINAL OUTPUT ===")
-                    logger.info(f"Session state keys: {list(final_session.state.keys())}")
+                        # Check for the final output in session state
+                        final_output = None
+                        if final_session and final_session.state:
+                            logger.info("=== EXTRACTING FINAL OUTPUT ===")
+                            stage = "persisting"
+                            _notify(progress_callback, {"type": "stage", "stage": "persisting"})
+                            logger.info(f"Session state keys: {list(final_session.state.keys())}")
                     
-                    # Get output directory from config
-                    output_dir = config_data.get("output_folder", {}).get("OUTPUT_DIR", "src/data/outputs")
+                            # Get output directory from config
+                            output_dir = config_data.get("output_folder", {}).get("OUTPUT_DIR", "src/data/outputs")
                     
-                    # Save complete session state to file
-                    session_file = save_session_state(
-                        final_session.state, 
-                        session_id, 
-                        user_id, 
-                        output_dir
-                    )
+                            # Save complete session state to file
+                            session_file = save_session_state(
+                                final_session.state, 
+                                session_id, 
+                                user_id, 
+                                output_dir
+                            )
                     
-                    # Extract and save individual agent outputs
-                    research_findings = final_session.state.get("sephora_trend_research_findings")
-                    if research_findings:
-                        research_file = save_agent_output(
-                            "trend_research_agent", 
-                            research_findings, 
-                            session_id, 
-                            user_id, 
-                            output_dir
-                        )
-                        logger.info(f"Research findings saved to: {research_file}")
+                            # Extract and save individual agent outputs
+                            research_findings = final_session.state.get("sephora_trend_research_findings")
+                            if research_findings:
+                                research_file = save_agent_output(
+                                    "trend_research_agent", 
+                                    research_findings, 
+                                    session_id, 
+                                    user_id, 
+                                    output_dir
+                                )
+                                logger.info(f"Research findings saved to: {research_file}")
                     
-                    research_with_citations = final_session.state.get("sephora_trend_research_findings_with_citations")
-                    if research_with_citations:
-                        citations_file = save_agent_output(
-                            "trend_research_agent_with_citations", 
-                            research_with_citations, 
-                            session_id, 
-                            user_id, 
-                            output_dir
-                        )
-                        logger.info(f"Research with citations saved to: {citations_file}")
+                            # Category findings are only present when the parallel pipeline ran
+                            for state_key, state_value in final_session.state.items():
+                                if state_key.endswith("_category_findings") and state_value:
+                                    category_file = save_agent_output(
+                                        state_key.replace("_findings", "_agent"),
+                                        state_value,
+                                        session_id,
+                                        user_id,
+                                        output_dir
+                                    )
+                                    logger.info(f"Category findings saved to: {category_file}")
                     
-                    # Check for the final output from the card composer
-                    final_output = final_session.state.get("sephora_trends_report")
-                    if final_output:
-                        output_file = save_agent_output(
-                            "output_composer_agent", 
-                            final_output, 
-                            session_id, 
-                            user_id, 
-                            output_dir
-                        )
-                        logger.info(f"Final output saved to: {output_file}")
+                            research_with_citations = final_session.state.get("sephora_trend_research_findings_with_citations")
+                            if research_with_citations:
+                                citations_file = save_agent_output(
+                                    "trend_research_agent_with_citations", 
+                                    research_with_citations, 
+                                    session_id, 
+                                    user_id, 
+                                    output_dir
+                                )
+                                logger.info(f"Research with citations saved to: {citations_file}")
                     
-                    logger.info(f"Final output extracted: {type(final_output)}")
-                    logger.info(f"Final output keys: {final_output.keys() if isinstance(final_output, dict) else 'Not a dict'}")
+                            # Check for the final output from the card composer
+                            final_output = final_session.state.get("sephora_trends_report")
+                            if final_output:
+                                output_file = save_agent_output(
+                                    "output_composer_agent", 
+                                    final_output, 
+                                    session_id, 
+                                    user_id, 
+                                    output_dir
+                                )
+                                logger.info(f"Final output saved to: {output_file}")
+                    
+                            logger.info(f"Final output extracted: {type(final_output)}")
+                            logger.info(f"Final output keys: {final_output.keys() if isinstance(final_output, dict) else 'Not a dict'}")
 
-                    logger.info("=== FINAL OUTPUT ===")
-                    logger.debug(f"Final output: {final_output}")
+                            logger.info("=== FINAL OUTPUT ===")
+                            logger.debug(f"Final output: {final_output}")
 
-                    citations = final_session.state.get(
-                        "sephora_trend_research_findings_with_citations"
-                    )
-                    logger.info("=== RESEARCH FINDINGS WITH CITATIONS ===")
-                    logger.debug(f"Citations: {citations}")
+                            citations = final_session.state.get(
+                                "sephora_trend_research_findings_with_citations"
+                            )
+                            logger.info("=== RESEARCH FINDINGS WITH CITATIONS ===")
+                            logger.debug(f"Citations: {citations}")
                     
-                    research_without_citations = final_session.state.get(
-                        "sephora_trend_research_findings"
-                    )
-                    logger.info("=== RESEARCH FINDINGS (NO CITATIONS) ===")
-                    logger.debug(f"Research without citations: {research_without_citations}")
+                            research_without_citations = final_session.state.get(
+                                "sephora_trend_research_findings"
+                            )
+                            logger.info("=== RESEARCH FINDINGS (NO CITATIONS) ===")
+                            logger.debug(f"Research without citations: {research_without_citations}")
                     
-                logger.info("=== AGENT SERVICE CALL COMPLETED ===")
-                return final_output
+                        # The final state has been read; drop the run's event history
+                        await session_service.complete_session(APP_NAME, user_id, session_id)
 
+                        cancellation_stats.record_completed(time.monotonic() - started)
+                        logger.info("=== AGENT SERVICE CALL COMPLETED ===")
+                        return final_output
+        except (asyncio.CancelledError, DeadlineExceededError):
+            await _discard_cancelled_run(
+                user_id, session_id, created_session=existing_session is None,
+                stage=stage, started=started, event_count=event_count, invocation_id=invocation_id,
+            )
+            raise
 
 
-async def run_conversation(request):
-    logger.info("=== RUN CONVERSATION STARTED ===")
-    logger.info(f"Processing request for user: {request.user_id}")
-    logger.info(f"Session: {request.session_id}")
-    logger.info(f"Query: '{request.trend_query}'")
-    
+async def _discard_cancelled_run(
+    user_id: str,
+    session_id: str,
+    created_session: bool,
+    stage: str,
+    started: float,
+    event_count: int,
+    invocation_id: Optional[str],
+) -> None:
+    """
+    Clean up after a run cancelled (no caller left) or past its deadline.
+
+    A session created by the run is deleted; a resumed session keeps its prior
+    state and is compacted like a completed one. No output files are written.
+    """
+    elapsed = time.monotonic() - started
+    logger.warning(f"=== AGENT RUN CANCELLED === Stage: {stage}, after {elapsed:.1f}s and {event_count} events")
+    if invocation_id:
+        search_cache.pop_run_stats(invocation_id)
+
+    session_cleaned = False
+    if deadline_config.get("cleanup_partial_sessions", True):
+        try:
+            if created_session:
+                await session_service.delete_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+            else:
+                await session_service.complete_session(APP_NAME, user_id, session_id)
+            session_cleaned = True
+            logger.info(f"Partial session '{session_id}' cleaned up")
+        except Exception as e:
+            logger.error(f"Failed to clean up partial session '{session_id}': {e}")
+    cancellation_stats.record_run_cancelled(stage, elapsed, event_count, session_cleaned)
+
+
+def _save_shared_report(report, request):
+    """Write a report produced by another run into this request's session folder."""
+    output_dir = config_data.get("output_folder", {}).get("OUTPUT_DIR", "src/data/outputs")
+    save_agent_output(
+        "output_composer_agent",
+        report,
+        request.session_id,
+        request.user_id,
+        output_dir
+    )
+
+
+def _cached_category_state(request, routed_categories: List[str]) -> Dict[str, Any]:
+    """Seed state with routed category findings that are still fresh in the findings store."""
+    if request.force_refresh:
+        return {}
+
+    fresh = category_findings_store.get_fresh(request.trend_query, routed_categories)
+    if fresh:
+        logger.info(f"CATEGORY FINDINGS: Reusing cached findings for {sorted(fresh)}")
+
+    state: Dict[str, Any] = {}
+    for category, entry in fresh.items():
+        state[category_output_key(category)] = entry["findings"]
+        # Restore the sources under the skipped agent's name so citations to them still resolve
+        agent_name = category_agent_name(category)
+        for short_id, source in entry["sources"].items():
+            state[source_key(agent_name, short_id)] = source
+    return state
+
+
+def _routed_state(request, progress_callback: Optional[ProgressCallback]) -> Dict[str, Any]:
+    """Route the query to its relevant categories and build the initial session state."""
+    decision = query_router.route(request.trend_query, force_all=request.force_all_categories)
+    _notify(progress_callback, {
+        "type": "routing",
+        "categories": decision.categories,
+        "reason": decision.reason,
+    })
+
+    state = _cached_category_state(request, decision.categories)
+    state["routed_categories"] = decision.categories
+    return state
+
+
+async def _store_fresh_category_findings(request, seeded_state: Dict[str, Any]) -> None:
+    """Save findings produced by this run's category agents to the findings store."""
+    final_session = await session_service.get_session(
+        app_name=APP_NAME,
+        user_id=request.user_id,
+        session_id=request.session_id,
+    )
+    if not final_session or not final_session.state:
+        return
+
+    fresh = {
+        category: final_session.state[category_output_key(category)]
+        for category in categories
+        if final_session.state.get(category_output_key(category))
+        and category_output_key(category) not in seeded_state
+    }
+    sources = {
+        category: recorded_sources(final_session.state, agent_name=category_agent_name(category))
+        for category in fresh
+    }
+    category_findings_store.put_many(request.trend_query, fresh, sources)
+
+
+async def _admitted_run_and_cache(request, cache_key, run_deadline: Deadline):
+    """Start the agent run once admission control lets it in; the queue wait counts against the deadline."""
+    async with admission.admit(max_wait_seconds=run_deadline.remaining()):
+        return await _run_and_cache(request, cache_key, run_deadline)
+
+
+async def _run_and_cache(request, cache_key, run_deadline: Deadline):
+    """Run the agent pipeline for a request and cache a complete report."""
+    # Runs in its own task, so this only sets the deadline seen by this run's stages
+    current_deadline.set(run_deadline)
+    is_parallel = resolve_pipeline_mode(request.pipeline_mode) == "parallel"
+    progress_callback = lambda event: _publish_progress(cache_key, event)
+    seeded_state = _routed_state(request, progress_callback) if is_parallel else {}
+
     trends = await call_agent_async(
         query=request.trend_query,
-        runner=runner,
+        runner=get_runner(request.pipeline_mode, request.latency_tier),
         user_id=request.user_id,
         session_id=request.session_id,
+        progress_callback=progress_callback,
+        initial_state=seeded_state,
     )
+
+    if is_parallel:
+        await _store_fresh_category_findings(request, seeded_state)
+
+    # Only cache complete structured reports, never partial or failed runs
+    if isinstance(trends, dict) and trends.get("trends"):
+        result_cache.set(cache_key, trends, query=request.trend_query)
+        logger.info(f"Result cached under key: '{cache_key}'")
+
+    return trends
+
+
+def _cache_key(request) -> str:
+    """
+    Result cache and single-flight key of a request.
+
+    Reports are keyed by pipeline mode, and a parallel run routed to a subset of
+    categories also by those categories: its report covers only them, so it must
+    not be served to (or shared with) a request that expects every category.
+    """
+    pipeline_mode = resolve_pipeline_mode(request.pipeline_mode)
+    cache_key = f"{result_cache.make_key(request.trend_query)}|{pipeline_mode}"
+    if pipeline_mode == "parallel":
+        decision = query_router.select(request.trend_query, force_all=request.force_all_categories)
+        if decision.is_subset:
+            cache_key = f"{cache_key}|{','.join(sorted(decision.categories))}"
+    latency_tier = resolve_latency_tier(request.latency_tier)
+    if latency_tier != resolve_latency_tier():
+        # Reports from a non-default model tier are cached separately
+        cache_key = f"{cache_key}|{latency_tier}"
+    return cache_key
+
+
+def starts_new_run(request) -> bool:
+    """Whether ``run_conversation`` would start a new agent run (no cached report, no run to join)."""
+    cache_key = _cache_key(request)
+    if not request.force_refresh and result_cache.contains(cache_key):
+        return False
+    return not discovery_flight.running(cache_key)
+
+
+async def run_conversation(
+    request,
+    progress_callback: Optional[ProgressCallback] = None,
+    deadline: Optional[Deadline] = None,
+    admit: bool = False,
+):
+    """
+    Run trend discovery for a request, serving from cache or a coalesced run when possible.
+
+    Args:
+        request: TrendSendRequest to process
+        progress_callback: Optional listener for stage/agent progress events
+        deadline: When the caller stops waiting; defaults to ``deadlines.default_seconds``.
+            A run left with no waiting caller is cancelled.
+        admit: Start a new agent run only once admission control lets it in. Cache
+            hits and callers joining an in-flight run never take an admission slot.
+
+    Returns:
+        The structured trends report (dict) or None if the agents produced nothing
+
+    Raises:
+        DeadlineExceededError: If the deadline passed before the run finished
+        AdmissionRejectedError: With ``admit``, if the new run was not admitted
+    """
+    deadline = deadline or resolve_deadline()
+    logger.info("=== RUN CONVERSATION STARTED ===")
+    logger.info(f"Processing request for user: {request.user_id}")
+    logger.info(f"Session: {request.session_id}")
+    logger.info(f"Query: '{request.trend_query}'")
+
+    cache_key = _cache_key(request)
+    if not request.force_refresh:
+        cached_report = result_cache.get(cache_key)
+        if cached_report is not None:
+            logger.info(f"=== RESULT CACHE HIT === Key: '{cache_key}'")
+            _notify(progress_callback, {"type": "stage", "stage": "persisting"})
+            _save_shared_report(cached_report, request)
+            return cached_report
+        logger.info(f"=== RESULT CACHE MISS === Key: '{cache_key}'")
+    
+    # Identical queries already running are joined instead of started again
+    if progress_callback is not None:
+        _progress_listeners.setdefault(cache_key, []).append(progress_callback)
+    if discovery_flight.running(cache_key) and cache_key in _run_deadlines:
+        _run_deadlines[cache_key].extend(deadline)
+    else:
+        _run_deadlines[cache_key] = Deadline(deadline.remaining())
+    run_deadline = _run_deadlines[cache_key]
+    run = _admitted_run_and_cache if admit else _run_and_cache
+    try:
+        trends, shared = await asyncio.wait_for(
+            discovery_flight.do(cache_key, lambda: run(request, cache_key, run_deadline)),
+            timeout=deadline.remaining(),
+        )
+    except asyncio.TimeoutError:
+        cancellation_stats.record_caller("deadline")
+        logger.warning(f"=== DEADLINE EXCEEDED === Key: '{cache_key}' after {deadline.seconds}s")
+        raise DeadlineExceededError(f"Trend discovery did not finish within {deadline.seconds}s", stage="agent_run")
+    finally:
+        if progress_callback is not None:
+            listeners = _progress_listeners.get(cache_key, [])
+            if progress_callback in listeners:
+                listeners.remove(progress_callback)
+            if not listeners:
+                _progress_listeners.pop(cache_key, None)
+        if not discovery_flight.running(cache_key) and _run_deadlines.get(cache_key) is run_deadline:
+            _run_deadlines.pop(cache_key, None)
+    if shared:
+        logger.info(f"=== COALESCED WITH IN-FLIGHT RUN === Key: '{cache_key}'")
+        if trends:
+            _save_shared_report(trends, request)
     
     logger.info("=== RUN CONVERSATION COMPLETED ===")
     logger.info(f"Returned data type: {type(trends)}")
     logger.info(f"Returned data keys: {trends.keys() if isinstance(trends, dict) else 'Not a dict'}")
     
-    return trends
\ No newline at end of file
+    return trends
@@ -0,0 +1,227 @@
+"""Bounded in-memory session service.
+
+``InMemorySessionService`` keeps every session, with its full event history and
+grounding metadata, for the life of the process. ``BoundedSessionService`` adds a
+TTL, a maximum session count and a byte budget with LRU eviction, and compacts
+completed runs down to their final state.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+SessionKey = Tuple[str, str, str]
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    In-memory session service with TTL, count and byte limits.
+
+    Sessions are kept in LRU order by last access. When the count or byte limit
+    is exceeded the least recently used completed sessions are evicted; sessions
+    with a run in progress (events appended since the last ``complete_session``)
+    are only evicted by the TTL. Session size is estimated from the serialized initial state and events.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = 3600,
+        max_sessions: Optional[int] = 500,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        compact_completed: bool = True,
+    ):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.compact_completed = compact_completed
+
+        # (app_name, user_id, session_id) -> {"bytes", "last_access", "active"}, oldest first
+        self._usage: "OrderedDict[SessionKey, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._evictions = {"ttl": 0, "max_sessions": 0, "max_bytes": 0}
+        self._compactions = 0
+        self._compacted_events = 0
+        self._compacted_bytes = 0
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "BoundedSessionService":
+        """Build a session service from the ``session_store`` section of config.yaml."""
+        store_config = config_data.get("session_store", {}) or {}
+        return cls(
+            ttl_seconds=store_config.get("ttl_seconds", 3600),
+            max_sessions=store_config.get("max_sessions", 500),
+            max_bytes=store_config.get("max_bytes", 256 * 1024 * 1024),
+            compact_completed=store_config.get("compact_completed", True),
+        )
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        self._evict_expired()
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self._usage[key] = {"bytes": 0, "last_access": time.monotonic(), "active": True}
+        self._add_bytes(key, _json_size(session.state))
+        self._enforce_limits()
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        if key in self._usage and self._expired(self._usage[key]):
+            self._evict(key, "ttl")
+            return None
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self._touch(key)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        if not event.partial and key in self._usage:
+            self._usage[key]["active"] = True
+            self._touch(key)
+            self._add_bytes(key, len(event.model_dump_json(exclude_none=True)))
+            self._enforce_limits()
+        return event
+
+    def _delete_session_impl(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        super()._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+        usage = self._usage.pop((app_name, user_id, session_id), None)
+        if usage:
+            self._total_bytes -= usage["bytes"]
+
+    async def complete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        """
+        Mark a session's run as finished, compacting its events down to final state.
+
+        The final state stays readable through ``get_session``; the event history,
+        which holds most of the size (content and grounding metadata), is dropped.
+        """
+        key = (app_name, user_id, session_id)
+        usage = self._usage.get(key)
+        if usage is None:
+            return
+        usage["active"] = False
+        if not self.compact_completed:
+            return
+
+        storage_session = self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+        if storage_session is None or not storage_session.events:
+            return
+        compacted_events = len(storage_session.events)
+        storage_session.events = []
+        freed = usage["bytes"] - _json_size(storage_session.state)
+        self._add_bytes(key, -freed)
+
+        self._compactions += 1
+        self._compacted_events += compacted_events
+        self._compacted_bytes += max(0, freed)
+        logger.info(f"SESSION STORE: Compacted session '{session_id}': dropped {compacted_events} events, freed ~{max(0, freed)} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get session counts, estimated size and eviction/compaction counters."""
+        self._evict_expired()
+        return {
+            "sessions": len(self._usage),
+            "active_sessions": sum(1 for usage in self._usage.values() if usage["active"]),
+            "estimated_bytes": self._total_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self._evictions),
+            "compactions": self._compactions,
+            "compacted_events": self._compacted_events,
+            "compacted_bytes": self._compacted_bytes,
+        }
+
+    def _touch(self, key: SessionKey) -> None:
+        usage = self._usage.get(key)
+        if usage is not None:
+            usage["last_access"] = time.monotonic()
+            self._usage.move_to_end(key)
+
+    def _add_bytes(self, key: SessionKey, size: int) -> None:
+        self._usage[key]["bytes"] += size
+        self._total_bytes += size
+
+    def _expired(self, usage: Dict[str, Any]) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - usage["last_access"] > self.ttl_seconds
+
+    def _evict_expired(self) -> None:
+        """Evict sessions not accessed within the TTL, in run or not."""
+        for key in [key for key, usage in self._usage.items() if self._expired(usage)]:
+            self._evict(key, "ttl")
+
+    def _over_limit(self) -> Optional[str]:
+        if self.max_sessions and len(self._usage) > self.max_sessions:
+            return "max_sessions"
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            return "max_bytes"
+        return None
+
+    def _enforce_limits(self) -> None:
+        """Evict LRU completed sessions until within limits; sessions with a run in progress are kept."""
+        reason = self._over_limit()
+        while reason:
+            victim = next((key for key, usage in self._usage.items() if not usage["active"]), None)
+            if victim is None:
+                logger.warning(f"SESSION STORE: Over {reason} with only in-progress sessions left; not evicting")
+                return
+            self._evict(victim, reason)
+            reason = self._over_limit()
+
+    def _evict(self, key: SessionKey, reason: str) -> None:
+        app_name, user_id, session_id = key
+        was_active = self._usage[key]["active"]
+        self._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+        self._evictions[reason] += 1
+        log = logger.warning if was_active else logger.info
+        log(f"SESSION STORE: Evicted {'in-progress ' if was_active else ''}session '{session_id}' ({reason})")
+
+
+def _json_size(value: Any) -> int:
+    """Estimated size in bytes of a JSON-serializable value."""
+    return len(json.dumps(value, default=str))
+
+
+def create_session_service(config_data: Dict[str, Any]):
+    """
+    Build the session service named by ``session_store.backend`` in config.yaml.
+
+    Returns:
+        BoundedSessionService for "memory" (default), SQLiteSessionService for "sqlite"
+    """
+    backend = (config_data.get("session_store", {}) or {}).get("backend", "memory")
+    if backend == "sqlite":
+        from src.utils.sqlite_session_store import SQLiteSessionService
+        return SQLiteSessionService.from_config(config_data)
+    if backend == "memory":
+        return BoundedSessionService.from_config(config_data)
+    raise ValueError(f"Unknown session store backend '{backend}'. Available backends: ['memory', 'sqlite']")
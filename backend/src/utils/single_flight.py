@@ -0,0 +1,92 @@
+"""Single-flight coalescing of identical concurrent async calls."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+class SingleFlight:
+    """
+    Runs at most one in-flight call per key; concurrent callers share its result.
+
+    The shared call runs in its own task and every caller awaits it through
+    ``asyncio.shield``, so a caller that is cancelled (e.g. a client
+    disconnect) does not cancel the run other callers are waiting on. With
+    ``cancel_abandoned`` the run is cancelled once its last caller has gone.
+    """
+
+    def __init__(self, name: str, cancel_abandoned: bool = False):
+        self.name = name
+        self.cancel_abandoned = cancel_abandoned
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._leaders = 0
+        self._coalesced = 0
+        self._abandoned = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run ``factory()`` for ``key`` or attach to the run already in flight.
+
+        Args:
+            key: Identity of the call; callers with equal keys are coalesced
+            factory: Zero-argument callable returning the coroutine to run
+
+        Returns:
+            tuple: (result, shared) where ``shared`` is True when this caller
+            attached to a run started by another caller
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+
+        if task is None:
+            self._leaders += 1
+            task = asyncio.create_task(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            logger.info(f"SINGLE FLIGHT [{self.name}]: Started run for key '{key}'")
+        else:
+            self._coalesced += 1
+            logger.info(f"SINGLE FLIGHT [{self.name}]: Attached to in-flight run for key '{key}'")
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if self.cancel_abandoned and not task.done():
+                    self._abandoned += 1
+                    logger.info(f"SINGLE FLIGHT [{self.name}]: No callers left, cancelling run for key '{key}'")
+                    task.cancel()
+                    # New callers start a fresh run rather than attach to the cancelled one
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Number of distinct keys currently running."""
+        return len(self._calls)
+
+    def running(self, key: str) -> bool:
+        """Whether a run for ``key`` is in flight."""
+        return key in self._calls
+
+    def stats(self) -> Dict[str, Any]:
+        """Get leader/coalesced counters."""
+        return {
+            "in_flight": len(self._calls),
+            "runs_started": self._leaders,
+            "callers_coalesced": self._coalesced,
+            "runs_abandoned": self._abandoned,
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished task and consume its exception if nobody awaited it."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"SINGLE FLIGHT [{self.name}]: Run for key '{key}' failed: {task.exception()}")
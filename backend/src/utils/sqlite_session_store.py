@@ -0,0 +1,469 @@
+"""SQLite-backed ADK session service.
+
+Sessions survive restarts and can be shared by several worker processes using
+the same database file. The database runs in WAL mode, so readers do not block
+the writer. Appended events are buffered and written in batches. Each session
+row holds a snapshot of its current state, so older events can be compacted away
+without losing state, and sessions are read without loading their full history.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    compacted_events INTEGER NOT NULL DEFAULT 0,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    author TEXT,
+    timestamp REAL NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_events_session_time ON events (app_name, user_id, session_id, timestamp);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+SessionKey = Tuple[str, str, str]
+
+
+def _split_state(state: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Split a state dict into app / user / session parts, dropping temp keys."""
+    parts: Dict[str, Dict[str, Any]] = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            parts["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            parts["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            parts["session"][key] = value
+    return parts
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class SQLiteSessionService(BaseSessionService):
+    """
+    Durable session service backed by one SQLite database file.
+
+    Appended events update the caller's session object immediately and are
+    written to the database in batches: when ``batch_size`` events are pending,
+    after ``flush_interval_seconds``, or before any read. Once a session has
+    more than ``max_events`` stored events, the oldest are deleted down to
+    ``keep_recent_events``; the state snapshot in the session row already
+    includes their deltas.
+
+    Database work runs in worker threads; a lock serializes this process's
+    writes, and ``busy_timeout`` covers writers in other processes. Flushes run
+    one at a time, so batches are committed in the order they were buffered and
+    a read that flushes first also waits for any batch already being written.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "src/data/sessions.db",
+        batch_size: int = 20,
+        flush_interval_seconds: float = 0.5,
+        max_events: int = 200,
+        keep_recent_events: int = 20,
+    ):
+        self.db_path = os.path.abspath(db_path)
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_events = max_events
+        self.keep_recent_events = keep_recent_events
+
+        self._pending: List[Tuple[SessionKey, Event]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._write_lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        self._counters = {"events_written": 0, "flushes": 0, "compactions": 0, "compacted_events": 0}
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "SQLiteSessionService":
+        """Build a session service from the ``session_store`` section of config.yaml."""
+        store_config = config_data.get("session_store", {}) or {}
+        return cls(
+            db_path=store_config.get("sqlite_path", "src/data/sessions.db"),
+            batch_size=store_config.get("batch_size", 20),
+            flush_interval_seconds=store_config.get("flush_interval_seconds", 0.5),
+            max_events=store_config.get("max_events", 200),
+            keep_recent_events=store_config.get("keep_recent_events", 20),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it in WAL mode on first use or after ``close()``."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "generation", None) != self._generation:
+            # Only this thread uses the connection; close() may close it from another thread
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        parts = _split_state(state)
+        now = time.time()
+
+        def create() -> None:
+            with self._write_lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    exists = conn.execute(
+                        "SELECT 1 FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (app_name, user_id, session_id),
+                    ).fetchone()
+                    if exists:
+                        raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+                    conn.execute(
+                        "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)",
+                        (app_name, user_id, session_id, _dumps(parts["session"]), now, now),
+                    )
+                    self._merge_scoped_state(conn, app_name, user_id, parts)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+        await asyncio.to_thread(create)
+        session = Session(app_name=app_name, user_id=user_id, id=session_id, state=parts["session"], last_update_time=now)
+        return await asyncio.to_thread(self._with_scoped_state, session)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        await self.flush()
+
+        def load() -> Optional[Session]:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+
+            query = "SELECT event FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: List[Any] = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY seq DESC"
+            if config and config.num_recent_events is not None:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+            events = [Event.model_validate_json(event) for (event,) in conn.execute(query, params)]
+            events.reverse()
+
+            session = Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                state=json.loads(row[0]),
+                events=events,
+                last_update_time=row[1],
+            )
+            return self._with_scoped_state(session)
+
+        return await asyncio.to_thread(load)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        await self.flush()
+
+        def list_rows() -> List[Session]:
+            conn = self._connect()
+            query = "SELECT user_id, id, update_time FROM sessions WHERE app_name = ?"
+            params: List[Any] = [app_name]
+            if user_id is not None:
+                query += " AND user_id = ?"
+                params.append(user_id)
+            return [
+                Session(app_name=app_name, user_id=row_user, id=row_id, state={}, last_update_time=update_time)
+                for row_user, row_id, update_time in conn.execute(query, params)
+            ]
+
+        return ListSessionsResponse(sessions=await asyncio.to_thread(list_rows))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.flush()
+
+        def delete() -> None:
+            with self._write_lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", (app_name, user_id, session_id))
+                    conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", (app_name, user_id, session_id))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+        await asyncio.to_thread(delete)
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        await self.flush()
+
+        def load() -> Dict[str, Any]:
+            row = self._connect().execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            ).fetchone()
+            return json.loads(row[0]) if row else {}
+
+        return await asyncio.to_thread(load)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        self._pending.append(((session.app_name, session.user_id, session.id), event))
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(
+                self.flush_interval_seconds, lambda: asyncio.ensure_future(self._scheduled_flush())
+            )
+        return event
+
+    async def flush(self) -> None:
+        """Write all buffered events and their state deltas in one transaction."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            write = asyncio.ensure_future(asyncio.to_thread(self._write_batch, batch))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # The thread keeps writing this batch; hold the lock until it is
+                # done so the next flush cannot commit ahead of it.
+                await asyncio.wait({write})
+                raise
+
+    async def close(self) -> None:
+        """Write all buffered events, then close every thread's connection (reopened on next use)."""
+        await self.flush()
+        await asyncio.to_thread(self._close_connections)
+
+    def _close_connections(self) -> None:
+        with self._write_lock:
+            with self._connections_lock:
+                connections, self._connections = self._connections, []
+                self._generation += 1
+            for conn in connections:
+                conn.close()
+
+    async def _scheduled_flush(self) -> None:
+        self._flush_handle = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"SESSION STORE: Failed to write buffered events: {e}")
+
+    def _write_batch(self, batch: List[Tuple[SessionKey, Event]]) -> None:
+        by_session: Dict[SessionKey, List[Event]] = {}
+        for key, event in batch:
+            by_session.setdefault(key, []).append(event)
+
+        with self._write_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                written = 0
+                for key, events in by_session.items():
+                    app_name, user_id, session_id = key
+                    row = conn.execute(
+                        "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+                    ).fetchone()
+                    if row is None:
+                        logger.warning(f"SESSION STORE: Dropping {len(events)} events for deleted session '{session_id}'")
+                        continue
+                    next_seq = conn.execute(
+                        "SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+                    ).fetchone()[0]
+
+                    state = json.loads(row[0])
+                    scoped: Dict[str, Dict[str, Any]] = {"app": {}, "user": {}}
+                    rows = []
+                    for seq, event in enumerate(events, start=next_seq):
+                        rows.append((
+                            app_name, user_id, session_id, seq, event.id, event.author, event.timestamp,
+                            event.model_dump_json(exclude_none=True, by_alias=True),
+                        ))
+                        parts = _split_state(event.actions.state_delta if event.actions else None)
+                        state.update(parts["session"])
+                        scoped["app"].update(parts["app"])
+                        scoped["user"].update(parts["user"])
+
+                    conn.executemany(
+                        "INSERT INTO events (app_name, user_id, session_id, seq, id, author, timestamp, event) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    conn.execute(
+                        "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (_dumps(state), events[-1].timestamp, *key),
+                    )
+                    self._merge_scoped_state(conn, app_name, user_id, scoped)
+                    written += len(events)
+                    if next_seq + len(events) - 1 > self.max_events:
+                        self._compact(conn, key, self.keep_recent_events)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._counters["events_written"] += written
+        self._counters["flushes"] += 1
+
+    async def complete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        """Flush a finished run and compact its events down to the state snapshot."""
+        await self.flush()
+
+        def compact() -> None:
+            with self._write_lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._compact(conn, (app_name, user_id, session_id), self.keep_recent_events)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+        await asyncio.to_thread(compact)
+
+    def _compact(self, conn: sqlite3.Connection, key: SessionKey, keep_recent: int) -> None:
+        """Delete all but the newest ``keep_recent`` events of a session. Runs inside a write transaction."""
+        deleted = conn.execute(
+            """
+            DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq <= (
+                SELECT COALESCE(MAX(seq), 0) - ? FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?
+            )
+            """,
+            (*key, keep_recent, *key),
+        ).rowcount
+        if deleted > 0:
+            conn.execute(
+                "UPDATE sessions SET compacted_events = compacted_events + ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                (deleted, *key),
+            )
+            self._counters["compactions"] += 1
+            self._counters["compacted_events"] += deleted
+            logger.info(f"SESSION STORE: Compacted {deleted} events of session '{key[2]}' into its state snapshot")
+
+    def _merge_scoped_state(self, conn: sqlite3.Connection, app_name: str, user_id: str, parts: Dict[str, Dict[str, Any]]) -> None:
+        """Merge app- and user-scoped state deltas. Runs inside a write transaction."""
+        if parts["app"]:
+            row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **parts["app"]}
+            conn.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", (app_name, _dumps(state)))
+        if parts["user"]:
+            row = conn.execute("SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)).fetchone()
+            state = {**(json.loads(row[0]) if row else {}), **parts["user"]}
+            conn.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, _dumps(state)),
+            )
+
+    def _with_scoped_state(self, session: Session) -> Session:
+        """Add app- and user-scoped state to a session's state under their prefixes."""
+        conn = self._connect()
+        row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (session.app_name,)).fetchone()
+        for key, value in (json.loads(row[0]) if row else {}).items():
+            session.state[State.APP_PREFIX + key] = value
+        row = conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (session.app_name, session.user_id)
+        ).fetchone()
+        for key, value in (json.loads(row[0]) if row else {}).items():
+            session.state[State.USER_PREFIX + key] = value
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get stored session/event counts, pending writes and compaction counters.
+
+        Runs COUNT queries, so call it from a worker thread, not the event loop.
+        """
+        conn = self._connect()
+        sessions = conn.execute("SELECT COUNT(*), COALESCE(SUM(compacted_events), 0) FROM sessions").fetchone()
+        events = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "db_path": self.db_path,
+            "db_bytes": os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            "sessions": sessions[0],
+            "stored_events": events,
+            "pending_events": len(self._pending),
+            **self._counters,
+        }
@@ -0,0 +1,189 @@
+"""Startup warmup run from the FastAPI lifespan.
+
+The first request would otherwise pay for resolving credentials, importing the
+export libraries, parsing prompts.yml, building the agent pipelines and creating the Gemini
+clients with their first TLS handshakes. ``Warmup.run`` does that work up front,
+step by step, logging each step's timing; ``GET /ready`` reports ready once it
+has finished.
+"""
+
+import asyncio
+import importlib
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.google_llm import Gemini
+
+from src.config.load_config import load_config
+from src.utils.setup_log import setup_logger
+
+logger = setup_logger()
+
+
+def iter_llm_agents(agent: BaseAgent) -> List[LlmAgent]:
+    """Get every LlmAgent in an agent tree."""
+    agents = [agent] if isinstance(agent, LlmAgent) else []
+    for sub_agent in agent.sub_agents:
+        agents.extend(iter_llm_agents(sub_agent))
+    return agents
+
+
+class Warmup:
+    """
+    Runs the warmup steps once and records their outcome.
+
+    A failing step is logged and recorded but does not stop the remaining steps,
+    and the service still becomes ready: warmup only moves cost off the first
+    request, every step is retried lazily on demand.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        modules: Optional[List[str]] = None,
+        pipeline_modes: Optional[List[str]] = None,
+        ping_models: bool = True,
+        ping_timeout_seconds: float = 10,
+    ):
+        self.enabled = enabled
+        self.modules = modules if modules is not None else ["pandas", "openpyxl"]
+        self.pipeline_modes = pipeline_modes
+        self.ping_models = ping_models
+        self.ping_timeout_seconds = ping_timeout_seconds
+
+        self.ready = not enabled
+        self.started_at: Optional[float] = None
+        self.duration_seconds: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_config(cls, config_data: Dict[str, Any]) -> "Warmup":
+        """Build the warmup from the ``warmup`` section of config.yaml."""
+        warmup_config = config_data.get("warmup", {}) or {}
+        return cls(
+            enabled=warmup_config.get("enabled", True),
+            modules=warmup_config.get("modules"),
+            pipeline_modes=warmup_config.get("pipeline_modes"),
+            ping_models=warmup_config.get("ping_models", True),
+            ping_timeout_seconds=warmup_config.get("ping_timeout_seconds", 10),
+        )
+
+    async def run(self) -> None:
+        """Run every warmup step and mark the service ready."""
+        if not self.enabled:
+            logger.info("WARMUP: Disabled")
+            return
+
+        logger.info("=== WARMUP STARTED ===")
+        self.started_at = time.time()
+        started = time.perf_counter()
+        try:
+            await self._step("config", lambda: asyncio.to_thread(self._resolve_config))
+            await self._step("imports", lambda: asyncio.to_thread(self._import_modules))
+            await self._step("prompts", lambda: asyncio.to_thread(self._render_prompts))
+            runners = await self._step("agents", self._build_runners)
+            await self._step("model_clients", lambda: self._open_model_clients(runners or []))
+        finally:
+            self.duration_seconds = round(time.perf_counter() - started, 3)
+            self.ready = True
+        failed = [name for name, step in self.steps.items() if not step["ok"]]
+        logger.info(f"=== WARMUP COMPLETED in {self.duration_seconds}s === Failed steps: {failed or 'none'}")
+
+    def status(self) -> Dict[str, Any]:
+        """Get readiness and per-step timing."""
+        return {
+            "ready": self.ready,
+            "enabled": self.enabled,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration_seconds,
+            "steps": self.steps,
+        }
+
+    async def _step(self, name: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = await func()
+        except Exception as e:
+            error = str(e)
+        seconds = round(time.perf_counter() - started, 3)
+        self.steps[name] = {"ok": error is None, "seconds": seconds}
+        if error is None:
+            logger.info(f"WARMUP: {name} took {seconds}s")
+        else:
+            self.steps[name]["error"] = error
+            logger.warning(f"WARMUP: {name} failed after {seconds}s: {error}")
+        return result
+
+    def _resolve_config(self) -> None:
+        """Resolve credentials/project (``google.auth.default()``) and print the configuration banner."""
+        from src.config.research_config import print_config_summary
+
+        print_config_summary()
+
+    def _import_modules(self) -> None:
+        """Import heavy modules used on the request path (pandas/openpyxl exports)."""
+        for module in self.modules:
+            importlib.import_module(module)
+
+    def _render_prompts(self) -> None:
+        """Parse prompts.yml and render every agent's instruction."""
+        from src.agents.create_parallel_category_agent import categories, category_output_key
+        from src.utils import prompt_loader
+
+        prompt_loader.get_trend_research_agent_prompt()
+        prompt_loader.get_output_composer_agent_prompt()
+        for category in categories:
+            prompt_loader.get_category_agent_prompt(category)
+        prompt_loader.get_consolidation_agent_prompt(
+            {category: category_output_key(category) for category in categories}
+        )
+
+    async def _build_runners(self) -> list:
+        """
+        Build the runners for the configured pipeline modes at the default tier.
+
+        Only the module import runs in a thread. ``get_runner`` fills the
+        service's runner dict, which request handlers read on the event loop, so
+        the runners are built on the loop too.
+        """
+        service = await asyncio.to_thread(importlib.import_module, "src.utils.service")
+
+        modes = self.pipeline_modes or [service.resolve_pipeline_mode()]
+        return [service.get_runner(mode) for mode in modes]
+
+    async def _open_model_clients(self, runners: list) -> None:
+        """
+        Create the Gemini client of every agent model on this event loop and ping each once.
+
+        The ping is a model metadata lookup, which opens the client's connection
+        (TLS handshake) without generating content.
+        """
+        models: Dict[int, Gemini] = {}
+        for runner in runners:
+            for agent in iter_llm_agents(runner.agent):
+                if isinstance(agent.model, Gemini):
+                    models.setdefault(id(agent.model), agent.model)
+
+        clients = {}
+        for model in models.values():
+            client = model.api_client
+            clients.setdefault(id(client), (client, model.model))
+        logger.info(f"WARMUP: {len(models)} agent models, {len(clients)} clients")
+
+        if not self.ping_models:
+            return
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(client.aio.models.get(model=model_name), self.ping_timeout_seconds)
+                for client, model_name in clients.values()
+            ),
+            return_exceptions=True,
+        )
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if failures:
+            raise RuntimeError(f"{len(failures)} of {len(clients)} model client pings failed: {failures[0]!r}")
+
+
+warmup = Warmup.from_config(load_config())
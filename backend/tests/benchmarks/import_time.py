@@ -0,0 +1,182 @@
+"""Import-time benchmark for the service and its CLI entry points.
+
+Imports each target module in a fresh interpreter with ``python -X importtime``
+(so nothing is already in ``sys.modules``), repeats it ``--runs`` times and
+reports the median wall time, the slowest modules by self time and the
+cumulative cost per top-level package (``src``, ``google.adk``, ``pandas``...).
+
+Run from the backend directory:
+
+    python tests/benchmarks/import_time.py --runs 5 --top 25 \\
+        --output src/data/benchmarks/import_time.json
+
+Targets default to ``src.app`` and ``src.utils.insert_trends_to_csv``; pass
+``--target`` (repeatable) to benchmark other modules.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+DEFAULT_TARGETS = ["src.app", "src.utils.insert_trends_to_csv"]
+
+# Packages reported separately; every other module is grouped by its top-level name
+PACKAGE_GROUPS = [
+    "src",
+    "google.adk",
+    "google.genai",
+    "google.auth",
+    "google.cloud",
+    "opentelemetry",
+    "pandas",
+    "numpy",
+    "openpyxl",
+    "fastapi",
+    "starlette",
+    "pydantic",
+    "sqlalchemy",
+    "httpx",
+    "loguru",
+    "yaml",
+]
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def package_of(module: str) -> str:
+    """Get the reporting group of a module name."""
+    for package in PACKAGE_GROUPS:
+        if module == package or module.startswith(package + "."):
+            return package
+    return module.split(".")[0]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        One entry per imported module with ``self_us``, ``cumulative_us`` and
+        ``depth`` (nesting level, 0 for modules imported directly by the target)
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            modules.append({
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            })
+        except ValueError:
+            continue
+    return modules
+
+
+def import_once(target: str) -> Dict[str, Any]:
+    """Import ``target`` in a fresh interpreter and get its wall time and per-module timings."""
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR}
+    env.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "False")
+    env.setdefault("GOOGLE_API_KEY", "import-benchmark")
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - started
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"Importing {target} failed: {error}")
+    return {"wall_seconds": wall_seconds, "modules": parse_importtime(result.stderr)}
+
+
+def benchmark_target(target: str, runs: int, top: int) -> Dict[str, Any]:
+    """Import a target ``runs`` times and aggregate median timings per module and package."""
+    wall_times = []
+    self_times: Dict[str, List[int]] = defaultdict(list)
+    cumulative_times: Dict[str, List[int]] = defaultdict(list)
+    for _ in range(runs):
+        run = import_once(target)
+        wall_times.append(run["wall_seconds"])
+        for module in run["modules"]:
+            self_times[module["module"]].append(module["self_us"])
+            cumulative_times[module["module"]].append(module["cumulative_us"])
+
+    modules = [
+        {
+            "module": name,
+            "self_ms": round(statistics.median(self_times[name]) / 1000, 2),
+            "cumulative_ms": round(statistics.median(cumulative_times[name]) / 1000, 2),
+        }
+        for name in self_times
+    ]
+    modules.sort(key=lambda module: module["self_ms"], reverse=True)
+
+    packages: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"modules": 0, "self_ms": 0.0})
+    for module in modules:
+        package = packages[package_of(module["module"])]
+        package["modules"] += 1
+        package["self_ms"] = round(package["self_ms"] + module["self_ms"], 2)
+
+    return {
+        "target": target,
+        "runs": runs,
+        "wall_seconds_median": round(statistics.median(wall_times), 3),
+        "wall_seconds_min": round(min(wall_times), 3),
+        "modules_imported": len(modules),
+        "total_import_ms": round(sum(module["self_ms"] for module in modules), 2),
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1]["self_ms"], reverse=True)),
+        "top_modules": modules[:top],
+    }
+
+
+def print_report(result: Dict[str, Any], top_packages: int = 15) -> None:
+    print(f"\n=== {result['target']} ({result['runs']} runs) ===")
+    print(
+        f"Wall time: median {result['wall_seconds_median']}s, min {result['wall_seconds_min']}s | "
+        f"{result['modules_imported']} modules, {result['total_import_ms']}ms importing"
+    )
+    print(f"\n{'package':<24}{'modules':>9}{'self ms':>11}")
+    for package, totals in list(result["packages"].items())[:top_packages]:
+        print(f"{package:<24}{totals['modules']:>9}{totals['self_ms']:>11}")
+    print(f"\n{'module':<56}{'self ms':>10}{'cumul ms':>11}")
+    for module in result["top_modules"]:
+        print(f"{module['module'][:55]:<56}{module['self_ms']:>10}{module['cumulative_ms']:>11}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time of the service entry points")
+    parser.add_argument("--target", action="append", dest="targets", help="Module to import (repeatable)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter imports per target")
+    parser.add_argument("--top", type=int, default=20, help="Slowest modules to report per target")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = [benchmark_target(target, args.runs, args.top) for target in args.targets or DEFAULT_TARGETS]
+    for result in results:
+        print_report(result)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": datetime.now().isoformat(), "python": sys.version, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
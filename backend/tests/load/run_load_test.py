@@ -0,0 +1,363 @@
+"""End-to-end load test of the FastAPI service against a fake agent backend.
+
+Starts ``src.app:app`` in-process (lifespan included) and serves every agent run
+from a synthetic recording through ``ReplayAgent``, so no Gemini or Google Search
+calls are made while routing, caching, callbacks and file output run as in
+production. Drives ``POST /analysis/`` and the ``/trends/*`` read endpoints at a
+fixed concurrency and writes latency percentiles, throughput, event-loop lag and
+RSS growth to a JSON file.
+
+Run from the backend directory:
+
+    python tests/load/run_load_test.py --requests 500 --concurrency 50 \\
+        --output src/data/loadtest/results.json --baseline src/data/loadtest/previous.json
+
+With ``--baseline`` the run exits with status 1 if any endpoint's p95 latency
+regressed by more than ``--max-regression`` (default 20%).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath('.'))
+
+os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "False")
+os.environ.setdefault("GOOGLE_API_KEY", "load-test")
+
+import httpx
+
+from src.app import app
+from src.models.session_models import SephoraTrendsReport
+from src.utils import service
+from src.utils.admission import admission
+from src.utils.result_cache import result_cache
+from src.utils.run_recorder import RECORDING_VERSION, replay_config, save_recording
+
+# Read endpoints exercised alongside POST /analysis/; unavailable ones are skipped
+READ_ENDPOINTS = [
+    "/trends/recent?limit=20",
+    "/trends/stats",
+    "/trends/categories",
+    "/trends/search?q=glow",
+    "/analysis/metrics",
+]
+
+SAMPLE_RESEARCH = """## Makeup Trends
+- Trend Name: Glass Skin Makeup
+- Trend Summary: Dewy, reflective base makeup.
+- Keyword Associations: dewy, glow, luminous
+
+## Skincare Trends
+- Trend Name: Bakuchiol Serums
+- Trend Summary: Plant-based retinol alternative.
+- Ingredient Associations: bakuchiol, squalane
+"""
+
+
+def build_fake_recording(agent_latency: float) -> Dict[str, Any]:
+    """
+    Build a recording of a two-agent run taking ``agent_latency`` seconds.
+
+    The research agent emits its findings at 70% of the latency and the output
+    composer the structured report at the end.
+    """
+    report = SephoraTrendsReport.model_validate({
+        "reportSummary": "Load test report.",
+        "trends": {
+            "makeupTrends": [{"trendName": "Glass Skin Makeup", "trendSummary": "Dewy, reflective base makeup.", "keywords": ["dewy", "glow"]}],
+            "skincareTrends": [{"trendName": "Bakuchiol Serums", "trendSummary": "Plant-based retinol alternative.", "ingredients": ["bakuchiol"]}],
+        },
+        "totalTrendsFound": 2,
+    })
+    return {
+        "version": RECORDING_VERSION,
+        "query": "load test",
+        "recorded_at": time.time(),
+        "duration_seconds": agent_latency,
+        "metadata": {"agent": "fake_load_test_backend"},
+        "events": [
+            {
+                "offset": round(agent_latency * 0.7, 4),
+                "event": {
+                    "author": "sephora_trend_research_agent",
+                    "content": {"role": "model", "parts": [{"text": SAMPLE_RESEARCH}]},
+                    "actions": {"stateDelta": {"sephora_trend_research_findings": SAMPLE_RESEARCH}},
+                },
+            },
+            {
+                "offset": round(agent_latency, 4),
+                "event": {
+                    "author": "output_composer_agent",
+                    "content": {"role": "model", "parts": [{"text": report.model_dump_json(by_alias=True, exclude_none=True)}]},
+                    "actions": {"stateDelta": {"sephora_trends_report": report.model_dump(exclude_none=True)}},
+                },
+            },
+        ],
+        "final_state": {},
+    }
+
+
+def use_fake_backend(work_dir: str, agent_latency: float) -> None:
+    """Point every pipeline at a replay of the fake recording and keep outputs in ``work_dir``."""
+    recording_path = save_recording(build_fake_recording(agent_latency), os.path.join(work_dir, "fake_run.json.gz"))
+    replay_config.update({"mode": "replay", "recording_path": recording_path, "time_scale": 1.0})
+    service._runners.pop(("replay", "replay"), None)
+    service.config_data.setdefault("output_folder", {})["OUTPUT_DIR"] = os.path.join(work_dir, "outputs")
+    result_cache.persist_path = None
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values``, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds."""
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "count": len(latencies),
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "max_ms": ms(max(latencies) if latencies else None),
+    }
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a ``sleep(interval)`` wakes up."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return summarize(self.samples)
+
+
+async def available_read_endpoints(client: httpx.AsyncClient) -> Dict[str, int]:
+    """Probe the read endpoints; returns the status of each (404 means not mounted)."""
+    statuses = {}
+    for path in READ_ENDPOINTS:
+        response = await client.get(path)
+        statuses[path] = response.status_code
+    return statuses
+
+
+async def run_load_test(
+    requests: int = 200,
+    concurrency: int = 20,
+    read_ratio: float = 0.8,
+    distinct_queries: int = 50,
+    agent_latency: float = 0.2,
+    pipeline_mode: Optional[str] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run the load test and return the results.
+
+    Args:
+        requests: Total requests to send
+        concurrency: Requests in flight at a time
+        read_ratio: Fraction of requests going to the read endpoints
+        distinct_queries: Distinct trend queries for POST /analysis/; repeats can be cache hits
+        agent_latency: Seconds each fake agent run takes
+        pipeline_mode: "sequential" or "parallel"; defaults to config.yaml
+        seed: Random seed for the request mix
+
+    Returns:
+        dict: Configuration, per-endpoint latency, throughput, loop lag and RSS
+    """
+    rng = random.Random(seed)
+    work_dir = tempfile.mkdtemp(prefix="sephora-loadtest-")
+    use_fake_backend(work_dir, agent_latency)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            probe = await available_read_endpoints(client)
+            read_paths = [path for path, code in probe.items() if code != 404]
+
+            plan = []
+            for i in range(requests):
+                if read_paths and rng.random() < read_ratio:
+                    plan.append(("GET", rng.choice(read_paths), None))
+                else:
+                    plan.append(("POST", "/analysis/", {
+                        "session_id": f"loadtest-{i}",
+                        "user_id": "loadtest",
+                        "trend_query": f"load test trend query {rng.randrange(max(1, distinct_queries))}",
+                        "pipeline_mode": pipeline_mode,
+                    }))
+
+            latencies: Dict[str, List[float]] = {}
+            status_counts: Dict[str, Dict[str, int]] = {}
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in plan:
+                queue.put_nowait(item)
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        method, path, body = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    name = f"{method} {path.split('?')[0]}"
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, json=body)
+                        outcome = str(response.status_code)
+                    except Exception as e:
+                        outcome = type(e).__name__
+                    latencies.setdefault(name, []).append(time.perf_counter() - started)
+                    counts = status_counts.setdefault(name, {})
+                    counts[outcome] = counts.get(outcome, 0) + 1
+
+            rss_start = current_rss_mb()
+            lag = LoopLagMonitor()
+            lag.start()
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+            elapsed = time.perf_counter() - started
+            await lag.stop()
+            rss_end = current_rss_mb()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    # 429/503 are load shed by admission control, counted apart from errors
+    shed = sum(
+        count for counts in status_counts.values()
+        for outcome, count in counts.items() if outcome in ("429", "503")
+    )
+    errors = sum(
+        count for counts in status_counts.values()
+        for outcome, count in counts.items() if not outcome.startswith("2")
+    ) - shed
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "read_ratio": read_ratio,
+            "distinct_queries": distinct_queries,
+            "agent_latency_seconds": agent_latency,
+            "pipeline_mode": pipeline_mode,
+            "seed": seed,
+        },
+        "read_endpoints": {path: ("available" if code != 404 else "not mounted") for path, code in probe.items()},
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else None,
+        "errors": errors,
+        "shed": shed,
+        "latency": {"all": summarize(all_latencies), **{name: summarize(values) for name, values in sorted(latencies.items())}},
+        "status_counts": status_counts,
+        "event_loop_lag": lag.stats(),
+        "rss_mb": {"start": round(rss_start, 1), "end": round(rss_end, 1), "growth": round(rss_end - rss_start, 1)},
+        "result_cache": result_cache.stats(),
+        "admission": admission.stats(),
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """List endpoints whose p95 latency grew by more than ``max_regression`` over the baseline."""
+    regressions = []
+    for name, current in results["latency"].items():
+        previous = baseline.get("latency", {}).get(name)
+        if not previous or not previous.get("p95_ms") or current.get("p95_ms") is None:
+            continue
+        growth = current["p95_ms"] / previous["p95_ms"] - 1
+        if growth > max_regression:
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms (+{growth:.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the trends API against a fake agent backend")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at a time")
+    parser.add_argument("--read-ratio", type=float, default=0.8, help="Fraction of requests to the read endpoints")
+    parser.add_argument("--distinct-queries", type=int, default=50, help="Distinct queries for POST /analysis/")
+    parser.add_argument("--agent-latency", type=float, default=0.2, help="Seconds each fake agent run takes")
+    parser.add_argument("--pipeline-mode", choices=["sequential", "parallel"], default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="src/data/loadtest/results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="Previous results to compare p95 latency against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 growth over the baseline")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load_test(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        read_ratio=args.read_ratio,
+        distinct_queries=args.distinct_queries,
+        agent_latency=args.agent_latency,
+        pipeline_mode=args.pipeline_mode,
+        seed=args.seed,
+    ))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    overall = results["latency"]["all"]
+    print(f"Requests: {overall['count']} in {results['duration_seconds']}s ({results['throughput_rps']} req/s), errors: {results['errors']}, shed (429/503): {results['shed']}")
+    print(f"Latency p50/p95/p99: {overall['p50_ms']} / {overall['p95_ms']} / {overall['p99_ms']} ms")
+    print(f"Event loop lag p95: {results['event_loop_lag']['p95_ms']} ms, RSS growth: {results['rss_mb']['growth']} MB")
+    print(f"Results written to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f), args.max_regression)
+        if regressions:
+            print("p95 latency regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No p95 latency regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
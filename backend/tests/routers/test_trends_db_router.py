@@ -0,0 +1,56 @@
+"""Tests for the /trends listing endpoints: cursor pages and NDJSON streaming."""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.routers import trends_db
+from src.utils.database import TrendDatabase
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    db = TrendDatabase(str(tmp_path / "trends.db"), pool_size=2)
+    db.save_trends_batch({"makeupTrends": [{"trend_name": f"Trend {i}"} for i in range(7)]}, "s1")
+    monkeypatch.setattr(trends_db, "get_db", lambda: db)
+    monkeypatch.setattr(trends_db, "stream_batch_size", 3)
+
+    app = FastAPI()
+    app.include_router(trends_db.router)
+    with TestClient(app) as test_client:
+        yield test_client
+    db.close()
+
+
+def test_pages_follow_next_cursor(client):
+    names, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/trends/session/s1", params=params).json()
+        names.extend(trend["trend_name"] for trend in body["trends"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert names == [f"Trend {i}" for i in range(7)]
+
+
+def test_ndjson_streams_every_row_in_batches(client):
+    response = client.get("/trends/recent", headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["trend_name"] for row in rows] == [f"Trend {i}" for i in reversed(range(7))]
+
+    # Resuming from a line's cursor continues right after it
+    resumed = client.get(
+        "/trends/recent", params={"cursor": rows[2]["cursor"]}, headers={"Accept": "application/x-ndjson"}
+    )
+    assert [json.loads(line)["trend_name"] for line in resumed.text.splitlines()] == [
+        row["trend_name"] for row in rows[3:]
+    ]
+
+
+def test_bad_cursor_and_unknown_session(client):
+    assert client.get("/trends/recent", params={"cursor": "nope"}).status_code == 400
+    assert client.get("/trends/session/missing").status_code == 404
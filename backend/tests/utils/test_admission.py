@@ -0,0 +1,130 @@
+"""Tests for discovery admission control."""
+
+import asyncio
+
+import pytest
+
+from src.utils import admission as admission_module
+from src.utils.admission import AdmissionController, AdmissionRejectedError
+
+
+async def hold(controller, order, name, release, max_wait_seconds=None):
+    async with controller.admit(max_wait_seconds=max_wait_seconds):
+        order.append(name)
+        await release.wait()
+
+
+def test_slots_handed_over_in_fifo_order():
+    controller = AdmissionController(max_in_flight=1, max_queue=5, max_wait_seconds=5)
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+        first = asyncio.create_task(hold(controller, order, "first", release))
+        await asyncio.sleep(0)
+        waiters = []
+        for name in ("second", "third"):
+            waiters.append(asyncio.create_task(hold(controller, order, name, release)))
+            await asyncio.sleep(0)
+        assert controller.stats()["queue_depth"] == 2
+
+        release.set()
+        await asyncio.gather(first, *waiters)
+        # A request arriving after the queue drained gets the slot straight away
+        await hold(controller, order, "late", release)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert order == ["first", "second", "third", "late"]
+    stats = controller.stats()
+    assert (stats["in_flight"], stats["admitted"], stats["queued"]) == (0, 4, 2)
+
+
+def test_full_queue_rejected_with_queue_full_status():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, max_wait_seconds=5, queue_full_status=429)
+
+    async def run():
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, [], name, release)) for name in ("held", "queued")]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            controller.check()
+        with pytest.raises(AdmissionRejectedError):
+            async with controller.admit():
+                pass
+        release.set()
+        await asyncio.gather(*tasks)
+        return rejected.value
+
+    error = asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert (error.reason, error.status_code) == ("queue_full", 429)
+    assert error.retry_after == controller.default_retry_after_seconds
+    assert controller.stats()["rejected"] == {"queue_full": 2, "queue_timeout": 0}
+
+
+def test_wait_timeout_rejected_with_queue_timeout_status():
+    controller = AdmissionController(max_in_flight=1, max_queue=5, max_wait_seconds=5, queue_timeout_status=503)
+
+    async def run():
+        release = asyncio.Event()
+        held = asyncio.create_task(hold(controller, [], "held", release))
+        await asyncio.sleep(0)
+        # The request's own deadline caps the configured wait
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            async with controller.admit(max_wait_seconds=0.01):
+                pass
+        assert controller.stats()["queue_depth"] == 0
+        release.set()
+        await held
+        return rejected.value
+
+    error = asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert (error.reason, error.status_code) == ("queue_timeout", 503)
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(max_in_flight=1, max_queue=5, max_wait_seconds=5)
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+        held = asyncio.create_task(hold(controller, order, "held", release))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(hold(controller, order, "cancelled", release))
+        waiting = asyncio.create_task(hold(controller, order, "waiting", release))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        release.set()
+        await asyncio.gather(held, waiting)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert order == ["held", "waiting"]
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_slot_handed_over_as_wait_runs_out_is_kept(monkeypatch):
+    controller = AdmissionController(max_in_flight=1, max_queue=5, max_wait_seconds=5)
+
+    async def handover_then_timeout(fut, timeout):
+        # The holder finishes in the same loop iteration the wait times out
+        controller._release()
+        fut.cancel()
+        raise asyncio.TimeoutError
+
+    async def run():
+        await controller._acquire(None)
+        monkeypatch.setattr(admission_module.asyncio, "wait_for", handover_then_timeout)
+        async with controller.admit():
+            in_flight = controller.stats()["in_flight"]
+        return in_flight
+
+    assert asyncio.run(run()) == 1
+
+    stats = controller.stats()
+    assert stats["rejected"] == {"queue_full": 0, "queue_timeout": 0}
+    assert (stats["in_flight"], stats["admitted"]) == (0, 2)
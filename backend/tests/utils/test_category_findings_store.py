@@ -0,0 +1,64 @@
+from src.agents.create_parallel_category_agent import category_agent_name, category_output_key
+from src.models.session_models import TrendSendRequest
+from src.utils import category_findings_store as store_module
+from src.utils import service
+from src.utils.category_findings_store import CategoryFindingsStore
+from src.utils.search_tool import recorded_sources
+
+SOURCE = {"short_id": "src-1", "title": "Article", "url": "https://example.com/a", "domain": "example.com"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_is_per_category(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(store_module.time, "time", clock)
+    store = CategoryFindingsStore(default_ttl_hours=24, ttl_hours={"Fragrance": 168, "Makeup": 1})
+    store.put_many("Spring trends", {"Fragrance": "fragrance findings", "Makeup": "makeup findings", "Hair": "hair findings"})
+
+    clock.now += 2 * 3600
+    assert sorted(store.get_fresh("spring  TRENDS", ["Fragrance", "Makeup", "Hair"])) == ["Fragrance", "Hair"]
+
+    clock.now += 24 * 3600
+    assert sorted(store.get_fresh("spring trends", ["Fragrance", "Makeup", "Hair"])) == ["Fragrance"]
+
+    stats = store.stats()
+    assert stats["hits_by_category"] == {"Fragrance": 2, "Hair": 1}
+    assert stats["misses_by_category"] == {"Makeup": 2, "Hair": 1}
+
+
+def test_sources_stored_with_findings_and_persisted(tmp_path):
+    path = str(tmp_path / "findings.json")
+    store = CategoryFindingsStore(persist_path=path)
+    store.put_many("spring trends", {"Hair": "hair findings", "Men": "men findings"}, {"Hair": {"src-1": SOURCE}})
+    store.flush()
+
+    reloaded = CategoryFindingsStore(persist_path=path)
+    fresh = reloaded.get_fresh("spring trends", ["Hair", "Men"])
+    assert fresh["Hair"] == {"findings": "hair findings", "sources": {"src-1": SOURCE}}
+    assert fresh["Men"] == {"findings": "men findings", "sources": {}}
+
+
+def test_disabled_store_serves_nothing():
+    store = CategoryFindingsStore(enabled=False)
+    store.put_many("spring trends", {"Hair": "hair findings"})
+    assert store.get_fresh("spring trends", ["Hair"]) == {}
+
+
+def test_cached_state_restores_sources(monkeypatch):
+    store = CategoryFindingsStore()
+    store.put_many("spring trends", {"Hair": "hair findings"}, {"Hair": {"src-1": SOURCE}})
+    monkeypatch.setattr(service, "category_findings_store", store)
+    request = TrendSendRequest(trend_query="spring trends", session_id="s1", user_id="u1")
+
+    state = service._cached_category_state(request, ["Hair", "Makeup"])
+
+    assert state[category_output_key("Hair")] == "hair findings"
+    assert category_output_key("Makeup") not in state
+    assert recorded_sources(state, agent_name=category_agent_name("Hair")) == {"src-1": SOURCE}
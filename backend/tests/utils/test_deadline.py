@@ -0,0 +1,117 @@
+"""Tests for request deadlines and disconnect cancellation."""
+
+import asyncio
+
+import pytest
+
+from src.utils import deadline as deadline_module
+from src.utils.deadline import (
+    CancellationStats,
+    ClientDisconnectedError,
+    Deadline,
+    DeadlineExceededError,
+    cancel_on_disconnect,
+    check_deadline,
+    current_deadline,
+    deadline_allows,
+    resolve_deadline,
+)
+
+
+@pytest.fixture
+def config(monkeypatch):
+    values = {"default_seconds": 600, "max_seconds": 900, "disconnect_poll_seconds": 0.01}
+    monkeypatch.setattr(deadline_module, "deadline_config", values)
+    return values
+
+
+def test_resolve_deadline_from_header_or_config(config):
+    assert resolve_deadline("30").seconds == 30
+    assert resolve_deadline("5000").seconds == 900
+    assert resolve_deadline("soon").seconds == 600
+    assert resolve_deadline().seconds == 600
+    assert resolve_deadline("0").seconds is None
+
+    config["default_seconds"] = None
+    assert resolve_deadline().expires_at is None
+
+
+def test_deadline_remaining_and_extend():
+    short, long = Deadline(1), Deadline(100)
+    assert 0 < short.remaining() <= 1
+    assert not short.expired()
+
+    short.extend(long)
+    assert short.expires_at == long.expires_at
+    long.extend(Deadline(1))
+    assert long.remaining() > 50
+
+    open_ended = Deadline()
+    short.extend(open_ended)
+    assert short.remaining() is None
+    assert Deadline(0).expired()
+
+
+def test_checks_use_the_current_deadline():
+    token = current_deadline.set(Deadline(10))
+    try:
+        check_deadline("research")
+        assert deadline_allows(1)
+        assert not deadline_allows(60)
+    finally:
+        current_deadline.reset(token)
+    assert deadline_allows(10_000)
+
+    token = current_deadline.set(Deadline(0))
+    try:
+        with pytest.raises(DeadlineExceededError) as exceeded:
+            check_deadline("composing")
+    finally:
+        current_deadline.reset(token)
+    assert exceeded.value.stage == "composing"
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after_polls):
+        self.polls = 0
+        self.disconnect_after_polls = disconnect_after_polls
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.polls >= self.disconnect_after_polls
+
+
+def test_run_cancelled_when_client_disconnects(config, monkeypatch):
+    stats = CancellationStats()
+    monkeypatch.setattr(deadline_module, "cancellation_stats", stats)
+    cancelled = asyncio.Event()
+
+    async def run():
+        async def agent_run():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(ClientDisconnectedError):
+            await cancel_on_disconnect(FakeRequest(disconnect_after_polls=2), agent_run())
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return await cancel_on_disconnect(FakeRequest(disconnect_after_polls=100), asyncio.sleep(0, result="done"))
+
+    assert asyncio.run(run()) == "done"
+    assert stats.stats()["callers_cancelled"]["disconnect"] == 1
+
+
+def test_cancellation_stats_estimate_time_avoided():
+    stats = CancellationStats()
+    stats.record_completed(100)
+    stats.record_completed(200)
+    stats.record_run_cancelled("research", seconds=30, events=12, session_cleaned=True)
+    stats.record_run_cancelled("persisting", seconds=140, events=40, session_cleaned=False)
+
+    result = stats.stats()
+    assert result["mean_run_seconds"] == 150
+    assert result["estimated_seconds_avoided"] == 130
+    assert result["cancelled_at_stage"] == {"research": 1, "persisting": 1}
+    assert (result["output_writes_avoided"], result["partial_sessions_cleaned"]) == (1, 1)
@@ -0,0 +1,121 @@
+"""Tests for the discovery job queue."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.job_queue import JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JobManager, JobQueueFullError
+
+
+def request(session_id="s1"):
+    return SimpleNamespace(session_id=session_id, user_id="u1", trend_query="spring trends")
+
+
+async def wait_until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.001)
+
+
+def test_jobs_complete_or_fail_with_the_handler_outcome():
+    manager = JobManager(workers=2)
+
+    async def handler(req, job):
+        job.set_stage("research")
+        if req.session_id == "bad":
+            raise ValueError("model error")
+        return {"session": req.session_id}
+
+    async def run():
+        manager.set_handler(handler)
+        await manager.start()
+        good, bad = manager.submit(request("good")), manager.submit(request("bad"))
+        await asyncio.wait_for(wait_until(lambda: good.finished_at and bad.finished_at), 5)
+        await manager.stop()
+        return good, bad
+
+    good, bad = asyncio.run(run())
+
+    assert (good.status, good.stage, good.result) == (JOB_COMPLETED, "done", {"session": "good"})
+    assert (bad.status, bad.stage, bad.error) == (JOB_FAILED, "research", "model error")
+    assert manager.stats()["completed_total"] == 1
+    assert manager.stats()["failed_total"] == 1
+
+
+def test_submit_needs_running_workers():
+    with pytest.raises(RuntimeError):
+        JobManager().submit(request())
+
+
+def test_full_queue_rejects_jobs():
+    manager = JobManager(workers=1, max_queue_size=1)
+
+    async def run():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def handler(req, job):
+            started.set()
+            await release.wait()
+
+        manager.set_handler(handler)
+        await manager.start()
+        running = manager.submit(request("running"))
+        await started.wait()
+        queued = manager.submit(request("queued"))
+        with pytest.raises(JobQueueFullError):
+            manager.submit(request("rejected"))
+        depth = manager.stats()["queue_depth"]
+        release.set()
+        await asyncio.wait_for(wait_until(lambda: queued.finished_at), 5)
+        await manager.stop()
+        return running, queued, depth
+
+    running, queued, depth = asyncio.run(run())
+
+    assert depth == 1
+    assert running.status == queued.status == JOB_COMPLETED
+    assert len(manager._jobs) == 2
+
+
+def test_stop_fails_unfinished_jobs():
+    manager = JobManager(workers=1)
+
+    async def run():
+        started = asyncio.Event()
+
+        async def handler(req, job):
+            started.set()
+            await asyncio.sleep(60)
+
+        manager.set_handler(handler)
+        await manager.start()
+        running, queued = manager.submit(request("running")), manager.submit(request("queued"))
+        await started.wait()
+        assert queued.status == JOB_QUEUED
+        await manager.stop()
+        return running, queued
+
+    running, queued = asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert (running.status, running.error) == (JOB_FAILED, "Job was cancelled")
+    assert (queued.status, queued.error) == (JOB_FAILED, "Server shut down before the job completed")
+    assert manager.stats()["workers"] == 0
+
+
+def test_finished_jobs_pruned_after_retention():
+    manager = JobManager(workers=1, retention_seconds=60)
+
+    async def run():
+        manager.set_handler(lambda req, job: asyncio.sleep(0, result="ok"))
+        await manager.start()
+        old, recent = manager.submit(request("old")), manager.submit(request("recent"))
+        await asyncio.wait_for(wait_until(lambda: old.finished_at and recent.finished_at), 5)
+        old.finished_at -= 120
+        assert manager.get(old.job_id) is None
+        found = manager.get(recent.job_id)
+        await manager.stop()
+        return recent, found
+
+    recent, found = asyncio.run(run())
+
+    assert found is recent
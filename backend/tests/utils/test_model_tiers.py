@@ -0,0 +1,93 @@
+"""Tests for the per-role model latency tracker and SLO fallback. No model is called."""
+
+import asyncio
+
+import pytest
+from google.adk.models import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.utils import model_tiers, rate_limiter
+from src.utils.model_tiers import ModelLatencyTracker, TieredGemini
+from src.utils.rate_limiter import AdaptiveRateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(model_tiers.time, "time", clock)
+    return clock
+
+
+def slow_tracker(**kwargs):
+    tracker = ModelLatencyTracker(slo_p95_seconds={"slow-model": 10}, min_samples=3, **kwargs)
+    for _ in range(3):
+        tracker.record("consolidation_agent", "slow-model", 30)
+        tracker.record("category_agent", "slow-model", 2)
+    return tracker
+
+
+def test_roles_are_tracked_separately(clock):
+    tracker = slow_tracker()
+
+    assert tracker.over_slo("consolidation_agent", "slow-model")
+    assert not tracker.over_slo("category_agent", "slow-model")
+    assert tracker.p95("category_agent", "slow-model") == 2
+    assert set(tracker.stats()["models"]) == {"consolidation_agent/slow-model", "category_agent/slow-model"}
+
+
+def test_samples_expire_after_window(clock):
+    tracker = slow_tracker(window_seconds=60)
+
+    clock.now += 61
+    assert tracker.p95("consolidation_agent", "slow-model") is None
+    assert not tracker.over_slo("consolidation_agent", "slow-model")
+
+
+def test_slow_model_is_probed_after_interval(clock):
+    tracker = slow_tracker(probe_interval_seconds=30)
+
+    assert not tracker.should_fall_back("consolidation_agent", "slow-model")
+    assert tracker.should_fall_back("consolidation_agent", "slow-model")
+    clock.now += 31
+    assert not tracker.should_fall_back("consolidation_agent", "slow-model")
+    assert tracker.should_fall_back("consolidation_agent", "slow-model")
+    assert not tracker.should_fall_back("category_agent", "slow-model")
+
+    stats = tracker.stats()
+    assert stats["probes"] == {"consolidation_agent/slow-model": 2}
+    assert stats["fallbacks"] == {"consolidation_agent/slow-model": 2}
+
+
+def test_tiered_model_falls_back_for_its_role(monkeypatch, clock):
+    tracker = slow_tracker(probe_interval_seconds=3600)
+    tracker.should_fall_back("consolidation_agent", "slow-model")  # uses up the probe
+    monkeypatch.setattr(model_tiers, "model_latency", tracker)
+    monkeypatch.setattr(rate_limiter, "gemini_rate_limiter", AdaptiveRateLimiter(requests_per_minute=6000, burst=100))
+    called = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        called.append(llm_request.model)
+        yield LlmResponse()
+
+    monkeypatch.setattr(Gemini, "generate_content_async", generate_content_async)
+
+    async def run(role):
+        model = TieredGemini(model="slow-model", agent_role=role, fallback_model="fast-model")
+        async for _ in model.generate_content_async(LlmRequest(model="slow-model")):
+            pass
+
+    asyncio.run(run("consolidation_agent"))
+    asyncio.run(run("category_agent"))
+
+    assert called == ["fast-model", "slow-model"]
+    assert tracker.p95("consolidation_agent", "fast-model") is None
+    assert len(tracker._samples[("consolidation_agent", "fast-model")]) == 1
@@ -0,0 +1,64 @@
+"""Tests for the local query router and the cache keys of routed runs."""
+
+from src.agents.create_parallel_category_agent import categories
+from src.models.session_models import TrendSendRequest
+from src.utils.query_router import QueryRouter
+from src.utils.service import _cache_key
+
+
+def test_narrow_query_is_routed():
+    router = QueryRouter(categories)
+    decision = router.route("bakuchiol serum")
+    assert decision.categories == ["Skincare"]
+    assert decision.is_subset
+    assert router.stats()["routed_queries"] == 1
+    assert router.stats()["category_agent_runs_skipped"] == len(categories) - 1
+
+
+def test_broad_query_runs_every_category():
+    router = QueryRouter(categories)
+    decision = router.route("what is trending right now")
+    assert decision.reason == "broad_query"
+    assert decision.categories == categories
+    assert router.stats()["broad_queries"] == 1
+
+
+def test_min_score_filters_weak_matches():
+    # "retinol hair mask" scores Skincare 3 (ingredient) and Hair 7
+    assert QueryRouter(categories, min_score=3, relative_threshold=0).route("retinol hair mask").categories == [
+        "Skincare", "Hair"
+    ]
+    assert QueryRouter(categories, min_score=4, relative_threshold=0).route("retinol hair mask").categories == ["Hair"]
+    assert QueryRouter(categories, min_score=100).route("retinol hair mask").reason == "broad_query"
+
+
+def test_relative_threshold_drops_weaker_categories():
+    assert QueryRouter(categories, relative_threshold=0.5).route("retinol hair mask").categories == ["Hair"]
+    assert QueryRouter(categories, relative_threshold=0.4).route("retinol hair mask").categories == ["Skincare", "Hair"]
+
+
+def test_forced_and_disabled():
+    router = QueryRouter(categories)
+    assert router.route("bakuchiol serum", force_all=True).reason == "forced"
+    assert QueryRouter(categories, enabled=False).route("bakuchiol serum").reason == "disabled"
+    assert router.stats()["forced_all_categories"] == 1
+
+
+def test_select_does_not_count():
+    router = QueryRouter(categories)
+    router.select("bakuchiol serum")
+    assert router.stats()["routed_queries"] == 0
+
+
+def request(**kwargs):
+    return TrendSendRequest(session_id="s", user_id="u", trend_query="bakuchiol serum", **kwargs)
+
+
+def test_routed_parallel_report_is_keyed_apart():
+    sequential = _cache_key(request(pipeline_mode="sequential"))
+    routed = _cache_key(request(pipeline_mode="parallel"))
+    all_categories = _cache_key(request(pipeline_mode="parallel", force_all_categories=True))
+
+    assert len({sequential, routed, all_categories}) == 3
+    assert routed.endswith("|parallel|Skincare")
+    assert _cache_key(request(pipeline_mode="parallel")) == routed
@@ -0,0 +1,116 @@
+"""Tests for the adaptive model rate limiter. No model is called."""
+
+import asyncio
+
+import pytest
+from google.adk.models import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from src.utils import rate_limiter
+from src.utils.rate_limiter import AdaptiveRateLimiter, RateLimitedGemini, parse_retry_delay
+
+
+class FakeError(Exception):
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.details = details
+
+
+def test_parse_retry_delay_prefers_retry_info():
+    details = {"error": {"details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12s"}]}}
+    assert parse_retry_delay(FakeError("429", details)) == 12.0
+    assert parse_retry_delay(FakeError("Quota exceeded, please retry in 3.5s.")) == 3.5
+    assert parse_retry_delay(FakeError("429")) is None
+
+
+def test_aimd_limit():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4, min_concurrency=1, max_concurrency=5, increase_every=2)
+    limiter.record_success()
+    limiter.record_success()
+    assert limiter.concurrency_limit == 5
+    limiter.record_success()
+    limiter.record_success()
+    assert limiter.concurrency_limit == 5
+
+    limiter.record_rate_limited(0)
+    assert limiter.concurrency_limit == 2
+    limiter.record_rate_limited(0)
+    limiter.record_rate_limited(0)
+    assert limiter.concurrency_limit == 1
+    assert limiter.stats()["rate_limited"] == 3
+
+
+def test_backoff_delay():
+    limiter = AdaptiveRateLimiter(base_backoff_seconds=2, max_backoff_seconds=10)
+    assert limiter.backoff_delay(3, server_delay=7.0) == 7.0
+    assert 1.0 <= limiter.backoff_delay(0, None) <= 2.0
+    assert 5.0 <= limiter.backoff_delay(10, None) <= 10.0
+
+
+def test_slots_cap_concurrency():
+    limiter = AdaptiveRateLimiter(requests_per_minute=6000, burst=100, initial_concurrency=2, max_concurrency=2)
+    running, peak = 0, 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.stats()["calls"] == 6
+    assert limiter.stats()["in_flight"] == 0
+
+
+@pytest.fixture
+def single_slot(monkeypatch):
+    limiter = AdaptiveRateLimiter(requests_per_minute=6000, burst=100, initial_concurrency=1, max_concurrency=1)
+    monkeypatch.setattr(rate_limiter, "gemini_rate_limiter", limiter)
+    return limiter
+
+
+def fake_model(monkeypatch, responses):
+    async def generate_content_async(self, llm_request, stream=False):
+        for text in responses:
+            await asyncio.sleep(0)
+            yield LlmResponse(partial=stream, custom_metadata={"text": text})
+
+    monkeypatch.setattr(Gemini, "generate_content_async", generate_content_async)
+    return RateLimitedGemini(model="gemini-2.5-flash")
+
+
+def test_slot_is_free_while_caller_handles_responses(monkeypatch, single_slot):
+    # ADK runs tools (e.g. the search tool, which takes its own slot) while handling a response
+    model = fake_model(monkeypatch, ["a", "b"])
+
+    async def run():
+        seen = []
+        async for response in model.generate_content_async(LlmRequest(), stream=True):
+            seen.append(response.custom_metadata["text"])
+            await asyncio.sleep(0.01)
+            async with single_slot.slot():
+                pass
+        return seen
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == ["a", "b"]
+    assert single_slot.stats()["in_flight"] == 0
+
+
+def test_closing_the_stream_early_releases_the_slot(monkeypatch, single_slot):
+    model = fake_model(monkeypatch, ["a", "b", "c"])
+
+    async def run():
+        stream = model.generate_content_async(LlmRequest(), stream=True)
+        await stream.__anext__()
+        await stream.aclose()
+        async with single_slot.slot():
+            return single_slot.stats()["in_flight"]
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == 1
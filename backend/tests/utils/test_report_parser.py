@@ -0,0 +1,108 @@
+"""Tests for local structuring of research findings. No model is called."""
+
+import json
+
+from src.utils.report_parser import (
+    LocalReportParser,
+    match_category_heading,
+    parse_category_findings,
+    parse_research_markdown,
+)
+
+RESEARCH = """Beauty shoppers are moving toward gentle actives and long-lasting scent, with social video driving
+discovery across every category we looked at this season.
+
+## Skincare Trends
+
+1. **Trend Name:** Barrier Repair
+**Trend Summary:** Ceramide-rich moisturizers for stressed skin.
+**Ingredients:** ceramides, niacinamide
+**Keyword Associations:** #barrier, skin barrier, N/A
+**Hashtags:** #SkinBarrier #Ceramides
+**Consumer Sentiment:** Very positive
+this line belongs to an ignored field
+
+## Fragrance
+
+- Trend Name: Skin Scents
+- Trend Summary: Sheer musks that smell like skin.
+- Hashtags: skinscent, musk
+"""
+
+
+def test_category_headings():
+    assert match_category_heading("## Skincare Trends") == ("skincare_trends", "Skincare")
+    assert match_category_heading("**Tools & Brushes**") == ("tools_brushes_trends", "Tools & Brushes")
+    assert match_category_heading("### Men's Grooming") == ("men_trends", "Men")
+    assert match_category_heading("## Skincare ingredients to watch") is None
+    assert match_category_heading("Skincare") is None
+
+
+def test_research_markdown_fields():
+    trends = parse_research_markdown(RESEARCH)
+
+    barrier, = trends["skincare_trends"]
+    assert barrier["trend_name"] == "Barrier Repair"
+    assert barrier["trend_summary"] == "Ceramide-rich moisturizers for stressed skin."
+    assert barrier["ingredients"] == ["ceramides", "niacinamide"]
+    assert barrier["keywords"] == ["barrier", "skin barrier"]
+    assert barrier["hashtags"] == ["#SkinBarrier", "#Ceramides"]
+    assert barrier["category_associations"] == ["Skincare"]
+
+    scents, = trends["fragrance_trends"]
+    assert scents["trend_name"] == "Skin Scents"
+    assert scents["hashtags"] == ["#skinscent", "#musk"]
+
+
+def test_category_findings_json():
+    findings = {
+        "hair_category_findings": "```json\n" + json.dumps([
+            {"Trend Name": "Scalp Care", "trend_summary": "Serums for the scalp.", "Keywords": ["scalp"], "Top Categories": ["Hair Care"]},
+        ]) + "\n```",
+        "men_category_findings": [],
+    }
+
+    trends = parse_category_findings(findings)
+
+    scalp, = trends["hair_trends"]
+    assert (scalp["trend_name"], scalp["trend_summary"]) == ("Scalp Care", "Serums for the scalp.")
+    assert scalp["keywords"] == ["scalp"]
+    assert scalp["category_associations"] == ["Hair Care"]
+    assert parse_category_findings({"hair_category_findings": "no trends found"}) is None
+
+
+def test_parse_builds_validated_report():
+    parser = LocalReportParser(min_trends=2)
+
+    report = parser.parse({"sephora_trend_research_findings": RESEARCH})
+
+    assert report is not None
+    assert report.total_trends_found == 2
+    assert report.report_summary.startswith("Beauty shoppers are moving")
+    assert [trend.trend_name for trend in report.trends.skincare_trends] == ["Barrier Repair"]
+    assert parser.stats()["fast_path_successes"] == 1
+
+
+def test_parse_prefers_category_findings_and_generates_summary():
+    parser = LocalReportParser(min_trends=2)
+    items = [
+        {"trend name": "Scalp Care", "trend summary": "Serums for the scalp."},
+        {"trend name": "Glossy Hair", "trend summary": "Shine sprays."},
+    ]
+
+    report = parser.parse({"hair_category_findings": json.dumps(items), "sephora_trend_research_findings": ""})
+
+    assert [trend.trend_name for trend in report.trends.hair_trends] == ["Scalp Care", "Glossy Hair"]
+    assert report.report_summary == "The research identified 2 emerging beauty trends across 1 Sephora categories: Hair (2)."
+
+
+def test_fallback_reasons_counted():
+    parser = LocalReportParser(min_trends=3)
+
+    assert parser.parse({}) is None
+    assert parser.parse({"sephora_trend_research_findings": RESEARCH}) is None
+    assert LocalReportParser(enabled=False).parse({"sephora_trend_research_findings": RESEARCH}) is None
+
+    stats = parser.stats()
+    assert stats["fallback_reasons"] == {"no_research_findings": 1, "too_few_trends": 1}
+    assert (stats["attempts"], stats["fast_path_rate"]) == (2, 0.0)
@@ -0,0 +1,75 @@
+"""Tests for the query-result cache."""
+
+import json
+from datetime import date
+
+from src.utils.result_cache import QueryResultCache, discovery_window, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  Glass   SKIN trends?! ") == "glass skin trends"
+
+
+def test_discovery_window_is_aligned():
+    assert discovery_window(1, date(2026, 3, 5)) == "2026-03-05"
+    window = discovery_window(7, date(2026, 3, 5))
+    assert date.fromisoformat(window).toordinal() % 7 == 0
+    assert date.fromisoformat(window) <= date(2026, 3, 5)
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = QueryResultCache(max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.contains("a") and cache.contains("c")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+
+def test_contains_does_not_count():
+    cache = QueryResultCache()
+    cache.set("a", {"v": 1})
+    assert cache.contains("a")
+    assert not cache.contains("b")
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (0, 0)
+
+
+def test_expired_entries_are_misses():
+    cache = QueryResultCache(ttl_seconds=-1)
+    cache.set("a", {"v": 1})
+    assert not cache.contains("a")
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_make_key_shares_entries_across_phrasings():
+    cache = QueryResultCache()
+    assert cache.make_key("Glass Skin?", "2026-03-05") == cache.make_key("glass  skin", "2026-03-05")
+    assert cache.make_key("glass skin", "2026-03-05") != cache.make_key("glass skin", "2026-03-06")
+
+
+def test_persisted_in_the_background_and_reloaded(tmp_path):
+    path = tmp_path / "cache" / "result_cache.json"
+    cache = QueryResultCache(persist_path=str(path), persist_delay_seconds=60)
+    cache.set("a", {"v": 1}, query="A")
+    cache.set("b", {"v": 2}, query="B")
+    # The write is debounced; set() only schedules it
+    assert not path.exists()
+
+    cache.flush()
+    assert set(json.loads(path.read_text())["entries"]) == {"a", "b"}
+    assert cache.stats()["persist_writes"] == 1
+
+    reloaded = QueryResultCache(persist_path=str(path))
+    assert reloaded.get("a") == {"v": 1}
+
+
+def test_disabled_cache_stores_nothing():
+    cache = QueryResultCache(enabled=False)
+    cache.set("a", {"v": 1})
+    assert cache.get("a") is None
+    assert not cache.contains("a")
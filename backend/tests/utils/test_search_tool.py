@@ -0,0 +1,142 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.adk.sessions.state import State
+
+from src.utils import search_tool
+from src.utils.callbacks import collect_research_sources_callback
+from src.utils.search_tool import (
+    SearchToolCache,
+    StaticSearchBackend,
+    recorded_sources,
+    source_key,
+    source_short_id,
+)
+
+
+def result(*urls):
+    return {
+        "summary": "summary",
+        "results": [{"title": url.rsplit("/", 1)[-1], "url": url, "domain": "example.com"} for url in urls],
+    }
+
+
+@pytest.fixture
+def fixtures_path(tmp_path):
+    path = tmp_path / "fixtures.json"
+    path.write_text(json.dumps({
+        "retinol serum": result("https://example.com/a", "https://example.com/shared"),
+        "glass skin": result("https://example.com/b", "https://example.com/shared", "https://example.com/c"),
+    }))
+    return str(path)
+
+
+class CountingBackend(StaticSearchBackend):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    async def search(self, query):
+        self.calls += 1
+        return await super().search(query)
+
+
+def test_concurrent_searches_share_one_backend_call(fixtures_path):
+    backend = CountingBackend(fixtures_path, latency_seconds=0.05)
+    cache = SearchToolCache(backend)
+
+    async def run():
+        return await asyncio.gather(
+            cache.search("Retinol serum", run_id="run"),
+            cache.search("retinol  serum", run_id="run"),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert backend.calls == 1
+    assert first["results"] == second["results"]
+    assert {first["cached"], second["cached"]} == {False, True}
+    assert cache.pop_run_stats("run") == {"searches": 2, "cache_hits": 0, "coalesced": 1, "backend_calls": 1}
+    assert cache.pop_run_stats("run")["searches"] == 0
+
+
+def test_cached_results_served_until_ttl(fixtures_path):
+    backend = CountingBackend(fixtures_path)
+    cache = SearchToolCache(backend, ttl_seconds=3600)
+
+    asyncio.run(cache.search("retinol serum"))
+    hit = asyncio.run(cache.search("retinol serum"))
+    assert hit["cached"] is True
+    assert backend.calls == 1
+
+    expired = SearchToolCache(backend, ttl_seconds=0)
+    asyncio.run(expired.search("glass skin"))
+    assert asyncio.run(expired.search("glass skin"))["cached"] is False
+    assert backend.calls == 3
+    assert expired.stats()["cache_hits"] == 0
+
+
+def test_least_recently_used_entry_evicted(fixtures_path):
+    cache = SearchToolCache(CountingBackend(fixtures_path), max_entries=1)
+
+    asyncio.run(cache.search("retinol serum"))
+    asyncio.run(cache.search("glass skin"))
+
+    assert cache.stats()["entries"] == 1
+    assert asyncio.run(cache.search("retinol serum"))["cached"] is False
+
+
+def test_short_id_depends_only_on_url():
+    assert source_short_id("https://example.com/a") == source_short_id("https://example.com/a")
+    assert source_short_id("https://example.com/a") != source_short_id("https://example.com/b")
+    assert source_short_id("https://example.com/a").startswith("src-")
+
+
+def test_concurrent_branches_keep_every_source(fixtures_path, monkeypatch):
+    monkeypatch.setattr(search_tool, "search_cache", SearchToolCache(StaticSearchBackend(fixtures_path, latency_seconds=0.01)))
+    session_state = {}
+    branches = [
+        SimpleNamespace(invocation_id="run", agent_name="skincare_category_agent", state=State(session_state, {})),
+        SimpleNamespace(invocation_id="run", agent_name="makeup_category_agent", state=State(session_state, {})),
+    ]
+
+    async def run():
+        await asyncio.gather(
+            search_tool.google_search("retinol serum", branches[0]),
+            search_tool.google_search("glass skin", branches[1]),
+        )
+
+    asyncio.run(run())
+
+    # The session service applies each event's delta key by key; apply them out of order
+    stored = {}
+    for branch in reversed(branches):
+        stored.update(branch.state._delta)
+
+    sources = recorded_sources(stored)
+    urls = ["https://example.com/a", "https://example.com/b", "https://example.com/c", "https://example.com/shared"]
+    assert sorted(source["url"] for source in sources.values()) == urls
+    assert set(sources) == {source_short_id(url) for url in urls}
+    assert recorded_sources(State(session_state, {})) == sources
+    skincare = recorded_sources(stored, agent_name="skincare_category_agent")
+    assert sorted(source["url"] for source in skincare.values()) == ["https://example.com/a", "https://example.com/shared"]
+    assert len(recorded_sources(stored, agent_name="makeup_category_agent")) == 3
+
+
+def test_callback_cites_sources_recorded_by_search_tool():
+    url = "https://example.com/a"
+    short_id = source_short_id(url)
+    state = State({
+        source_key("research_agent", short_id): {"short_id": short_id, "title": "Article", "url": url, "domain": "example.com"},
+        "sephora_trend_research_findings": f'Retinol is trending <cite source="{short_id}"/>. Unknown <cite source="src-1"/>.',
+    }, {})
+    context = SimpleNamespace(
+        state=state,
+        _invocation_context=SimpleNamespace(agent_name="research", session=SimpleNamespace(events=[])),
+    )
+
+    collect_research_sources_callback(context)
+
+    assert state["sephora_trend_research_findings_with_citations"] == f"Retinol is trending  [Article]({url}). Unknown."
@@ -0,0 +1,118 @@
+"""Tests for the bounded in-memory session service."""
+
+import asyncio
+
+from google.adk.events import Event, EventActions
+
+from src.utils import session_store
+from src.utils.session_store import BoundedSessionService
+
+APP = "app"
+USER = "user"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def event(**state_delta):
+    return Event(author="agent", invocation_id="run", actions=EventActions(state_delta=state_delta))
+
+
+async def finished_session(service, session_id, **state_delta):
+    session = await service.create_session(app_name=APP, user_id=USER, session_id=session_id)
+    await service.append_event(session, event(**state_delta))
+    await service.complete_session(APP, USER, session_id)
+    return session
+
+
+def get(service, session_id):
+    return asyncio.run(service.get_session(app_name=APP, user_id=USER, session_id=session_id))
+
+
+def test_least_recently_used_completed_session_evicted():
+    service = BoundedSessionService(max_sessions=2, max_bytes=None)
+
+    async def run():
+        await finished_session(service, "old")
+        await finished_session(service, "recent")
+        await service.get_session(app_name=APP, user_id=USER, session_id="old")
+        await finished_session(service, "new")
+
+    asyncio.run(run())
+
+    assert get(service, "recent") is None
+    assert get(service, "old") is not None
+    assert get(service, "new") is not None
+    assert service.stats()["evictions"]["max_sessions"] == 1
+
+
+def test_sessions_with_a_run_in_progress_are_kept():
+    service = BoundedSessionService(max_sessions=1, max_bytes=None)
+
+    async def run():
+        running = await service.create_session(app_name=APP, user_id=USER, session_id="running")
+        await service.append_event(running, event(step=1))
+        await service.create_session(app_name=APP, user_id=USER, session_id="also_running")
+
+    asyncio.run(run())
+
+    assert get(service, "running") is not None
+    assert get(service, "also_running") is not None
+    assert service.stats()["evictions"]["max_sessions"] == 0
+
+
+def test_byte_budget_evicts_completed_sessions():
+    service = BoundedSessionService(max_sessions=None, max_bytes=5_000, compact_completed=False)
+
+    async def run():
+        await finished_session(service, "big", findings="x" * 3_000)
+        await finished_session(service, "bigger", findings="y" * 3_000)
+
+    asyncio.run(run())
+
+    assert get(service, "big") is None
+    assert service.stats()["evictions"]["max_bytes"] == 1
+    assert service.stats()["estimated_bytes"] <= 5_000
+
+
+def test_idle_sessions_expire(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store.time, "monotonic", clock)
+    service = BoundedSessionService(ttl_seconds=60)
+
+    async def run():
+        running = await service.create_session(app_name=APP, user_id=USER, session_id="running")
+        await service.append_event(running, event(step=1))
+
+    asyncio.run(run())
+    clock.now += 61
+
+    assert get(service, "running") is None
+    assert service.stats()["evictions"]["ttl"] == 1
+    assert service.stats()["sessions"] == 0
+
+
+def test_completed_session_compacted_to_final_state():
+    service = BoundedSessionService()
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1", state={"query": "retinol"})
+        for step in range(3):
+            await service.append_event(session, event(step=step, findings="z" * 500))
+        before = service.stats()["estimated_bytes"]
+        await service.complete_session(APP, USER, "s1")
+        return before
+
+    before = asyncio.run(run())
+
+    session = get(service, "s1")
+    assert session.events == []
+    assert session.state == {"query": "retinol", "step": 2, "findings": "z" * 500}
+    stats = service.stats()
+    assert (stats["compactions"], stats["compacted_events"], stats["active_sessions"]) == (1, 3, 0)
+    assert stats["estimated_bytes"] < before
@@ -0,0 +1,98 @@
+"""Tests for single-flight coalescing."""
+
+import asyncio
+
+import pytest
+
+from src.utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "report"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("q", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["report"] * 5
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    assert flight.stats()["runs_started"] == 1
+    assert flight.stats()["callers_coalesced"] == 4
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+
+    async def run():
+        return await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, "a")), flight.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(run()) == [("a", False), ("b", False)]
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(flight.do("q", fail), flight.do("q", fail), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+def test_cancelled_caller_does_not_cancel_shared_run():
+    flight = SingleFlight("test")
+
+    async def run():
+        done = asyncio.Event()
+
+        async def work():
+            await done.wait()
+            return "report"
+
+        first = asyncio.create_task(flight.do("q", work))
+        second = asyncio.create_task(flight.do("q", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        done.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == ("report", True)
+
+
+def test_abandoned_run_is_cancelled():
+    flight = SingleFlight("test", cancel_abandoned=True)
+    cancelled = []
+
+    async def run():
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        caller = asyncio.create_task(flight.do("q", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert cancelled == [True]
+    assert flight.stats()["runs_abandoned"] == 1
+    assert not flight.running("q")
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+from src.utils.sqlite_session_store import SQLiteSessionService
+
+APP = "app"
+USER = "user"
+
+
+def event(timestamp, **state_delta):
+    return Event(author="agent", invocation_id="run", timestamp=timestamp, actions=EventActions(state_delta=state_delta))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_events_written_in_batches(db_path):
+    service = SQLiteSessionService(db_path, batch_size=3, flush_interval_seconds=60)
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        await service.append_event(session, event(1.0, step=1))
+        await service.append_event(session, event(2.0, step=2))
+        before = service.stats()
+        await service.append_event(session, event(3.0, step=3))
+        return before, service.stats()
+
+    before, after = asyncio.run(run())
+
+    assert (before["stored_events"], before["pending_events"]) == (0, 2)
+    assert (after["stored_events"], after["pending_events"], after["flushes"]) == (3, 0, 1)
+
+
+def test_read_flushes_pending_events_and_filters_by_timestamp(db_path):
+    service = SQLiteSessionService(db_path, batch_size=100, flush_interval_seconds=60)
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1", state={"query": "retinol"})
+        for timestamp in (1.0, 2.0, 3.0):
+            await service.append_event(session, event(timestamp, step=int(timestamp)))
+        full = await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+        recent = await service.get_session(
+            app_name=APP, user_id=USER, session_id="s1", config=GetSessionConfig(after_timestamp=2.0)
+        )
+        return full, recent
+
+    full, recent = asyncio.run(run())
+
+    assert [e.timestamp for e in full.events] == [1.0, 2.0, 3.0]
+    assert full.state == {"query": "retinol", "step": 3}
+    assert [e.timestamp for e in recent.events] == [2.0, 3.0]
+
+
+def test_old_events_compacted_into_state_snapshot(db_path):
+    service = SQLiteSessionService(db_path, batch_size=1, max_events=5, keep_recent_events=2)
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        for i in range(6):
+            await service.append_event(session, event(float(i), **{f"key_{i}": i}))
+        compacted = await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+        await service.append_event(session, event(6.0, key_6=6))
+        await service.complete_session(APP, USER, "s1")
+        completed = await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+        return compacted, completed
+
+    compacted, completed = asyncio.run(run())
+
+    assert [e.timestamp for e in compacted.events] == [4.0, 5.0]
+    assert compacted.state == {f"key_{i}": i for i in range(6)}
+    assert [e.timestamp for e in completed.events] == [5.0, 6.0]
+    assert completed.state == {f"key_{i}": i for i in range(7)}
+    stats = service.stats()
+    assert stats["compactions"] == 2
+    assert stats["compacted_events"] == 5
+
+
+def test_close_writes_buffered_events(db_path):
+    service = SQLiteSessionService(db_path, batch_size=100, flush_interval_seconds=60)
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        await service.append_event(session, event(1.0, step=1))
+        await service.close()
+
+    asyncio.run(run())
+
+    assert service._connections == []
+    reopened = SQLiteSessionService(db_path)
+    session = asyncio.run(reopened.get_session(app_name=APP, user_id=USER, session_id="s1"))
+    assert [e.timestamp for e in session.events] == [1.0]
+    assert session.state == {"step": 1}
+    # The closed service reopens its connections on next use
+    assert service.stats()["stored_events"] == 1
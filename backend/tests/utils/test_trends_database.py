@@ -0,0 +1,198 @@
+"""Tests for the trends database."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.utils.database import TrendDatabase, build_match_query, connect, decode_cursor, encode_cursor
+
+
+def trend(name, description="", keywords=None, ingredients=None):
+    return {
+        "trend_name": name,
+        "trend_description": description,
+        "trend_summary": "",
+        "keywords": keywords or [],
+        "hashtags": [],
+        "ingredients": ingredients or [],
+    }
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = TrendDatabase(str(tmp_path / "trends.db"), pool_size=2)
+    yield database
+    database.close()
+
+
+def test_save_skips_trends_the_session_already_has(db):
+    report = {"makeupTrends": [trend("Glass Skin"), trend("glass  skin")], "hairTrends": [trend("Scalp Care")]}
+    assert db.save_trends_batch(report, "s1", user_id="u1", query="q") == 2
+    assert db.save_trends_batch({"makeup_trends": [trend("GLASS SKIN")]}, "s1") == 0
+    assert db.check_trend_exists("Glass   skin")
+    assert db.save_trend(trend("Scalp Care"), "s1", "Hair") is None
+
+
+def test_later_session_lists_trends_found_before(db):
+    db.save_trends_batch({"makeupTrends": [trend("Glass Skin")]}, "s1")
+    assert db.save_trends_batch({"makeupTrends": [trend("glass skin"), trend("Blush Draping")]}, "s2") == 2
+
+    assert [row["trend_name"] for row in db.get_session_trends("s2")] == ["glass skin", "Blush Draping"]
+    assert [row["trend_name"] for row in db.get_session_trends("s1")] == ["Glass Skin"]
+
+
+def test_details_are_stored_and_listed(db):
+    db.save_trends_batch({"skincareTrends": [trend("Barrier Repair", ingredients=["ceramides", "squalane"])]}, "s1")
+    [row] = db.get_session_trends("s1")
+    assert row["category"] == "Skincare"
+    assert row["ingredients"] == ["ceramides", "squalane"]
+
+
+def test_delete_session_removes_details_without_cascade(tmp_path):
+    path = str(tmp_path / "trends.db")
+    # A trend_details table created before it had ON DELETE CASCADE
+    conn = connect(path)
+    conn.execute(
+        "CREATE TABLE trend_details (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "trend_id INTEGER NOT NULL, detail_type TEXT NOT NULL, value TEXT NOT NULL)"
+    )
+    conn.close()
+
+    db = TrendDatabase(path, pool_size=1)
+    try:
+        db.save_trends_batch({"skincareTrends": [trend("Barrier Repair", ingredients=["ceramides"])]}, "s1")
+        assert db.delete_session("s1") == 1
+        assert db.delete_session("s1") is None
+        with db.pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM trend_details").fetchone()[0] == 0
+    finally:
+        db.close()
+
+
+def test_async_read_and_write_helpers(db):
+    async def run():
+        await db.write(db.save_trends_batch, {"makeupTrends": [trend("Async Trend")]}, "s1")
+        return await db.read(db.get_recent_trends, 10)
+
+    rows = asyncio.run(run())
+    assert [row["trend_name"] for row in rows] == ["Async Trend"]
+    assert db.stats()["write"]["calls"] == 1
+    assert db.stats()["read"]["calls"] == 1
+
+
+def test_blocking_write_runs_on_writer_thread(db):
+    def save(trends_data, session_id):
+        return threading.current_thread().name, db.save_trends_batch(trends_data, session_id)
+
+    thread_name, saved = asyncio.run(asyncio.to_thread(db.write_blocking, save, {"makeupTrends": [trend("Worker Trend")]}, "s1"))
+
+    assert thread_name.startswith("trends-db-write")
+    assert saved == 1
+    assert db.stats()["write"]["calls"] == 1
+
+
+def test_build_match_query_quotes_words():
+    assert build_match_query('Glass sk*in" OR') == '"glass"* "sk"* "in"* "or"*'
+    assert build_match_query("  ?! ") == ""
+
+
+def test_search_matches_prefixes_and_filters_category(db):
+    db.save_trends_batch(
+        {
+            "skincareTrends": [trend("Barrier Repair", "Hydrating ceramide serums", ingredients=["ceramides"])],
+            "makeupTrends": [trend("Dewy Base", "Hydrating tints")],
+        },
+        "s1",
+    )
+
+    assert sorted(row["trend_name"] for row in db.search_trends("hydrat")) == ["Barrier Repair", "Dewy Base"]
+    assert [row["trend_name"] for row in db.search_trends("hydrat", category="skincare")] == ["Barrier Repair"]
+
+    [result] = db.search_trends("barrier")
+    assert result["highlighted_name"] == "<mark>Barrier</mark> Repair"
+    assert result["ingredients"] == ["ceramides"]
+    assert db.search_trends("") == []
+
+
+def test_search_ranks_name_matches_first(db):
+    db.save_trends_batch(
+        {"makeupTrends": [trend("Blush Draping", "A cheek technique"), trend("Cheek Tint", "Blush for lips and cheeks")]},
+        "s1",
+    )
+    assert [row["trend_name"] for row in db.search_trends("blush")] == ["Blush Draping", "Cheek Tint"]
+
+
+def test_deleted_trends_leave_the_search_index(db):
+    db.save_trends_batch({"makeupTrends": [trend("Cherry Lips")]}, "s1")
+    db.delete_session("s1")
+    assert db.search_trends("cherry") == []
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"created_at": "2026-01-01T00:00:00", "id": 42})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2026-01-01T00:00:00", 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor({"created_at": 1, "id": "x"})])
+def test_decode_cursor_rejects_malformed(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_trend_once(db):
+    db.save_trends_batch({"makeupTrends": [trend(f"Trend {i}") for i in range(25)]}, "s1")
+
+    seen, after = [], None
+    while True:
+        page = db.get_recent_trends(limit=10, after=after)
+        if not page:
+            break
+        seen.extend(row["id"] for row in page)
+        after = decode_cursor(encode_cursor(page[-1]))
+
+    assert len(set(seen)) == 25
+    # Every trend of one batch shares created_at, so the id breaks the tie, newest first
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_session_and_category_listings_page_by_cursor(db):
+    db.save_trends_batch({"makeupTrends": [trend(f"Makeup {i}") for i in range(5)]}, "s1")
+    db.save_trends_batch({"hairTrends": [trend(f"Hair {i}") for i in range(3)]}, "s2")
+
+    first = db.get_session_trends("s1", limit=3)
+    rest = db.get_session_trends("s1", limit=3, after=(first[-1]["created_at"], first[-1]["id"]))
+    assert [row["trend_name"] for row in first + rest] == [f"Makeup {i}" for i in range(5)]
+
+    hair = db.get_trends_by_category("hair", limit=2)
+    more = db.get_trends_by_category("hair", limit=2, after=(hair[-1]["created_at"], hair[-1]["id"]))
+    assert len(hair) == 2 and len(more) == 1
+    assert {row["category"] for row in hair + more} == {"Hair"}
+
+
+def test_summary_tables_follow_inserts_and_deletes(db):
+    db.save_trends_batch({"makeupTrends": [trend("A"), trend("B")], "hairTrends": [trend("C")]}, "s1")
+    db.save_trends_batch({"makeupTrends": [trend("D")]}, "s2")
+
+    stats = db.get_database_stats()
+    assert (stats["total_trends"], stats["total_sessions"]) == (4, 2)
+    assert stats["trends_by_category"] == {"Makeup": 3, "Hair": 1}
+    assert [row["category"] for row in db.get_categories()] == ["Makeup", "Hair"]
+
+    db.delete_session("s1")
+    stats = db.get_database_stats()
+    assert (stats["total_trends"], stats["total_sessions"]) == (1, 1)
+    assert stats["trends_by_category"] == {"Makeup": 1}
+
+
+def test_rebuild_stats_counts_rows_written_around_the_triggers(db):
+    db.save_trends_batch({"makeupTrends": [trend("A")]}, "s1")
+    with db._write_connection() as conn:
+        conn.execute("UPDATE trend_totals SET total_trends = 99 WHERE id = 1")
+        conn.execute("DELETE FROM category_stats")
+
+    db.rebuild_stats()
+    stats = db.get_database_stats()
+    assert stats["total_trends"] == 1
+    assert stats["trends_by_category"] == {"Makeup": 1}